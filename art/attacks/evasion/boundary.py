@@ -59,6 +59,7 @@ class BoundaryAttack(EvasionAttack):
         "sample_size",
         "init_size",
         "batch_size",
+        "batched",
         "verbose",
     ]
 
@@ -77,6 +78,7 @@ class BoundaryAttack(EvasionAttack):
         sample_size: int = 20,
         init_size: int = 100,
         min_epsilon: Optional[float] = None,
+        batched: bool = False,
         verbose: bool = True,
     ) -> None:
         """
@@ -93,6 +95,9 @@ class BoundaryAttack(EvasionAttack):
         :param sample_size: Number of samples per trial.
         :param init_size: Maximum number of trials for initial generation of adversarial examples.
         :param min_epsilon: Stop attack if perturbation is smaller than `min_epsilon`.
+        :param batched: Attack all samples at once instead of one at a time. The candidates of all active samples are
+                        generated as one array and evaluated with one call to `predict` per step, while the step sizes
+                        are adapted for each sample separately.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=estimator)
@@ -107,6 +112,7 @@ class BoundaryAttack(EvasionAttack):
         self.init_size = init_size
         self.min_epsilon = min_epsilon
         self.batch_size = batch_size
+        self.batched = batched
         self.verbose = verbose
         self._check_params()
 
@@ -151,27 +157,38 @@ class BoundaryAttack(EvasionAttack):
         x_adv = x.astype(ART_NUMPY_DTYPE)
 
         # Generate the adversarial samples
-        for ind, val in enumerate(tqdm(x_adv, desc="Boundary attack", disable=not self.verbose)):
-            if self.targeted:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=y[ind],
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
-            else:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=-1,
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
+        if self.batched:
+            x_adv = self._perturb_batch(
+                x=x_adv,
+                y=y,
+                y_p=preds,
+                init_preds=init_preds if kwargs.get("x_adv_init") is not None else None,
+                adv_init=x_adv_init if kwargs.get("x_adv_init") is not None else None,
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
+        else:
+            for ind, val in enumerate(tqdm(x_adv, desc="Boundary attack", disable=not self.verbose)):
+                if self.targeted:
+                    x_adv[ind] = self._perturb(
+                        x=val,
+                        y=y[ind],
+                        y_p=preds[ind],
+                        init_pred=init_preds[ind],
+                        adv_init=x_adv_init[ind],
+                        clip_min=clip_min,
+                        clip_max=clip_max,
+                    )
+                else:
+                    x_adv[ind] = self._perturb(
+                        x=val,
+                        y=-1,
+                        y_p=preds[ind],
+                        init_pred=init_preds[ind],
+                        adv_init=x_adv_init[ind],
+                        clip_min=clip_min,
+                        clip_max=clip_max,
+                    )
 
         if y is not None:
             y = to_categorical(y, self.estimator.nb_classes)
@@ -261,14 +278,14 @@ class BoundaryAttack(EvasionAttack):
         for _ in trange(self.max_iter, desc="Boundary attack - iterations", disable=not self.verbose):
             # Trust region method to adjust delta
             for _ in range(self.num_trial):
-                potential_advs = []
-                for _ in range(self.sample_size):
-                    potential_adv = x_adv + self._orthogonal_perturb(self.curr_delta, x_adv, original_sample)
-                    potential_adv = np.clip(potential_adv, clip_min, clip_max)
-                    potential_advs.append(potential_adv)
+                perturbations = self._orthogonal_perturb_batch(
+                    np.array([self.curr_delta]), x_adv[None], original_sample[None], self.sample_size
+                )[0]
+                potential_advs = x_adv + perturbations
+                potential_advs = np.clip(potential_advs, clip_min, clip_max)
 
                 preds = np.argmax(
-                    self.estimator.predict(np.array(potential_advs), batch_size=self.batch_size),
+                    self.estimator.predict(potential_advs, batch_size=self.batch_size),
                     axis=1,
                 )
 
@@ -285,7 +302,7 @@ class BoundaryAttack(EvasionAttack):
                     self.curr_delta /= self.step_adapt
 
                 if delta_ratio > 0:
-                    x_advs = np.array(potential_advs)[np.where(satisfied)[0]]
+                    x_advs = potential_advs[np.where(satisfied)[0]]
                     break
             else:
                 logger.warning("Adversarial example found but not optimal.")
@@ -327,35 +344,39 @@ class BoundaryAttack(EvasionAttack):
 
         return x_adv
 
-    def _orthogonal_perturb(self, delta: float, current_sample: np.ndarray, original_sample: np.ndarray) -> np.ndarray:
+    def _orthogonal_perturb_batch(
+        self, delta: np.ndarray, current_samples: np.ndarray, original_samples: np.ndarray, nb_perturbations: int
+    ) -> np.ndarray:
         """
-        Create an orthogonal perturbation.
+        Create orthogonal perturbations for a batch of examples at once.
 
-        :param delta: Initial step size for the orthogonal step.
-        :param current_sample: Current adversarial example.
-        :param original_sample: The original input.
-        :return: a possible perturbation.
+        :param delta: Step sizes for the orthogonal step, one per example.
+        :param current_samples: Current adversarial examples.
+        :param original_samples: The original inputs.
+        :param nb_perturbations: Number of perturbations per example.
+        :return: Possible perturbations of shape `(nb_samples, nb_perturbations, input_shape)`.
         """
-        # Generate perturbation randomly
-        perturb = np.random.randn(*self.estimator.input_shape).astype(ART_NUMPY_DTYPE)
-
-        # Rescale the perturbation
-        perturb /= np.linalg.norm(perturb)
-        perturb *= delta * np.linalg.norm(original_sample - current_sample)
+        nb_samples = current_samples.shape[0]
+        delta = delta.reshape(nb_samples, 1, 1)
 
-        # Project the perturbation onto sphere
-        direction = original_sample - current_sample
+        # Generate perturbations randomly
+        perturb = np.random.randn(nb_samples, nb_perturbations, *current_samples.shape[1:]).astype(ART_NUMPY_DTYPE)
+        perturb = perturb.reshape(nb_samples, nb_perturbations, -1)
 
-        direction_flat = direction.flatten()
-        perturb_flat = perturb.flatten()
+        # Rescale the perturbations
+        direction = (original_samples - current_samples).reshape(nb_samples, 1, -1)
+        direction_norm = np.linalg.norm(direction, axis=2, keepdims=True)
+        perturb /= np.linalg.norm(perturb, axis=2, keepdims=True)
+        perturb *= delta * direction_norm
 
-        direction_flat /= np.linalg.norm(direction_flat)
-        perturb_flat -= np.dot(perturb_flat, direction_flat.T) * direction_flat
-        perturb = perturb_flat.reshape(self.estimator.input_shape)
+        # Project the perturbations onto sphere
+        direction = direction / direction_norm
+        perturb -= np.sum(perturb * direction, axis=2, keepdims=True) * direction
 
         hypotenuse = np.sqrt(1 + delta ** 2)
-        perturb = ((1 - hypotenuse) * (current_sample - original_sample) + perturb) / hypotenuse
-        return perturb
+        perturb += (1 - hypotenuse) * (current_samples - original_samples).reshape(nb_samples, 1, -1)
+        perturb /= hypotenuse
+        return perturb.reshape((nb_samples, nb_perturbations) + current_samples.shape[1:]).astype(ART_NUMPY_DTYPE)
 
     def _init_sample(
         self,
@@ -430,6 +451,264 @@ class BoundaryAttack(EvasionAttack):
 
         return initial_sample
 
+    def _perturb_batch(
+        self,
+        x: np.ndarray,
+        y: Optional[np.ndarray],
+        y_p: np.ndarray,
+        init_preds: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
+        clip_min: float,
+        clip_max: float,
+    ) -> np.ndarray:
+        """
+        Internal attack function for all examples at once.
+
+        :param x: An array with the original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_preds: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: The adversarial examples.
+        """
+        x_adv = x.copy()
+        targets = y if self.targeted else y_p
+
+        # First, create initial adversarial samples
+        initial_samples, found = self._init_sample_batch(x, targets, y_p, init_preds, adv_init, clip_min, clip_max)
+
+        # Examples without initial adversarial sample keep their original value
+        idx = np.where(found)[0]
+        if idx.size == 0:
+            return x_adv
+
+        # Run the boundary attack on all examples with an initial adversarial sample
+        x_adv[idx] = self._attack_batch(
+            initial_samples=initial_samples[idx],
+            original_samples=x[idx],
+            y_p=y_p[idx],
+            targets=targets[idx],
+            clip_min=clip_min,
+            clip_max=clip_max,
+        )
+
+        return x_adv
+
+    def _attack_batch(
+        self,
+        initial_samples: np.ndarray,
+        original_samples: np.ndarray,
+        y_p: np.ndarray,
+        targets: np.ndarray,
+        clip_min: float,
+        clip_max: float,
+    ) -> np.ndarray:
+        """
+        Main function for the boundary attack on a batch of examples with per-example step sizes.
+
+        :param initial_samples: Initial adversarial examples.
+        :param original_samples: The original inputs.
+        :param y_p: The predicted labels of the original inputs.
+        :param targets: The target labels.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: The adversarial examples.
+        """
+        # Get initialization for some variables
+        nb_samples = initial_samples.shape[0]
+        x_adv = initial_samples.copy()
+        curr_delta = np.full(nb_samples, self.delta)
+        curr_epsilon = np.full(nb_samples, self.epsilon)
+        broadcast_shape = (-1, 1) + (1,) * (x_adv.ndim - 1)
+
+        # Examples are retired once their trust region search fails or their step size falls below `min_epsilon`
+        active = np.ones(nb_samples, dtype=bool)
+
+        # Main loop to wander around the boundary
+        for _ in trange(self.max_iter, desc="Boundary attack - iterations", disable=not self.verbose):
+            if not np.any(active):
+                break
+
+            # Trust region method to adjust delta
+            x_advs = np.zeros((nb_samples, self.sample_size) + x_adv.shape[1:], dtype=x_adv.dtype)
+            x_advs_valid = np.zeros((nb_samples, self.sample_size), dtype=bool)
+            searching = active.copy()
+
+            for _ in range(self.num_trial):
+                idx = np.where(searching)[0]
+                if idx.size == 0:
+                    break
+
+                potential_advs = x_adv[idx, None] + self._orthogonal_perturb_batch(
+                    curr_delta[idx], x_adv[idx], original_samples[idx], self.sample_size
+                )
+                potential_advs = np.clip(potential_advs, clip_min, clip_max)
+
+                satisfied = self._adversarial_satisfactory_batch(
+                    potential_advs, np.ones(potential_advs.shape[:2], dtype=bool), y_p[idx], targets[idx]
+                )
+                delta_ratio = np.mean(satisfied, axis=1)
+
+                curr_delta[idx] = np.where(delta_ratio < 0.2, curr_delta[idx] * self.step_adapt, curr_delta[idx])
+                curr_delta[idx] = np.where(delta_ratio > 0.5, curr_delta[idx] / self.step_adapt, curr_delta[idx])
+
+                found = delta_ratio > 0
+                x_advs[idx[found]] = potential_advs[found]
+                x_advs_valid[idx[found]] = satisfied[found]
+                searching[idx[found]] = False
+
+            if np.any(searching):
+                logger.warning("Adversarial example found but not optimal for %d examples.", np.sum(searching))
+                active[searching] = False
+
+            # Trust region method to adjust epsilon
+            searching = active.copy()
+
+            for _ in range(self.num_trial):
+                idx = np.where(searching)[0]
+                if idx.size == 0:
+                    break
+
+                perturb = (original_samples[idx, None] - x_advs[idx]) * curr_epsilon[idx].reshape(broadcast_shape)
+                potential_advs = np.clip(x_advs[idx] + perturb, clip_min, clip_max)
+
+                satisfied = self._adversarial_satisfactory_batch(
+                    potential_advs, x_advs_valid[idx], y_p[idx], targets[idx]
+                )
+                epsilon_ratio = np.sum(satisfied, axis=1) / np.sum(x_advs_valid[idx], axis=1)
+
+                curr_epsilon[idx] = np.where(
+                    epsilon_ratio < 0.2, curr_epsilon[idx] * self.step_adapt, curr_epsilon[idx]
+                )
+                curr_epsilon[idx] = np.where(
+                    epsilon_ratio > 0.5, curr_epsilon[idx] / self.step_adapt, curr_epsilon[idx]
+                )
+
+                found = epsilon_ratio > 0
+                x_adv[idx[found]] = self._best_adv_batch(
+                    original_samples[idx[found]], potential_advs[found], satisfied[found]
+                )
+                searching[idx[found]] = False
+
+            if np.any(searching):
+                logger.warning("Adversarial example found but not optimal for %d examples.", np.sum(searching))
+                idx = np.where(searching)[0]
+                x_adv[idx] = self._best_adv_batch(original_samples[idx], x_advs[idx], x_advs_valid[idx])
+                active[searching] = False
+
+            if self.min_epsilon is not None:
+                active &= curr_epsilon >= self.min_epsilon
+
+        return x_adv
+
+    def _adversarial_satisfactory_batch(
+        self, samples: np.ndarray, valid: np.ndarray, y_p: np.ndarray, targets: np.ndarray
+    ) -> np.ndarray:
+        """
+        Check which candidates are adversarial, evaluating all valid candidates with one call to `predict`.
+
+        :param samples: Candidates of shape `(nb_samples, nb_candidates, input_shape)`.
+        :param valid: Boolean array of shape `(nb_samples, nb_candidates)` marking the candidates to evaluate.
+        :param y_p: The predicted labels of the original inputs.
+        :param targets: The target labels.
+        :return: Boolean array of shape `(nb_samples, nb_candidates)`, false for all candidates that are not valid.
+        """
+        satisfied = np.zeros(valid.shape, dtype=bool)
+        preds = np.argmax(self.estimator.predict(samples[valid], batch_size=self.batch_size), axis=1)
+
+        if self.targeted:
+            satisfied[valid] = preds == np.broadcast_to(targets[:, None], valid.shape)[valid]
+        else:
+            satisfied[valid] = preds != np.broadcast_to(y_p[:, None], valid.shape)[valid]
+
+        return satisfied
+
+    def _init_sample_batch(
+        self,
+        x: np.ndarray,
+        targets: np.ndarray,
+        y_p: np.ndarray,
+        init_preds: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
+        clip_min: float,
+        clip_max: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find initial adversarial examples for all inputs at once.
+
+        :param x: An array with the original inputs to be attacked.
+        :param targets: The target labels for a targeted attack or the predicted labels of x otherwise.
+        :param y_p: The predicted labels of x.
+        :param init_preds: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: A tuple of the initial adversarial examples and a boolean array indicating which were found.
+        """
+        nprd = np.random.RandomState()
+        initial_samples = x.copy()
+        found = np.zeros(x.shape[0], dtype=bool)
+
+        if self.targeted:
+            # Attack already satisfied
+            pending = targets != y_p
+        else:
+            pending = np.ones(x.shape[0], dtype=bool)
+
+        # Use the initial images that already satisfy the attack
+        if adv_init is not None and init_preds is not None:
+            if self.targeted:
+                use_init = pending & (init_preds == targets)
+            else:
+                use_init = init_preds != y_p
+
+            initial_samples[use_init] = adv_init[use_init]
+            found[use_init] = True
+            pending[use_init] = False
+
+        # Draw random images for all pending examples at once
+        for _ in range(self.init_size):
+            idx = np.where(pending)[0]
+            if idx.size == 0:
+                break
+
+            random_imgs = nprd.uniform(clip_min, clip_max, size=x[idx].shape).astype(x.dtype)
+            satisfied = self._adversarial_satisfactory_batch(
+                random_imgs[:, None], np.ones((idx.size, 1), dtype=bool), y_p[idx], targets[idx]
+            )[:, 0]
+
+            initial_samples[idx[satisfied]] = random_imgs[satisfied]
+            found[idx[satisfied]] = True
+            pending[idx[satisfied]] = False
+
+        if np.any(pending):
+            logger.warning(
+                "Failed to draw a random image that is adversarial for %d examples, attack failed for them.",
+                np.sum(pending),
+            )
+
+        return initial_samples, found
+
+    @staticmethod
+    def _best_adv_batch(original_samples: np.ndarray, potential_advs: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """
+        For each example, find the valid potential adversarial example with minimum L2 distance from the original.
+
+        :param original_samples: The original inputs.
+        :param potential_advs: Array of shape `(nb_samples, nb_candidates, input_shape)` with the potential
+                               adversarial examples.
+        :param valid: Boolean array of shape `(nb_samples, nb_candidates)` marking the candidates to consider.
+        :return: The adversarial examples that have the minimum L2 distance from the original inputs.
+        """
+        shape = potential_advs.shape
+        nb_features = int(np.prod(shape[2:]))
+        diff = original_samples.reshape(shape[0], 1, nb_features) - potential_advs.reshape(shape[0], shape[1], -1)
+        dist = np.linalg.norm(diff, axis=2)
+        min_idx = np.where(valid, dist, np.inf).argmin(axis=1)
+        return potential_advs[np.arange(shape[0]), min_idx]
+
     @staticmethod
     def _best_adv(original_sample: np.ndarray, potential_advs: np.ndarray) -> np.ndarray:
         """
@@ -468,5 +747,8 @@ class BoundaryAttack(EvasionAttack):
         if self.min_epsilon is not None and (isinstance(self.min_epsilon, float) or self.min_epsilon <= 0):
             raise ValueError("The minimum epsilon must be a positive float.")
 
+        if not isinstance(self.batched, bool):
+            raise ValueError("The argument `batched` has to be of type bool.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -27,7 +27,7 @@ import logging
 from typing import Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
-from tqdm.auto import tqdm
+from tqdm.auto import tqdm, trange
 
 from art.config import ART_NUMPY_DTYPE
 from art.attacks.attack import EvasionAttack
@@ -58,6 +58,8 @@ class HopSkipJump(EvasionAttack):
         "init_size",
         "curr_iter",
         "batch_size",
+        "batched",
+        "max_probes",
         "verbose",
     ]
     _estimator_requirements = (BaseEstimator, ClassifierMixin)
@@ -72,6 +74,8 @@ class HopSkipJump(EvasionAttack):
         max_eval: int = 10000,
         init_eval: int = 100,
         init_size: int = 100,
+        batched: bool = False,
+        max_probes: int = 10000,
         verbose: bool = True,
     ) -> None:
         """
@@ -85,6 +89,12 @@ class HopSkipJump(EvasionAttack):
         :param max_eval: Maximum number of evaluations for estimating gradient.
         :param init_eval: Initial number of evaluations for estimating gradient.
         :param init_size: Maximum number of trials for initial generation of adversarial examples.
+        :param batched: Advance all samples in lockstep instead of attacking them one at a time. The queries of all
+                        active samples are concatenated into single calls to `predict` and samples are retired as soon
+                        as their binary or step-size searches have converged.
+        :param max_probes: Maximum number of probes evaluated in one call to `predict` when estimating the gradients
+                           in batched mode. The examples are split into chunks of at most `max_probes // num_eval`
+                           examples, but at least one example.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=classifier)
@@ -96,6 +106,8 @@ class HopSkipJump(EvasionAttack):
         self.init_size = init_size
         self.curr_iter = 0
         self.batch_size = batch_size
+        self.batched = batched
+        self.max_probes = max_probes
         self.verbose = verbose
         self._check_params()
         self.curr_iter = 0
@@ -180,32 +192,45 @@ class HopSkipJump(EvasionAttack):
             y = np.argmax(y, axis=1)
 
         # Generate the adversarial samples
-        for ind, val in enumerate(tqdm(x_adv, desc="HopSkipJump", disable=not self.verbose)):
+        if self.batched:
             self.curr_iter = start
+            x_adv = self._perturb_batch(
+                x=x_adv,
+                y=y,
+                y_p=preds,
+                init_preds=init_preds if kwargs.get("x_adv_init") is not None else None,
+                adv_init=x_adv_init if kwargs.get("x_adv_init") is not None else None,
+                mask=mask if kwargs.get("mask") is not None else None,
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
+        else:
+            for ind, val in enumerate(tqdm(x_adv, desc="HopSkipJump", disable=not self.verbose)):
+                self.curr_iter = start
+
+                if self.targeted:
+                    x_adv[ind] = self._perturb(
+                        x=val,
+                        y=y[ind],
+                        y_p=preds[ind],
+                        init_pred=init_preds[ind],
+                        adv_init=x_adv_init[ind],
+                        mask=mask[ind],
+                        clip_min=clip_min,
+                        clip_max=clip_max,
+                    )
 
-            if self.targeted:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=y[ind],
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    mask=mask[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
-
-            else:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=-1,
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    mask=mask[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
+                else:
+                    x_adv[ind] = self._perturb(
+                        x=val,
+                        y=-1,
+                        y_p=preds[ind],
+                        init_pred=init_preds[ind],
+                        adv_init=x_adv_init[ind],
+                        mask=mask[ind],
+                        clip_min=clip_min,
+                        clip_max=clip_max,
+                    )
 
         if y is not None:
             y = to_categorical(y, self.estimator.nb_classes)
@@ -614,13 +639,13 @@ class HopSkipJump(EvasionAttack):
         return result
 
     def _adversarial_satisfactory(
-        self, samples: np.ndarray, target: int, clip_min: float, clip_max: float
+        self, samples: np.ndarray, target: Union[int, np.ndarray], clip_min: float, clip_max: float
     ) -> np.ndarray:
         """
         Check whether an image is adversarial.
 
         :param samples: A batch of examples.
-        :param target: The target label.
+        :param target: The target label, or an array with one target label per example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
         :return: An array of 0/1.
@@ -637,14 +662,17 @@ class HopSkipJump(EvasionAttack):
 
     @staticmethod
     def _interpolate(
-        current_sample: np.ndarray, original_sample: np.ndarray, alpha: float, norm: Union[int, float, str]
+        current_sample: np.ndarray,
+        original_sample: np.ndarray,
+        alpha: Union[float, np.ndarray],
+        norm: Union[int, float, str],
     ) -> np.ndarray:
         """
         Interpolate a new sample based on the original and the current samples.
 
         :param current_sample: Current adversarial example.
         :param original_sample: The original input.
-        :param alpha: The coefficient of interpolation.
+        :param alpha: The coefficient of interpolation, or an array of coefficients broadcastable to the samples.
         :param norm: Order of the norm. Possible values: "inf", np.inf or 2.
         :return: An adversarial example.
         """
@@ -655,6 +683,416 @@ class HopSkipJump(EvasionAttack):
 
         return result
 
+    def _perturb_batch(
+        self,
+        x: np.ndarray,
+        y: Optional[np.ndarray],
+        y_p: np.ndarray,
+        init_preds: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
+        mask: Optional[np.ndarray],
+        clip_min: float,
+        clip_max: float,
+    ) -> np.ndarray:
+        """
+        Internal attack function advancing all examples in lockstep.
+
+        :param x: An array with the original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_preds: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
+        :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be the same
+                     as x. Any features for which the mask is zero will not be adversarially perturbed.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: The adversarial examples.
+        """
+        x_adv = x.copy()
+        targets = y if self.targeted else y_p
+
+        # First, create initial adversarial samples
+        initial_samples, found = self._init_sample_batch(
+            x, targets, y_p, init_preds, adv_init, mask, clip_min, clip_max
+        )
+
+        # Examples without initial adversarial sample keep their original value
+        idx = np.where(found)[0]
+        if idx.size == 0:
+            return x_adv
+
+        # Run the HopSkipJump attack on all examples with an initial adversarial sample
+        x_adv[idx] = self._attack_batch(
+            initial_samples=initial_samples[idx],
+            original_samples=x[idx],
+            targets=targets[idx],
+            mask=mask[idx] if mask is not None else None,
+            clip_min=clip_min,
+            clip_max=clip_max,
+        )
+
+        return x_adv
+
+    def _init_sample_batch(
+        self,
+        x: np.ndarray,
+        targets: np.ndarray,
+        y_p: np.ndarray,
+        init_preds: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
+        mask: Optional[np.ndarray],
+        clip_min: float,
+        clip_max: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find initial adversarial examples for all inputs at once.
+
+        :param x: An array with the original inputs to be attacked.
+        :param targets: The target labels for a targeted attack or the predicted labels of x otherwise.
+        :param y_p: The predicted labels of x.
+        :param init_preds: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
+        :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be the same
+                     as x. Any features for which the mask is zero will not be adversarially perturbed.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: A tuple of the initial adversarial examples and a boolean array indicating which were found.
+        """
+        nprd = np.random.RandomState()
+        initial_samples = x.copy()
+        found = np.zeros(x.shape[0], dtype=bool)
+
+        if self.targeted:
+            # Attack already satisfied
+            pending = targets != y_p
+        else:
+            pending = np.ones(x.shape[0], dtype=bool)
+
+        # Use the initial images that already satisfy the attack
+        if adv_init is not None and init_preds is not None:
+            if self.targeted:
+                use_init = pending & (init_preds == targets)
+            else:
+                use_init = init_preds != y_p
+
+            initial_samples[use_init] = adv_init[use_init]
+            found[use_init] = True
+            pending[use_init] = False
+
+        # Draw random images for all pending examples at once
+        from_random = np.zeros(x.shape[0], dtype=bool)
+        for _ in range(self.init_size):
+            idx = np.where(pending)[0]
+            if idx.size == 0:
+                break
+
+            random_imgs = nprd.uniform(clip_min, clip_max, size=x[idx].shape).astype(x.dtype)
+
+            if mask is not None:
+                random_imgs = random_imgs * mask[idx] + x[idx] * (1 - mask[idx])
+
+            satisfied = self._adversarial_satisfactory(
+                samples=random_imgs, target=targets[idx], clip_min=clip_min, clip_max=clip_max
+            )
+            initial_samples[idx[satisfied]] = random_imgs[satisfied]
+            from_random[idx[satisfied]] = True
+            pending[idx[satisfied]] = False
+
+        if np.any(pending):
+            logger.warning(
+                "Failed to draw a random image that is adversarial for %d examples, attack failed for them.",
+                np.sum(pending),
+            )
+
+        # Binary search to reduce the l2 distance to the original images
+        idx = np.where(from_random)[0]
+        if idx.size > 0:
+            initial_samples[idx] = self._binary_search_batch(
+                current_samples=initial_samples[idx],
+                original_samples=x[idx],
+                targets=targets[idx],
+                norm=2,
+                clip_min=clip_min,
+                clip_max=clip_max,
+                threshold=0.001,
+            )
+            found[idx] = True
+
+        return initial_samples, found
+
+    def _attack_batch(
+        self,
+        initial_samples: np.ndarray,
+        original_samples: np.ndarray,
+        targets: np.ndarray,
+        mask: Optional[np.ndarray],
+        clip_min: float,
+        clip_max: float,
+    ) -> np.ndarray:
+        """
+        Main function for the boundary attack on a batch of examples.
+
+        :param initial_samples: Initial adversarial examples.
+        :param original_samples: The original inputs.
+        :param targets: The target labels.
+        :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be the same
+                     as the inputs. Any features for which the mask is zero will not be adversarially perturbed.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: The adversarial examples.
+        """
+        # Set current perturbed images to the initial images
+        current_samples = initial_samples
+        nb_samples = current_samples.shape[0]
+        sample_axes = tuple(range(1, current_samples.ndim))
+        broadcast_shape = (nb_samples,) + (1,) * (current_samples.ndim - 1)
+
+        # Main loop to wander around the boundary
+        for _ in trange(self.max_iter, desc="HopSkipJump", disable=not self.verbose):
+            # First compute delta
+            delta = self._compute_delta_batch(
+                current_samples=current_samples,
+                original_samples=original_samples,
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
+
+            # Then run binary search
+            current_samples = self._binary_search_batch(
+                current_samples=current_samples,
+                original_samples=original_samples,
+                targets=targets,
+                norm=self.norm,
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
+
+            # Next compute the number of evaluations and compute the update
+            num_eval = min(int(self.init_eval * np.sqrt(self.curr_iter + 1)), self.max_eval)
+
+            update = self._compute_update_batch(
+                current_samples=current_samples,
+                num_eval=num_eval,
+                delta=delta,
+                targets=targets,
+                mask=mask,
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
+
+            # Finally run step size search by first computing epsilon
+            if self.norm == 2:
+                dist = np.sqrt(np.sum((original_samples - current_samples) ** 2, axis=sample_axes))
+            else:
+                dist = np.max(abs(original_samples - current_samples), axis=sample_axes)
+
+            epsilon = 2.0 * dist / np.sqrt(self.curr_iter + 1)
+            potential_samples = current_samples.copy()
+            success = np.zeros(nb_samples, dtype=bool)
+
+            # Only query the examples whose step size search has not yet succeeded
+            while not np.all(success):
+                idx = np.where(~success)[0]
+                epsilon[idx] /= 2.0
+                potential_samples[idx] = current_samples[idx] + epsilon.reshape(broadcast_shape)[idx] * update[idx]
+                success[idx] = self._adversarial_satisfactory(
+                    samples=potential_samples[idx],
+                    target=targets[idx],
+                    clip_min=clip_min,
+                    clip_max=clip_max,
+                )
+
+            # Update current samples
+            current_samples = np.clip(potential_samples, clip_min, clip_max)
+
+            # Update current iteration
+            self.curr_iter += 1
+
+        return current_samples
+
+    def _binary_search_batch(
+        self,
+        current_samples: np.ndarray,
+        original_samples: np.ndarray,
+        targets: np.ndarray,
+        norm: Union[int, float, str],
+        clip_min: float,
+        clip_max: float,
+        threshold: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Binary search to approach the boundary for a batch of examples.
+
+        :param current_samples: Current adversarial examples.
+        :param original_samples: The original inputs.
+        :param targets: The target labels.
+        :param norm: Order of the norm. Possible values: "inf", np.inf or 2.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :param threshold: The upper threshold in binary search.
+        :return: The adversarial examples.
+        """
+        nb_samples = current_samples.shape[0]
+        broadcast_shape = (nb_samples,) + (1,) * (current_samples.ndim - 1)
+
+        # First set upper and lower bounds as well as the thresholds for the binary search
+        lower_bound = np.zeros(nb_samples)
+        if norm == 2:
+            upper_bound = np.ones(nb_samples)
+
+            if threshold is None:
+                threshold = self.theta
+
+            thresholds = np.full(nb_samples, threshold)
+
+        else:
+            upper_bound = np.max(
+                abs(original_samples - current_samples), axis=tuple(range(1, current_samples.ndim))
+            ).astype(np.float64)
+
+            if threshold is None:
+                thresholds = np.minimum(upper_bound * self.theta, self.theta)
+            else:
+                thresholds = np.full(nb_samples, threshold)
+
+        # Then start the binary search, querying only the examples that have not yet converged
+        active = (upper_bound - lower_bound) > thresholds
+        while np.any(active):
+            idx = np.where(active)[0]
+
+            # Interpolation points
+            alpha = (upper_bound[idx] + lower_bound[idx]) / 2.0
+            interpolated_samples = self._interpolate(
+                current_sample=current_samples[idx],
+                original_sample=original_samples[idx],
+                alpha=alpha.reshape((-1,) + broadcast_shape[1:]),
+                norm=norm,
+            )
+
+            # Update upper_bound and lower_bound
+            satisfied = self._adversarial_satisfactory(
+                samples=interpolated_samples,
+                target=targets[idx],
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
+            lower_bound[idx] = np.where(satisfied == 0, alpha, lower_bound[idx])
+            upper_bound[idx] = np.where(satisfied == 1, alpha, upper_bound[idx])
+
+            active = (upper_bound - lower_bound) > thresholds
+
+        result = self._interpolate(
+            current_sample=current_samples,
+            original_sample=original_samples,
+            alpha=upper_bound.reshape(broadcast_shape),
+            norm=norm,
+        )
+
+        return result.astype(current_samples.dtype)
+
+    def _compute_delta_batch(
+        self,
+        current_samples: np.ndarray,
+        original_samples: np.ndarray,
+        clip_min: float,
+        clip_max: float,
+    ) -> np.ndarray:
+        """
+        Compute the delta parameter for a batch of examples.
+
+        :param current_samples: Current adversarial examples.
+        :param original_samples: The original inputs.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: Delta values.
+        """
+        if self.curr_iter == 0:
+            return np.full(current_samples.shape[0], 0.1 * (clip_max - clip_min))
+
+        sample_axes = tuple(range(1, current_samples.ndim))
+        if self.norm == 2:
+            dist = np.sqrt(np.sum((original_samples - current_samples) ** 2, axis=sample_axes))
+            delta = np.sqrt(np.prod(self.estimator.input_shape)) * self.theta * dist
+        else:
+            dist = np.max(abs(original_samples - current_samples), axis=sample_axes)
+            delta = np.prod(self.estimator.input_shape) * self.theta * dist
+
+        return delta
+
+    def _compute_update_batch(
+        self,
+        current_samples: np.ndarray,
+        num_eval: int,
+        delta: np.ndarray,
+        targets: np.ndarray,
+        mask: Optional[np.ndarray],
+        clip_min: float,
+        clip_max: float,
+    ) -> np.ndarray:
+        """
+        Compute the update in Eq.(14) for a batch of examples, evaluating the probes of up to `max_probes // num_eval`
+        examples with a single call to `predict`.
+
+        :param current_samples: Current adversarial examples.
+        :param num_eval: The number of evaluations for estimating gradient.
+        :param delta: The sizes of random perturbation.
+        :param targets: The target labels.
+        :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be the same
+                     as the inputs. Any features for which the mask is zero will not be adversarially perturbed.
+        :param clip_min: Minimum value of an example.
+        :param clip_max: Maximum value of an example.
+        :return: The updated perturbations.
+        """
+        input_shape = list(current_samples.shape[1:])
+        noise_axes = tuple(range(2, len(input_shape) + 2))
+        chunk_size = max(1, self.max_probes // num_eval)
+        result = np.zeros_like(current_samples)
+
+        for begin in range(0, current_samples.shape[0], chunk_size):
+            chunk = slice(begin, begin + chunk_size)
+            samples_chunk = current_samples[chunk]
+            nb_samples = samples_chunk.shape[0]
+
+            # Generate random noise of shape (nb_samples, num_eval, input_shape)
+            rnd_noise_shape = [nb_samples, num_eval] + input_shape
+            if self.norm == 2:
+                rnd_noise = np.random.randn(*rnd_noise_shape).astype(ART_NUMPY_DTYPE)
+            else:
+                rnd_noise = np.random.uniform(low=-1, high=1, size=rnd_noise_shape).astype(ART_NUMPY_DTYPE)
+
+            # With mask
+            if mask is not None:
+                rnd_noise = rnd_noise * mask[chunk, None]
+
+            # Normalize random noise to fit into the range of input data
+            rnd_noise = rnd_noise / np.sqrt(np.sum(rnd_noise ** 2, axis=noise_axes, keepdims=True))
+            delta_chunk = delta[chunk].reshape([nb_samples, 1] + [1] * len(input_shape))
+            eval_samples = np.clip(samples_chunk[:, None] + delta_chunk * rnd_noise, clip_min, clip_max)
+            rnd_noise = (eval_samples - samples_chunk[:, None]) / delta_chunk
+
+            # Evaluate the probes of all examples of the chunk together
+            satisfied = self._adversarial_satisfactory(
+                samples=eval_samples.reshape([-1] + input_shape),
+                target=np.repeat(targets[chunk], num_eval),
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
+            f_val = 2 * satisfied.reshape([nb_samples, num_eval] + [1] * len(input_shape)) - 1.0
+            f_val = f_val.astype(ART_NUMPY_DTYPE)
+
+            # Compute gradient, falling back to the mean noise direction if all probes agree
+            f_mean = np.mean(f_val, axis=1, keepdims=True)
+            f_val = np.where(np.abs(f_mean) == 1.0, f_mean, f_val - f_mean)
+            grad = np.mean(f_val * rnd_noise, axis=1)
+
+            # Compute update
+            if self.norm == 2:
+                result[chunk] = grad / np.sqrt(np.sum(grad ** 2, axis=tuple(range(1, grad.ndim)), keepdims=True))
+            else:
+                result[chunk] = np.sign(grad)
+
+        return result
+
     def _check_params(self) -> None:
         # Check if order of the norm is acceptable given current implementation
         if self.norm not in [2, np.inf, "inf"]:
@@ -675,5 +1113,11 @@ class HopSkipJump(EvasionAttack):
         if not isinstance(self.init_size, (int, np.int)) or self.init_size <= 0:
             raise ValueError("The number of initial trials must be a positive integer.")
 
+        if not isinstance(self.batched, bool):
+            raise ValueError("The argument `batched` has to be of type bool.")
+
+        if not isinstance(self.max_probes, (int, np.int)) or self.max_probes <= 0:
+            raise ValueError("The maximum number of probes must be a positive integer.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
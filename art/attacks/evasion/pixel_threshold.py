@@ -44,7 +44,7 @@ from six import string_types
 from scipy._lib._util import check_random_state
 from scipy.optimize.optimize import _status_message
 from scipy.optimize import OptimizeResult, minimize
-from tqdm.auto import tqdm
+from tqdm.auto import tqdm, trange
 
 from art.attacks.attack import EvasionAttack
 from art.estimators.estimator import BaseEstimator, NeuralNetworkMixin
@@ -68,7 +68,7 @@ class PixelThreshold(EvasionAttack):
         https://arxiv.org/abs/1906.06026
     """
 
-    attack_params = EvasionAttack.attack_params + ["th", "es", "targeted", "verbose"]
+    attack_params = EvasionAttack.attack_params + ["th", "es", "targeted", "batch_size", "verbose"]
     _estimator_requirements = (BaseEstimator, NeuralNetworkMixin, ClassifierMixin)
 
     def __init__(
@@ -78,6 +78,7 @@ class PixelThreshold(EvasionAttack):
         es: int,
         targeted: bool,
         verbose: bool = True,
+        batch_size: int = 1,
     ) -> None:
         """
         Create a :class:`.PixelThreshold` instance.
@@ -87,6 +88,8 @@ class PixelThreshold(EvasionAttack):
         :param es: Indicates whether the attack uses CMAES (0) or DE (1) as Evolutionary Strategy.
         :param targeted: Indicates whether the attack is targeted (True) or untargeted (False).
         :param verbose: Print verbose messages of ES and show progress bars.
+        :param batch_size: Number of images attacked concurrently with DE (`es=1`). The populations of all images in
+                           a batch are evaluated with a single call to `predict` per generation.
         """
         super().__init__(estimator=classifier)
 
@@ -96,6 +99,7 @@ class PixelThreshold(EvasionAttack):
         self.es = es  # pylint: disable=C0103
         self._targeted = targeted
         self.verbose = verbose
+        self.batch_size = batch_size
         PixelThreshold._check_params(self)
 
         if self.estimator.channels_first:
@@ -118,6 +122,12 @@ class PixelThreshold(EvasionAttack):
         if not isinstance(self.targeted, bool):
             raise ValueError("The flag `targeted` has to be of type bool.")
 
+        if not isinstance(self.batch_size, int) or self.batch_size <= 0:
+            raise ValueError("The batch size `batch_size` has to be a positive integer.")
+
+        if self.batch_size > 1 and self.es != 1:
+            raise ValueError("Attacking images in batches (`batch_size` > 1) requires DE as strategy (`es=1`).")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The flag `verbose` has to be of type bool.")
 
@@ -156,33 +166,36 @@ class PixelThreshold(EvasionAttack):
         if scale_input:
             x = x * 255.0
 
-        adv_x_best = []
-        for image, target_class in tqdm(zip(x, y), desc="Pixel threshold", disable=not self.verbose):
-            if self.th is None:
-                self.min_th = 127
-                start, end = 1, 127
-                while True:
-                    image_result: Union[List[np.ndarray], np.ndarray] = []
-                    threshold = (start + end) // 2
-                    success, trial_image_result = self._attack(image, target_class, threshold, max_iter)
-                    if image_result or success:
-                        image_result = trial_image_result
-                    if success:
-                        end = threshold - 1
-                    else:
-                        start = threshold + 1
-                    if success:
-                        self.min_th = threshold
-                    if end < start:
-                        if isinstance(image_result, list) and not image_result:
-                            # success = False
-                            image_result = image
-                        break
-            else:
-                success, image_result = self._attack(image, target_class, self.th, max_iter)
-            adv_x_best += [image_result]
+        if self.batch_size > 1:
+            adv_x_best_array = self._generate_batch(x, y, max_iter)
+        else:
+            adv_x_best = []
+            for image, target_class in tqdm(zip(x, y), desc="Pixel threshold", disable=not self.verbose):
+                if self.th is None:
+                    self.min_th = 127
+                    start, end = 1, 127
+                    while True:
+                        image_result: Union[List[np.ndarray], np.ndarray] = []
+                        threshold = (start + end) // 2
+                        success, trial_image_result = self._attack(image, target_class, threshold, max_iter)
+                        if image_result or success:
+                            image_result = trial_image_result
+                        if success:
+                            end = threshold - 1
+                        else:
+                            start = threshold + 1
+                        if success:
+                            self.min_th = threshold
+                        if end < start:
+                            if isinstance(image_result, list) and not image_result:
+                                # success = False
+                                image_result = image
+                            break
+                else:
+                    success, image_result = self._attack(image, target_class, self.th, max_iter)
+                adv_x_best += [image_result]
 
-        adv_x_best_array = np.array(adv_x_best)
+            adv_x_best_array = np.array(adv_x_best)
 
         if scale_input:
             adv_x_best_array = adv_x_best_array / 255.0
@@ -200,23 +213,15 @@ class PixelThreshold(EvasionAttack):
         """
         Define the bounds for the image `img` within the limits `limit`.
         """
+        initial = list(img.reshape(-1))
+        min_bounds = np.clip(img.reshape(-1) - limit, 0, 255)
+        max_bounds = np.clip(img.reshape(-1) + limit, 0, 255)
 
-        def bound_limit(value):
-            return np.clip(value - limit, 0, 255), np.clip(value + limit, 0, 255)
-
-        minbounds, maxbounds, bounds, initial = [], [], [], []
-
-        for i, j, k in product(range(img.shape[-3]), range(img.shape[-2]), range(img.shape[-1])):
-            temp = img[i, j, k]
-            initial += [temp]
-            bound = bound_limit(temp)
-            if self.es == 0:
-                minbounds += [bound[0]]
-                maxbounds += [bound[1]]
-            else:
-                bounds += [bound]
+        bounds: List[list]
         if self.es == 0:
-            bounds = [minbounds, maxbounds]
+            bounds = [list(min_bounds), list(max_bounds)]
+        else:
+            bounds = [list(bound) for bound in zip(min_bounds, max_bounds)]
 
         return bounds, initial
 
@@ -307,6 +312,99 @@ class PixelThreshold(EvasionAttack):
 
         return False, image
 
+    def _generate_batch(self, x: np.ndarray, y: np.ndarray, max_iter: int) -> np.ndarray:
+        """
+        Attack the images `x` in batches of `batch_size` images. For `th=None` the minimal threshold is searched for
+        all images of a batch in parallel and the successful result with the smallest threshold is kept.
+        """
+        adv_x_best = x.copy()
+        nb_batches = int(np.ceil(x.shape[0] / float(self.batch_size)))
+
+        for batch_id in trange(nb_batches, desc="Pixel threshold", disable=not self.verbose):
+            batch_index_1, batch_index_2 = batch_id * self.batch_size, (batch_id + 1) * self.batch_size
+            images = x[batch_index_1:batch_index_2]
+            target_classes = y[batch_index_1:batch_index_2]
+
+            if self.th is None:
+                start = np.ones(len(images), dtype=int)
+                end = np.full(len(images), 127, dtype=int)
+                while np.any(start <= end):
+                    idx = np.where(start <= end)[0]
+                    thresholds = (start[idx] + end[idx]) // 2
+                    success, results = self._attack_batch(images[idx], target_classes[idx], thresholds, max_iter)
+                    adv_x_best[batch_index_1 + idx[success]] = results[success]
+                    end[idx] = np.where(success, thresholds - 1, end[idx])
+                    start[idx] = np.where(success, start[idx], thresholds + 1)
+            else:
+                thresholds = np.full(len(images), self.th, dtype=int)
+                _, adv_x_best[batch_index_1:batch_index_2] = self._attack_batch(
+                    images, target_classes, thresholds, max_iter
+                )
+
+        return adv_x_best
+
+    def _attack_batch(
+        self, images: np.ndarray, target_classes: np.ndarray, limits: np.ndarray, max_iter: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Attack the images `images` with DE, each with its threshold in `limits`. The solvers of all images are advanced
+        in lockstep and the populations of all images still under attack are evaluated with a single call to
+        `predict` per generation. The predictions of the evaluated populations are reused to check whether the best
+        member of each population is successful, which stops the attack of that image.
+
+        :return: A boolean array indicating the successful attacks and an array with the adversarial images (the
+                 original image for unsuccessful attacks).
+        """
+        solvers = []
+        for image, limit in zip(images, limits):
+            bounds, _ = self._get_bounds(image, limit)
+            solvers.append(
+                DifferentialEvolutionSolver(
+                    None,
+                    bounds,
+                    maxiter=max_iter,
+                    popsize=max(1, 400 // len(bounds)),
+                    recombination=1,
+                    atol=-1,
+                    polish=False,
+                )
+            )
+
+        success = np.zeros(len(images), dtype=bool)
+
+        # The first step evaluates the initial populations, every further step a new generation.
+        for _ in range(max_iter + 1):
+            idx = np.where(~success)[0]
+            if idx.size == 0:
+                break
+
+            perturbed = [self._perturb_image(solvers[i].ask(), images[i]) for i in idx]
+            predictions = self.estimator.predict(np.concatenate(perturbed))
+            splits = np.cumsum([len(batch) for batch in perturbed])[:-1]
+
+            for i, preds in zip(idx, np.split(predictions, splits)):
+                energies = preds[:, target_classes[i]]
+                if self.targeted:
+                    energies = 1 - energies
+
+                best_energy = solvers[i].population_energies[0]
+                solvers[i].tell(energies)
+
+                # Only a trial vector replacing the best member can change the outcome of the attack
+                best = np.argmin(energies)
+                if energies[best] < best_energy:
+                    predicted_class = np.argmax(preds[best])
+                    success[i] = bool(
+                        (self.targeted and predicted_class == target_classes[i])
+                        or (not self.targeted and predicted_class != target_classes[i])
+                    )
+
+        adv_x = images.copy()
+        for i in np.where(success)[0]:
+            adv_x[i] = self._perturb_image(solvers[i].x, images[i])[0]
+
+        return success, adv_x
+
 
 class PixelAttack(PixelThreshold):
     """
@@ -327,6 +425,7 @@ class PixelAttack(PixelThreshold):
         es: int = 0,
         targeted: bool = False,
         verbose: bool = False,
+        batch_size: int = 1,
     ) -> None:
         """
         Create a :class:`.PixelAttack` instance.
@@ -336,8 +435,9 @@ class PixelAttack(PixelThreshold):
         :param es: Indicates whether the attack uses CMAES (0) or DE (1) as Evolutionary Strategy.
         :param targeted: Indicates whether the attack is targeted (True) or untargeted (False).
         :param verbose: Indicates whether to print verbose messages of ES used.
+        :param batch_size: Number of images attacked concurrently with DE (`es=1`).
         """
-        super().__init__(classifier, th, es, targeted, verbose)
+        super().__init__(classifier, th, es, targeted, verbose, batch_size)
         self.type_attack = 0
 
     def _perturb_image(self, x: np.ndarray, img: np.ndarray) -> np.ndarray:
@@ -347,14 +447,15 @@ class PixelAttack(PixelThreshold):
         if x.ndim < 2:
             x = np.array([x])
         imgs = np.tile(img, [len(x)] + [1] * (x.ndim + 1))
-        x = x.astype(int)
-        for adv, image in zip(x, imgs):
-            for pixel in np.split(adv, len(adv) // (2 + self.img_channels)):
-                x_pos, y_pos, *rgb = pixel
-                if not self.estimator.channels_first:
-                    image[x_pos % self.img_rows, y_pos % self.img_cols] = rgb
-                else:
-                    image[:, x_pos % self.img_rows, y_pos % self.img_cols] = rgb
+        pixels = x.astype(int).reshape((len(x), -1, 2 + self.img_channels))
+        x_pos = pixels[:, :, 0] % self.img_rows
+        y_pos = pixels[:, :, 1] % self.img_cols
+        rgb = pixels[:, :, 2:]
+        image_idx = np.arange(len(x))[:, np.newaxis]
+        if not self.estimator.channels_first:
+            imgs[image_idx, x_pos, y_pos] = rgb
+        else:
+            imgs[image_idx, :, x_pos, y_pos] = rgb
         return imgs
 
     def _get_bounds(self, img: np.ndarray, limit) -> Tuple[List[list], list]:
@@ -407,6 +508,7 @@ class ThresholdAttack(PixelThreshold):
         es: int = 0,
         targeted: bool = False,
         verbose: bool = False,
+        batch_size: int = 1,
     ) -> None:
         """
         Create a :class:`.PixelThreshold` instance.
@@ -416,8 +518,9 @@ class ThresholdAttack(PixelThreshold):
         :param es: Indicates whether the attack uses CMAES (0) or DE (1) as Evolutionary Strategy.
         :param targeted: Indicates whether the attack is targeted (True) or untargeted (False).
         :param verbose: Indicates whether to print verbose messages of ES used.
+        :param batch_size: Number of images attacked concurrently with DE (`es=1`).
         """
-        super().__init__(classifier, th, es, targeted, verbose)
+        super().__init__(classifier, th, es, targeted, verbose, batch_size)
         self.type_attack = 1
 
     def _perturb_image(self, x: np.ndarray, img: np.ndarray) -> np.ndarray:
@@ -426,18 +529,7 @@ class ThresholdAttack(PixelThreshold):
         """
         if x.ndim < 2:
             x = x[None, ...]
-        imgs = np.tile(img, [len(x)] + [1] * (x.ndim + 1))
-        x = x.astype(int)
-        for adv, image in zip(x, imgs):
-            for count, (i, j, k) in enumerate(
-                product(
-                    range(image.shape[-3]),
-                    range(image.shape[-2]),
-                    range(image.shape[-1]),
-                )
-            ):
-                image[i, j, k] = adv[count]
-        return imgs
+        return x.astype(int).reshape((len(x),) + img.shape).astype(img.dtype)
 
 
 # TODO: Make the attack compatible with current version of SciPy Optimize
@@ -1010,6 +1102,7 @@ class DifferentialEvolutionSolver:
         self.population_shape = (self.num_population_members, self.parameter_count)
 
         self._nfev = 0
+        self._trials = None
         if isinstance(init, string_types):
             if init == "latinhypercube":
                 self.init_population_lhs()
@@ -1224,33 +1317,7 @@ class DifferentialEvolutionSolver:
         ##############
         # CHANGES: self.func operates on the entire parameters array
         ##############
-        itersize = max(0, min(len(self.population), self.maxfun - self._nfev + 1))
-        candidates = self.population[:itersize]
-        parameters = np.array([self._scale_parameters(c) for c in candidates])  # TODO: can be vectorized
-        energies = self.func(parameters, *self.args)
-        self.population_energies = energies
-        self._nfev += itersize
-
-        # for index, candidate in enumerate(self.population):
-        #     if self._nfev > self.maxfun:
-        #         break
-
-        #     parameters = self._scale_parameters(candidate)
-        #     self.population_energies[index] = self.func(parameters,
-        #                                                 *self.args)
-        #     self._nfev += 1
-
-        ##############
-        ##############
-
-        minval = np.argmin(self.population_energies)
-
-        # put the lowest energy into the best solution position.
-        lowest_energy = self.population_energies[minval]
-        self.population_energies[minval] = self.population_energies[0]
-        self.population_energies[0] = lowest_energy
-
-        self.population[[0, minval], :] = self.population[[minval, 0], :]
+        self.tell(self.func(self.ask(), *self.args))
 
     def __iter__(self):
         return self
@@ -1270,67 +1337,75 @@ class DifferentialEvolutionSolver:
         if np.all(np.isinf(self.population_energies)):
             self._calculate_population_energies()
 
-        if self.dither is not None:
-            self.scale = self.random_number_generator.rand() * (self.dither[1] - self.dither[0]) + self.dither[0]
-
         ##############
         # CHANGES: self.func operates on the entire parameters array
         ##############
+        self.tell(self.func(self.ask(), *self.args))
 
-        itersize = max(0, min(self.num_population_members, self.maxfun - self._nfev + 1))
-        trials = np.array([self._mutate(c) for c in range(itersize)])  # TODO:can be vectorized
-        for trial in trials:
-            self._ensure_constraint(trial)
-        parameters = np.array([self._scale_parameters(trial) for trial in trials])
-        energies = self.func(parameters, *self.args)
-        self._nfev += itersize
-
-        for candidate, (energy, trial) in enumerate(zip(energies, trials)):
-            # if the energy of the trial candidate is lower than the
-            # original population member then replace it
-            if energy < self.population_energies[candidate]:
-                self.population[candidate] = trial
-                self.population_energies[candidate] = energy
-
-                # if the trial candidate also has a lower energy than the
-                # best solution then replace that as well
-                if energy < self.population_energies[0]:
-                    self.population_energies[0] = energy
-                    self.population[0] = trial
-
-        # for candidate in range(self.num_population_members):
-        #     if self._nfev > self.maxfun:
-        #         raise StopIteration
-
-        #     # create a trial solution
-        #     trial = self._mutate(candidate)
-
-        #     # ensuring that it's in the range [0, 1)
-        #     self._ensure_constraint(trial)
-
-        #     # scale from [0, 1) to the actual parameter value
-        #     parameters = self._scale_parameters(trial)
-
-        #     # determine the energy of the objective function
-        #     energy = self.func(parameters, *self.args)
-        #     self._nfev += 1
-
-        #     # if the energy of the trial candidate is lower than the
-        #     # original population member then replace it
-        #     if energy < self.population_energies[candidate]:
-        #         self.population[candidate] = trial
-        #         self.population_energies[candidate] = energy
-
-        #         # if the trial candidate also has a lower energy than the
-        #         # best solution then replace that as well
-        #         if energy < self.population_energies[0]:
-        #             self.population_energies[0] = energy
-        #             self.population[0] = trial
+        return self.x, self.population_energies[0]
 
-        ##############
-        ##############
+    def ask(self):
+        """
+        Propose the next set of parameters to evaluate. If the population has
+        just been initialised, these are the (scaled) population members,
+        otherwise a full generation of trial vectors is created at once.
+        Returns
+        -------
+        parameters : ndarray
+            Array of shape (M, len(x)) of parameters whose energies have to be
+            passed to `tell`.
+        """
+        if np.all(np.isinf(self.population_energies)):
+            itersize = max(0, min(len(self.population), self.maxfun - self._nfev + 1))
+            self._trials = None
+            return self._scale_parameters(self.population[:itersize])
 
-        return self.x, self.population_energies[0]
+        if self.dither is not None:
+            self.scale = self.random_number_generator.rand() * (self.dither[1] - self.dither[0]) + self.dither[0]
+
+        itersize = max(0, min(self.num_population_members, self.maxfun - self._nfev + 1))
+        self._trials = self._mutate(np.arange(itersize))
+        self._ensure_constraint(self._trials)
+        return self._scale_parameters(self._trials)
+
+    def tell(self, energies):
+        """
+        Update the population with the energies of the parameters returned by
+        the last call to `ask`.
+        Parameters
+        ----------
+        energies : array_like
+            Objective function values, one for each row returned by `ask`.
+        """
+        energies = np.asarray(energies)
+        self._nfev += len(energies)
+
+        if self._trials is None:
+            self.population_energies[: len(energies)] = energies
+
+            # put the lowest energy into the best solution position.
+            minval = np.argmin(self.population_energies)
+            lowest_energy = self.population_energies[minval]
+            self.population_energies[minval] = self.population_energies[0]
+            self.population_energies[0] = lowest_energy
+            self.population[[0, minval], :] = self.population[[minval, 0], :]
+            return
+
+        trials, self._trials = self._trials, None
+        best_energy = self.population_energies[0]
+
+        # if the energy of the trial candidate is lower than the original
+        # population member then replace it
+        improved = np.where(energies < self.population_energies[: len(energies)])[0]
+        self.population[improved] = trials[improved]
+        self.population_energies[improved] = energies[improved]
+
+        # if the best trial candidate also has a lower energy than the best
+        # solution then replace that as well
+        minval = np.argmin(energies)
+        if energies[minval] < best_energy:
+            self.population_energies[0] = energies[minval]
+            self.population[0] = trials[minval]
 
     def next(self):
         """
@@ -1357,79 +1432,83 @@ class DifferentialEvolutionSolver:
         """
         return (parameters - self.__scale_arg1) / self.__scale_arg2 + 0.5
 
-    def _ensure_constraint(self, trial):
+    def _ensure_constraint(self, trials):
         """
         make sure the parameters lie between the limits
         """
-        for index in np.where((trial < 0) | (trial > 1))[0]:
-            trial[index] = self.random_number_generator.rand()
+        mask = (trials < 0) | (trials > 1)
+        trials[mask] = self.random_number_generator.random_sample(np.count_nonzero(mask))
 
-    def _mutate(self, candidate):  # pylint: disable=R1710
+    def _mutate(self, candidates):  # pylint: disable=R1710
         """
-        create a trial vector based on a mutation strategy
+        create trial vectors for all `candidates` based on a mutation strategy
         """
-        trial = np.copy(self.population[candidate])
+        trials = np.copy(self.population[candidates])
 
         rng = self.random_number_generator
 
-        fill_point = rng.randint(0, self.parameter_count)
+        fill_points = rng.randint(0, self.parameter_count, size=len(candidates))
 
         if self.strategy in ["currenttobest1exp", "currenttobest1bin"]:
-            bprime = self.mutation_func(candidate, self._select_samples(candidate, 5))
+            bprime = self.mutation_func(candidates, self._select_samples(candidates, 5))
         else:
-            bprime = self.mutation_func(self._select_samples(candidate, 5))
+            bprime = self.mutation_func(self._select_samples(candidates, 5))
 
         if self.strategy in self._binomial:
-            crossovers = rng.rand(self.parameter_count)
+            crossovers = rng.rand(len(candidates), self.parameter_count)
             crossovers = crossovers < self.cross_over_probability
-            # the last one is always from the bprime vector for binomial
-            # If you fill in modulo with a loop you have to set the last one to
-            # true. If you don't use a loop then you can have any random entry
-            # be True.
-            crossovers[fill_point] = True
-            trial = np.where(crossovers, bprime, trial)
-            return trial
+            # the fill point is always taken from the bprime vector for
+            # binomial crossover
+            crossovers[np.arange(len(candidates)), fill_points] = True
+            trials = np.where(crossovers, bprime, trials)
+            return trials
 
         if self.strategy in self._exponential:
-            i = 0
-            while i < self.parameter_count and rng.rand() < self.cross_over_probability:
-                trial[fill_point] = bprime[fill_point]
-                fill_point = (fill_point + 1) % self.parameter_count
-                i += 1
+            # length of the run of successful crossovers starting at each fill point
+            crossovers = rng.rand(len(candidates), self.parameter_count) < self.cross_over_probability
+            crossovers = np.concatenate([crossovers, np.zeros((len(candidates), 1), dtype=bool)], axis=1)
+            lengths = np.argmin(crossovers, axis=1)
+
+            offsets = np.arange(self.parameter_count)
+            positions = (fill_points[:, np.newaxis] + offsets) % self.parameter_count
+            mask = offsets < lengths[:, np.newaxis]
+            rows = np.broadcast_to(np.arange(len(candidates))[:, np.newaxis], mask.shape)[mask]
+            cols = positions[mask]
+            trials[rows, cols] = bprime[rows, cols]
 
-            return trial
+            return trials
 
     def _best1(self, samples):
         """
         best1bin, best1exp
         """
-        r_0, r_1 = samples[:2]
+        r_0, r_1 = samples.T[:2]
         return self.population[0] + self.scale * (self.population[r_0] - self.population[r_1])
 
     def _rand1(self, samples):
         """
         rand1bin, rand1exp
         """
-        r_0, r_1, r_2 = samples[:3]
+        r_0, r_1, r_2 = samples.T[:3]
         return self.population[r_0] + self.scale * (self.population[r_1] - self.population[r_2])
 
     def _randtobest1(self, samples):
         """
         randtobest1bin, randtobest1exp
         """
-        r_0, r_1, r_2 = samples[:3]
+        r_0, r_1, r_2 = samples.T[:3]
         bprime = np.copy(self.population[r_0])
         bprime += self.scale * (self.population[0] - bprime)
         bprime += self.scale * (self.population[r_1] - self.population[r_2])
         return bprime
 
-    def _currenttobest1(self, candidate, samples):
+    def _currenttobest1(self, candidates, samples):
         """
         currenttobest1bin, currenttobest1exp
         """
-        r_0, r_1 = samples[:2]
-        bprime = self.population[candidate] + self.scale * (
-            self.population[0] - self.population[candidate] + self.population[r_0] - self.population[r_1]
+        r_0, r_1 = samples.T[:2]
+        bprime = self.population[candidates] + self.scale * (
+            self.population[0] - self.population[candidates] + self.population[r_0] - self.population[r_1]
         )
         return bprime
 
@@ -1437,7 +1516,7 @@ class DifferentialEvolutionSolver:
         """
         best2bin, best2exp
         """
-        r_0, r_1, r_2, r_3 = samples[:4]
+        r_0, r_1, r_2, r_3 = samples.T[:4]
         bprime = self.population[0] + self.scale * (
             self.population[r_0] + self.population[r_1] - self.population[r_2] - self.population[r_3]
         )
@@ -1448,20 +1527,20 @@ class DifferentialEvolutionSolver:
         """
         rand2bin, rand2exp
         """
-        r_0, r_1, r_2, r_3, r_4 = samples
+        r_0, r_1, r_2, r_3, r_4 = samples.T[:5]
         bprime = self.population[r_0] + self.scale * (
             self.population[r_1] + self.population[r_2] - self.population[r_3] - self.population[r_4]
         )
 
         return bprime
 
-    def _select_samples(self, candidate, number_samples):
+    def _select_samples(self, candidates, number_samples):
         """
         obtain random integers from range(self.num_population_members),
-        without replacement.  You can't have the original candidate either.
+        without replacement, for each of the `candidates`. You can't have the
+        original candidate either.
         """
-        idxs = list(range(self.num_population_members))
-        idxs.remove(candidate)
-        self.random_number_generator.shuffle(idxs)
-        idxs = idxs[:number_samples]
+        keys = self.random_number_generator.random_sample((len(candidates), self.num_population_members))
+        keys[np.arange(len(candidates)), candidates] = np.inf
+        idxs = np.argsort(keys, axis=1)[:, :number_samples]
         return idxs
@@ -23,7 +23,7 @@ This module implements the black-box attack `SimBA`.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, Optional, TYPE_CHECKING
 
 import numpy as np
 from scipy.fftpack import idct
@@ -82,7 +82,7 @@ class SimBA(EvasionAttack):
         :param freq_dim: dimensionality of 2D frequency space (DCT).
         :param stride: stride for block order (DCT).
         :param targeted: perform targeted attack
-        :param batch_size: Batch size (but, batch process unavailable in this implementation)
+        :param batch_size: Batch size used for the predictions of the left and right perturbations of all images.
         """
         super().__init__(estimator=classifier)
 
@@ -96,9 +96,13 @@ class SimBA(EvasionAttack):
         self.batch_size = batch_size
         self._check_params()
 
+        self._idct_bases: Dict[int, np.ndarray] = dict()
+
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """
-        Generate adversarial samples and return them in an array.
+        Generate adversarial samples and return them in an array. All images are attacked at the same time along the
+        same order of directions, the left and right perturbations of all images that are still being attacked are
+        evaluated with a single call to `predict` per iteration.
 
         :param x: An array with the original inputs to be attacked.
         :param y: An array with the original labels to be predicted.
@@ -126,16 +130,16 @@ class SimBA(EvasionAttack):
         else:
             y_i = np.argmax(y, axis=1)
 
-        desired_label = y_i[0]
-        current_label = np.argmax(preds, axis=1)[0]
-        last_prob = preds.reshape(-1)[desired_label]
+        desired_label = y_i
+        current_label = np.argmax(preds, axis=1)
+        last_prob = preds[np.arange(x.shape[0]), desired_label]
 
         if self.estimator.channels_first:
             nb_channels = x.shape[1]
         else:
             nb_channels = x.shape[3]
 
-        n_dims = np.prod(x.shape)
+        n_dims = np.prod(x.shape[1:])
 
         if self.attack == "px":
             if self.order == "diag":
@@ -168,102 +172,58 @@ class SimBA(EvasionAttack):
         if self.estimator.clip_values is not None:
             clip_min, clip_max = self.estimator.clip_values
 
-        term_flag = 1
         if self.targeted:
-            if desired_label != current_label:
-                term_flag = 0
+            term_flag = desired_label == current_label
         else:
-            if desired_label == current_label:
-                term_flag = 0
+            term_flag = desired_label != current_label
 
         nb_iter = 0
-        while term_flag == 0 and nb_iter < self.max_iter:
+        while not np.all(term_flag) and nb_iter < self.max_iter:
+            # The same direction is used for all images, the perturbation has to be computed only once
             diff = np.zeros(n_dims).astype(ART_NUMPY_DTYPE)
             diff[indices[nb_iter]] = self.epsilon
-
+            diff = diff.reshape((1,) + x.shape[1:])
             if self.attack == "dct":
-                left_preds = self.estimator.predict(
-                    np.clip(x - trans(diff.reshape(x.shape)), clip_min, clip_max), batch_size=self.batch_size
-                )
-            elif self.attack == "px":
-                left_preds = self.estimator.predict(
-                    np.clip(x - diff.reshape(x.shape), clip_min, clip_max), batch_size=self.batch_size
-                )
-            left_prob = left_preds.reshape(-1)[desired_label]
+                diff = trans(diff)
+
+            active = np.where(~term_flag)[0]
+            left_x = np.clip(x[active] - diff, clip_min, clip_max)
+            right_x = np.clip(x[active] + diff, clip_min, clip_max)
+
+            preds = self.estimator.predict(np.concatenate([left_x, right_x]), batch_size=self.batch_size)
+            left_preds, right_preds = preds[: len(active)], preds[len(active) :]
+            left_prob = left_preds[np.arange(len(active)), desired_label[active]]
+            right_prob = right_preds[np.arange(len(active)), desired_label[active]]
 
-            if self.attack == "dct":
-                right_preds = self.estimator.predict(
-                    np.clip(x + trans(diff.reshape(x.shape)), clip_min, clip_max), batch_size=self.batch_size
-                )
-            elif self.attack == "px":
-                right_preds = self.estimator.predict(
-                    np.clip(x + diff.reshape(x.shape), clip_min, clip_max), batch_size=self.batch_size
-                )
-            right_prob = right_preds.reshape(-1)[desired_label]
-
-            # Use (2 * int(self.targeted) - 1) to shorten code?
             if self.targeted:
-                if left_prob > last_prob:
-                    if left_prob > right_prob:
-                        if self.attack == "dct":
-                            x = np.clip(x - trans(diff.reshape(x.shape)), clip_min, clip_max)
-                        elif self.attack == "px":
-                            x = np.clip(x - diff.reshape(x.shape), clip_min, clip_max)
-                        last_prob = left_prob
-                        current_label = np.argmax(left_preds, axis=1)[0]
-                    else:
-                        if self.attack == "dct":
-                            x = np.clip(x + trans(diff.reshape(x.shape)), clip_min, clip_max)
-                        elif self.attack == "px":
-                            x = np.clip(x + diff.reshape(x.shape), clip_min, clip_max)
-                        last_prob = right_prob
-                        current_label = np.argmax(right_preds, axis=1)[0]
-                else:
-                    if right_prob > last_prob:
-                        if self.attack == "dct":
-                            x = np.clip(x + trans(diff.reshape(x.shape)), clip_min, clip_max)
-                        elif self.attack == "px":
-                            x = np.clip(x + diff.reshape(x.shape), clip_min, clip_max)
-                        last_prob = right_prob
-                        current_label = np.argmax(right_preds, axis=1)[0]
+                take_left = (left_prob > last_prob[active]) & (left_prob > right_prob)
+                take_right = ~take_left & (right_prob > last_prob[active])
             else:
-                if left_prob < last_prob:
-                    if left_prob < right_prob:
-                        if self.attack == "dct":
-                            x = np.clip(x - trans(diff.reshape(x.shape)), clip_min, clip_max)
-                        elif self.attack == "px":
-                            x = np.clip(x - diff.reshape(x.shape), clip_min, clip_max)
-                        last_prob = left_prob
-                        current_label = np.argmax(left_preds, axis=1)[0]
-                    else:
-                        if self.attack == "dct":
-                            x = np.clip(x + trans(diff.reshape(x.shape)), clip_min, clip_max)
-                        elif self.attack == "px":
-                            x = np.clip(x + diff.reshape(x.shape), clip_min, clip_max)
-                        last_prob = right_prob
-                        current_label = np.argmax(right_preds, axis=1)[0]
-                else:
-                    if right_prob < last_prob:
-                        if self.attack == "dct":
-                            x = np.clip(x + trans(diff.reshape(x.shape)), clip_min, clip_max)
-                        elif self.attack == "px":
-                            x = np.clip(x + diff.reshape(x.shape), clip_min, clip_max)
-                        last_prob = right_prob
-                        current_label = np.argmax(right_preds, axis=1)[0]
+                take_left = (left_prob < last_prob[active]) & (left_prob < right_prob)
+                take_right = ~take_left & (right_prob < last_prob[active])
+
+            x[active[take_left]] = left_x[take_left]
+            last_prob[active[take_left]] = left_prob[take_left]
+            current_label[active[take_left]] = np.argmax(left_preds[take_left], axis=1)
+
+            x[active[take_right]] = right_x[take_right]
+            last_prob[active[take_right]] = right_prob[take_right]
+            current_label[active[take_right]] = np.argmax(right_preds[take_right], axis=1)
 
             if self.targeted:
-                if desired_label == current_label:
-                    term_flag = 1
+                term_flag = desired_label == current_label
             else:
-                if desired_label != current_label:
-                    term_flag = 1
+                term_flag = desired_label != current_label
 
             nb_iter = nb_iter + 1
 
-        if nb_iter < self.max_iter:
-            logger.info("SimBA (%s) %s attack succeed", self.attack, ["non-targeted", "targeted"][int(self.targeted)])
-        else:
-            logger.info("SimBA (%s) %s attack failed", self.attack, ["non-targeted", "targeted"][int(self.targeted)])
+        logger.info(
+            "SimBA (%s) %s attack succeeded for %d of %d samples",
+            self.attack,
+            ["non-targeted", "targeted"][int(self.targeted)],
+            np.sum(term_flag),
+            x.shape[0],
+        )
 
         return x
 
@@ -275,8 +235,8 @@ class SimBA(EvasionAttack):
         if self.epsilon < 0:
             raise ValueError("The overshoot parameter must not be negative.")
 
-        if self.batch_size != 1:
-            raise ValueError("The batch size `batch_size` has to be 1 in this implementation.")
+        if not isinstance(self.batch_size, (int, np.int)) or self.batch_size <= 0:
+            raise ValueError("The batch size `batch_size` has to be a positive integer.")
 
         if not isinstance(self.stride, (int, np.int)) or self.stride <= 0:
             raise ValueError("The `stride` value must be a positive integer.")
@@ -343,26 +303,42 @@ class SimBA(EvasionAttack):
             x = x.transpose(0, 3, 1, 2)
         var_z = np.zeros(x.shape).astype(ART_NUMPY_DTYPE)
         num_blocks = int(x.shape[2] / block_size)
-        mask = np.zeros((x.shape[0], x.shape[1], block_size, block_size))
-        if not isinstance(ratio, float):
-            for i in range(x.shape[0]):
-                mask[i, :, : int(block_size * ratio[i]), : int(block_size * ratio[i])] = 1
-        else:
-            mask[:, :, : int(block_size * ratio), : int(block_size * ratio)] = 1
-        for i in range(num_blocks):
-            for j in range(num_blocks):
-                submat = x[:, :, (i * block_size) : ((i + 1) * block_size), (j * block_size) : ((j + 1) * block_size)]
-                if masked:
-                    submat = submat * mask
-                var_z[
-                    :, :, (i * block_size) : ((i + 1) * block_size), (j * block_size) : ((j + 1) * block_size)
-                ] = idct(idct(submat, axis=3, norm="ortho"), axis=2, norm="ortho")
+        size = num_blocks * block_size
+
+        # Split the image into blocks of shape (num_blocks, block_size, num_blocks, block_size)
+        blocks = x[:, :, :size, :size].reshape((x.shape[0], x.shape[1], num_blocks, block_size, num_blocks, block_size))
+        if masked:
+            mask = np.zeros((x.shape[0], x.shape[1], block_size, block_size))
+            if not isinstance(ratio, float):
+                for i in range(x.shape[0]):
+                    mask[i, :, : int(block_size * ratio[i]), : int(block_size * ratio[i])] = 1
+            else:
+                mask[:, :, : int(block_size * ratio), : int(block_size * ratio)] = 1
+            blocks = blocks * mask[:, :, np.newaxis, :, np.newaxis, :]
+
+        # 2D IDCT of all blocks at once with the precomputed basis: basis @ block @ basis.T
+        basis = self._get_idct_basis(block_size)
+        var_z[:, :, :size, :size] = np.einsum("ik,ncakbl,jl->ncaibj", basis, blocks, basis).reshape(
+            (x.shape[0], x.shape[1], size, size)
+        )
 
         if self.estimator.channels_first:
             return var_z
 
         return var_z.transpose((0, 2, 3, 1))
 
+    def _get_idct_basis(self, block_size: int) -> np.ndarray:
+        """
+        Returns the (cached) matrix of the orthonormal 1D IDCT of size `block_size`, whose columns are the IDCT basis
+        vectors.
+
+        :param block_size: block size for DCT attacks.
+        :return: An array of shape (block_size, block_size).
+        """
+        if block_size not in self._idct_bases:
+            self._idct_bases[block_size] = idct(np.eye(block_size), axis=0, norm="ortho")
+        return self._idct_bases[block_size]
+
     def diagonal_order(self, image_size, channels):
         """
         Defines a diagonal order for pixel attacks.
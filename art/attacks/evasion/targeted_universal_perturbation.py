@@ -52,7 +52,16 @@ class TargetedUniversalPerturbation(EvasionAttack):
         "fgsm": "art.attacks.evasion.fast_gradient.FastGradientMethod",
         "simba": "art.attacks.evasion.simba.SimBA",
     }
-    attack_params = EvasionAttack.attack_params + ["attacker", "attacker_params", "delta", "max_iter", "eps", "norm"]
+    attack_params = EvasionAttack.attack_params + [
+        "attacker",
+        "attacker_params",
+        "delta",
+        "max_iter",
+        "eps",
+        "norm",
+        "batch_size",
+        "attack_batch_size",
+    ]
 
     _estimator_requirements = (BaseEstimator, ClassifierMixin)
 
@@ -65,6 +74,8 @@ class TargetedUniversalPerturbation(EvasionAttack):
         max_iter: int = 20,
         eps: float = 10.0,
         norm: Union[int, float, str] = np.inf,
+        batch_size: int = 32,
+        attack_batch_size: int = 1,
     ):
         """
         :param classifier: A trained classifier.
@@ -75,6 +86,11 @@ class TargetedUniversalPerturbation(EvasionAttack):
         :param max_iter: The maximum number of iterations for computing universal perturbation.
         :param eps: Attack step size (input variation)
         :param norm: The norm of the adversarial perturbation. Possible values: "inf", np.inf, 2
+        :param batch_size: Batch size for model evaluations in TargetedUniversalPerturbation.
+        :param attack_batch_size: Number of examples not yet classified as their target by the universal perturbation
+                                  that are attacked together by the adversarial attack. The perturbation is updated with
+                                  the average of their successful increments. If 1, the examples are attacked one at a
+                                  time.
         """
         super().__init__(estimator=classifier)
 
@@ -84,6 +100,8 @@ class TargetedUniversalPerturbation(EvasionAttack):
         self.max_iter = max_iter
         self.eps = eps
         self.norm = norm
+        self.batch_size = batch_size
+        self.attack_batch_size = attack_batch_size
         self._targeted = True
         self._check_params()
 
@@ -108,7 +126,7 @@ class TargetedUniversalPerturbation(EvasionAttack):
 
         # Instantiate the middle attacker and get the predicted labels
         attacker = self._get_attack(self.attacker, self.attacker_params)
-        pred_y = self.estimator.predict(x, batch_size=1)
+        pred_y = self.estimator.predict(x, batch_size=self.batch_size)
         pred_y_max = np.argmax(pred_y, axis=1)
 
         # Start to generate the adversarial examples
@@ -117,26 +135,29 @@ class TargetedUniversalPerturbation(EvasionAttack):
             # Go through all the examples randomly
             rnd_idx = random.sample(range(nb_instances), nb_instances)
 
-            # Go through the data set and compute the perturbation increments sequentially
-            for _, (e_x, e_y) in enumerate(zip(x[rnd_idx], y[rnd_idx])):
-                x_i = e_x[None, ...]
-                y_i = e_y[None, ...]
+            if self.attack_batch_size > 1:
+                noise = self._update_batch(x, y, np.array(rnd_idx), noise, attacker)
+            else:
+                # Go through the data set and compute the perturbation increments sequentially
+                for _, (e_x, e_y) in enumerate(zip(x[rnd_idx], y[rnd_idx])):
+                    x_i = e_x[None, ...]
+                    y_i = e_y[None, ...]
 
-                current_label = np.argmax(self.estimator.predict(x_i + noise)[0])
-                target_label = np.argmax(y_i)
+                    current_label = np.argmax(self.estimator.predict(x_i + noise)[0])
+                    target_label = np.argmax(y_i)
 
-                if current_label != target_label:
-                    # Compute adversarial perturbation
-                    adv_xi = attacker.generate(x_i + noise, y=y_i)
+                    if current_label != target_label:
+                        # Compute adversarial perturbation
+                        adv_xi = attacker.generate(x_i + noise, y=y_i)
 
-                    new_label = np.argmax(self.estimator.predict(adv_xi)[0])
+                        new_label = np.argmax(self.estimator.predict(adv_xi)[0])
 
-                    # If the class has changed, update v
-                    if new_label == target_label:
-                        noise = adv_xi - x_i
+                        # If the class has changed, update v
+                        if new_label == target_label:
+                            noise = adv_xi - x_i
 
-                        # Project on L_p ball
-                        noise = projection(noise, self.eps, self.norm)
+                            # Project on L_p ball
+                            noise = projection(noise, self.eps, self.norm)
             nb_iter += 1
 
             # Apply attack and clip
@@ -146,7 +167,7 @@ class TargetedUniversalPerturbation(EvasionAttack):
                 x_adv = np.clip(x_adv, clip_min, clip_max)
 
             # Compute the error rate
-            y_adv = np.argmax(self.estimator.predict(x_adv, batch_size=1), axis=1)
+            y_adv = np.argmax(self.estimator.predict(x_adv, batch_size=self.batch_size), axis=1)
             fooling_rate = np.sum(pred_y_max != y_adv) / nb_instances
             targeted_success_rate = np.sum(y_adv == np.argmax(y, axis=1)) / nb_instances
 
@@ -159,6 +180,51 @@ class TargetedUniversalPerturbation(EvasionAttack):
 
         return x_adv
 
+    def _update_batch(
+        self, x: np.ndarray, y: np.ndarray, rnd_idx: np.ndarray, noise: Union[int, np.ndarray], attacker: EvasionAttack
+    ) -> Union[int, np.ndarray]:
+        """
+        Update the universal perturbation with one pass over the data set, attacking mini-batches of the examples that
+        are not yet classified as their target.
+
+        :param x: An array with the original inputs.
+        :param y: An array with the targeted labels.
+        :param rnd_idx: The random order in which to go through the examples.
+        :param noise: The current universal perturbation.
+        :param attacker: The adversarial attack computing the perturbation increments.
+        :return: The updated universal perturbation.
+        """
+        target_labels = np.argmax(y, axis=1)
+
+        # Screen the whole data set for examples not yet classified as their target
+        y_current = np.argmax(self.estimator.predict(x[rnd_idx] + noise, batch_size=self.batch_size), axis=1)
+        rnd_idx = rnd_idx[y_current != target_labels[rnd_idx]]
+
+        for begin in range(0, len(rnd_idx), self.attack_batch_size):
+            batch_idx = rnd_idx[begin : begin + self.attack_batch_size]
+            x_batch = x[batch_idx] + noise
+
+            # Skip examples moved to their target by the updates of previous mini-batches
+            current_labels = np.argmax(self.estimator.predict(x_batch, batch_size=self.batch_size), axis=1)
+            not_fooled = current_labels != target_labels[batch_idx]
+            if not np.any(not_fooled):
+                continue
+            batch_idx, x_batch = batch_idx[not_fooled], x_batch[not_fooled]
+
+            # Compute adversarial perturbations
+            adv_batch = attacker.generate(x_batch, y=y[batch_idx])
+            new_labels = np.argmax(self.estimator.predict(adv_batch, batch_size=self.batch_size), axis=1)
+
+            # If the target class is reached, update v with the average increment
+            reached = new_labels == target_labels[batch_idx]
+            if np.any(reached):
+                noise = noise + np.mean(adv_batch[reached] - x_batch[reached], axis=0, keepdims=True)
+
+                # Project on L_p ball
+                noise = projection(noise, self.eps, self.norm)
+
+        return noise
+
     def _check_params(self) -> None:
 
         if not isinstance(self.delta, (float, int)) or self.delta < 0 or self.delta > 1:
@@ -170,6 +236,12 @@ class TargetedUniversalPerturbation(EvasionAttack):
         if not isinstance(self.eps, (float, int)) or self.eps <= 0:
             raise ValueError("The eps coefficient must be a positive float.")
 
+        if not isinstance(self.batch_size, (int, np.int)) or self.batch_size <= 0:
+            raise ValueError("The batch_size must be a positive integer.")
+
+        if not isinstance(self.attack_batch_size, (int, np.int)) or self.attack_batch_size <= 0:
+            raise ValueError("The attack_batch_size must be a positive integer.")
+
     def _get_attack(self, a_name: str, params: Optional[Dict[str, Any]] = None) -> EvasionAttack:
         """
         Get an attack object from its name.
@@ -71,6 +71,7 @@ class UniversalPerturbation(EvasionAttack):
         "eps",
         "norm",
         "batch_size",
+        "attack_batch_size",
         "verbose",
     ]
     _estimator_requirements = (BaseEstimator, ClassifierMixin)
@@ -85,6 +86,7 @@ class UniversalPerturbation(EvasionAttack):
         eps: float = 10.0,
         norm: Union[int, float, str] = np.inf,
         batch_size: int = 32,
+        attack_batch_size: int = 1,
         verbose: bool = True,
     ) -> None:
         """
@@ -98,6 +100,9 @@ class UniversalPerturbation(EvasionAttack):
         :param eps: Attack step size (input variation).
         :param norm: The norm of the adversarial perturbation. Possible values: "inf", np.inf, 2.
         :param batch_size: Batch size for model evaluations in UniversalPerturbation.
+        :param attack_batch_size: Number of examples not yet fooled by the universal perturbation that are attacked
+                                  together by the adversarial attack. The perturbation is updated with the average of
+                                  their successful increments. If 1, the examples are attacked one at a time.
         :param verbose: Show progress bars.
         """
         super().__init__(estimator=classifier)
@@ -108,6 +113,7 @@ class UniversalPerturbation(EvasionAttack):
         self.eps = eps
         self.norm = norm
         self.batch_size = batch_size
+        self.attack_batch_size = attack_batch_size
         self.verbose = verbose
         self._check_params()
 
@@ -178,24 +184,27 @@ class UniversalPerturbation(EvasionAttack):
             # Go through all the examples randomly
             rnd_idx = random.sample(range(nb_instances), nb_instances)
 
-            # Go through the data set and compute the perturbation increments sequentially
-            for j, ex in enumerate(x[rnd_idx]):
-                x_i = ex[None, ...]
+            if self.attack_batch_size > 1:
+                noise = self._update_batch(x, y, y_index, np.array(rnd_idx), noise, attacker)
+            else:
+                # Go through the data set and compute the perturbation increments sequentially
+                for j, ex in enumerate(x[rnd_idx]):
+                    x_i = ex[None, ...]
 
-                current_label = np.argmax(self.estimator.predict(x_i + noise)[0])
-                original_label = y_index[rnd_idx][j]
+                    current_label = np.argmax(self.estimator.predict(x_i + noise)[0])
+                    original_label = y_index[rnd_idx][j]
 
-                if current_label == original_label:
-                    # Compute adversarial perturbation
-                    adv_xi = attacker.generate(x_i + noise, y=y[rnd_idx][[j]])
-                    new_label = np.argmax(self.estimator.predict(adv_xi)[0])
+                    if current_label == original_label:
+                        # Compute adversarial perturbation
+                        adv_xi = attacker.generate(x_i + noise, y=y[rnd_idx][[j]])
+                        new_label = np.argmax(self.estimator.predict(adv_xi)[0])
 
-                    # If the class has changed, update v
-                    if current_label != new_label:
-                        noise = adv_xi - x_i
+                        # If the class has changed, update v
+                        if current_label != new_label:
+                            noise = adv_xi - x_i
 
-                        # Project on L_p ball
-                        noise = projection(noise, self.eps, self.norm)
+                            # Project on L_p ball
+                            noise = projection(noise, self.eps, self.norm)
             nb_iter += 1
             pbar.update(1)
 
@@ -206,7 +215,7 @@ class UniversalPerturbation(EvasionAttack):
                 x_adv = np.clip(x_adv, clip_min, clip_max)
 
             # Compute the error rate
-            y_adv = np.argmax(self.estimator.predict(x_adv, batch_size=1), axis=1)
+            y_adv = np.argmax(self.estimator.predict(x_adv, batch_size=self.batch_size), axis=1)
             fooling_rate = np.sum(y_index != y_adv) / nb_instances
 
         pbar.close()
@@ -217,6 +226,56 @@ class UniversalPerturbation(EvasionAttack):
 
         return x_adv
 
+    def _update_batch(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        y_index: np.ndarray,
+        rnd_idx: np.ndarray,
+        noise: Union[int, np.ndarray],
+        attacker: EvasionAttack,
+    ) -> Union[int, np.ndarray]:
+        """
+        Update the universal perturbation with one pass over the data set, attacking mini-batches of the examples that
+        it does not fool yet.
+
+        :param x: An array with the original inputs.
+        :param y: An array with the original labels to be predicted.
+        :param y_index: The indices of the original labels.
+        :param rnd_idx: The random order in which to go through the examples.
+        :param noise: The current universal perturbation.
+        :param attacker: The adversarial attack computing the perturbation increments.
+        :return: The updated universal perturbation.
+        """
+        # Screen the whole data set for examples not fooled by the current perturbation
+        y_current = np.argmax(self.estimator.predict(x[rnd_idx] + noise, batch_size=self.batch_size), axis=1)
+        rnd_idx = rnd_idx[y_current == y_index[rnd_idx]]
+
+        for begin in range(0, len(rnd_idx), self.attack_batch_size):
+            batch_idx = rnd_idx[begin : begin + self.attack_batch_size]
+            x_batch = x[batch_idx] + noise
+
+            # Skip examples fooled by the updates of previous mini-batches
+            current_labels = np.argmax(self.estimator.predict(x_batch, batch_size=self.batch_size), axis=1)
+            not_fooled = current_labels == y_index[batch_idx]
+            if not np.any(not_fooled):
+                continue
+            batch_idx, x_batch, current_labels = batch_idx[not_fooled], x_batch[not_fooled], current_labels[not_fooled]
+
+            # Compute adversarial perturbations
+            adv_batch = attacker.generate(x_batch, y=y[batch_idx])
+            new_labels = np.argmax(self.estimator.predict(adv_batch, batch_size=self.batch_size), axis=1)
+
+            # If the class has changed, update v with the average increment
+            changed = current_labels != new_labels
+            if np.any(changed):
+                noise = noise + np.mean(adv_batch[changed] - x_batch[changed], axis=0, keepdims=True)
+
+                # Project on L_p ball
+                noise = projection(noise, self.eps, self.norm)
+
+        return noise
+
     def _get_attack(self, a_name: str, params: Optional[Dict[str, Any]] = None) -> EvasionAttack:
         """
         Get an attack object from its name.
@@ -264,5 +323,8 @@ class UniversalPerturbation(EvasionAttack):
         if not isinstance(self.batch_size, (int, np.int)) or self.batch_size <= 0:
             raise ValueError("The batch_size must be a positive integer.")
 
+        if not isinstance(self.attack_batch_size, (int, np.int)) or self.attack_batch_size <= 0:
+            raise ValueError("The attack_batch_size must be a positive integer.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -474,9 +474,9 @@ class ZooAttack(EvasionAttack):
                 raise error
 
         # Create the batch of modifications to run
-        for i in range(self.nb_parallel * self._current_noise.shape[0]):
-            coord_batch[2 * i, indices[i]] += self.variable_h
-            coord_batch[2 * i + 1, indices[i]] -= self.variable_h
+        rows = 2 * np.arange(self.nb_parallel * self._current_noise.shape[0])
+        coord_batch[rows, indices] += self.variable_h
+        coord_batch[rows + 1, indices] -= self.variable_h
 
         # Compute loss for all samples and coordinates, then optimize
         expanded_x = np.repeat(x, 2 * self.nb_parallel, axis=0).reshape((-1,) + x.shape[1:])
@@ -521,7 +521,7 @@ class ZooAttack(EvasionAttack):
         beta1, beta2 = 0.9, 0.999
 
         # Estimate grads from loss variation (constant `h` from the paper is fixed to .0001)
-        grads = np.array([(losses[i] - losses[i + 1]) / (2 * self.variable_h) for i in range(0, len(losses), 2)])
+        grads = (losses[0::2] - losses[1::2]) / (2 * self.variable_h)
 
         # ADAM update
         mean[index] = beta1 * mean[index] + (1 - beta1) * grads
@@ -625,16 +625,19 @@ class ZooAttack(EvasionAttack):
 
     @staticmethod
     def _max_pooling(image: np.ndarray, kernel_size: int) -> np.ndarray:
-        img_pool = np.copy(image)
-        for i in range(0, image.shape[1], kernel_size):
-            for j in range(0, image.shape[2], kernel_size):
-                img_pool[:, i : i + kernel_size, j : j + kernel_size] = np.max(
-                    image[:, i : i + kernel_size, j : j + kernel_size],
-                    axis=(1, 2),
-                    keepdims=True,
-                )
+        nb_samples, height, width = image.shape
+        nb_rows = -(-height // kernel_size)
+        nb_cols = -(-width // kernel_size)
+
+        # Pad incomplete blocks by repeating their edges, which does not change their maximum
+        padded = np.pad(
+            image, ((0, 0), (0, nb_rows * kernel_size - height), (0, nb_cols * kernel_size - width)), mode="edge"
+        )
+        blocks = padded.reshape(nb_samples, nb_rows, kernel_size, nb_cols, kernel_size)
+        pooled = np.max(blocks, axis=(2, 4))
+        img_pool = np.repeat(np.repeat(pooled, kernel_size, axis=1), kernel_size, axis=2)
 
-        return img_pool
+        return img_pool[:, :height, :width]
 
     def _check_params(self) -> None:
         if not isinstance(self.binary_search_steps, (int, np.int)) or self.binary_search_steps < 0:
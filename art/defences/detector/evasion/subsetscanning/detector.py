@@ -21,8 +21,9 @@ This module implements the fast generalized subset scan based detector.
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ProcessPoolExecutor
 import logging
-from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from typing import Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 
 # pylint: disable=E0001
 import numpy as np
@@ -94,36 +95,58 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
 
         self.sorted_bgd_activations = np.sort(bgd_activations, axis=0)
 
-    def calculate_pvalue_ranges(self, eval_x: np.ndarray) -> np.ndarray:
+    def calculate_pvalue_ranges(self, eval_x: np.ndarray, batch_size: int = 128) -> np.ndarray:
         """
         Returns computed p-value ranges.
 
         :param eval_x: Data being evaluated for anomalies.
-        :return: P-value ranges.
+        :param batch_size: Number of records whose activations and p-value ranges are computed at once.
+        :return: P-value ranges of shape `(nb_records, nb_attributes, 2)` in float32.
         """
-        bgd_activations = self.sorted_bgd_activations
-        eval_activations = self.detector.get_activations(eval_x, self._layer_name, batch_size=128)
+        pvalue_ranges: Optional[np.ndarray] = None
+        offset = 0
+
+        for pvalue_ranges_batch in self.iter_pvalue_ranges(eval_x, batch_size=batch_size):
+            if pvalue_ranges is None:
+                pvalue_ranges = np.empty((eval_x.shape[0],) + pvalue_ranges_batch.shape[1:], dtype=np.float32)
+            pvalue_ranges[offset : offset + len(pvalue_ranges_batch)] = pvalue_ranges_batch
+            offset += len(pvalue_ranges_batch)
 
-        if len(eval_activations.shape) == 4:
-            dim2 = eval_activations.shape[1] * eval_activations.shape[2] * eval_activations.shape[3]
-            eval_activations = np.reshape(eval_activations, (eval_activations.shape[0], dim2))
+        if pvalue_ranges is None:
+            return np.empty((0, self.sorted_bgd_activations.shape[1], 2), dtype=np.float32)
 
+        return pvalue_ranges
+
+    def iter_pvalue_ranges(self, eval_x: np.ndarray, batch_size: int = 128) -> Iterator[np.ndarray]:
+        """
+        Lazily computes the p-value ranges of `eval_x` batch by batch. Only the activations and p-value ranges of a
+        single batch are held in memory at a time.
+
+        :param eval_x: Data being evaluated for anomalies.
+        :param batch_size: Number of records whose activations and p-value ranges are computed at once.
+        :return: Iterator over the p-value ranges of shape `(batch_size, nb_attributes, 2)` in float32.
+        """
+        bgd_activations = self.sorted_bgd_activations
         bgrecords_n = bgd_activations.shape[0]
-        records_n = eval_activations.shape[0]
-        atrr_n = eval_activations.shape[1]
 
-        pvalue_ranges = np.empty((records_n, atrr_n, 2))
+        for batch_start in range(0, eval_x.shape[0], batch_size):
+            eval_activations = self.detector.get_activations(
+                eval_x[batch_start : batch_start + batch_size], self._layer_name, batch_size=batch_size
+            )
 
-        for j in range(atrr_n):
-            pvalue_ranges[:, j, 0] = np.searchsorted(bgd_activations[:, j], eval_activations[:, j], side="right")
-            pvalue_ranges[:, j, 1] = np.searchsorted(bgd_activations[:, j], eval_activations[:, j], side="left")
+            if len(eval_activations.shape) == 4:
+                dim2 = eval_activations.shape[1] * eval_activations.shape[2] * eval_activations.shape[3]
+                eval_activations = np.reshape(eval_activations, (eval_activations.shape[0], dim2))
 
-        pvalue_ranges = bgrecords_n - pvalue_ranges
+            pvalue_ranges = np.empty(eval_activations.shape + (2,), dtype=np.float32)
+            pvalue_ranges[:, :, 0] = bgrecords_n - _searchsorted_columns(bgd_activations, eval_activations, "right")
+            pvalue_ranges[:, :, 1] = bgrecords_n - _searchsorted_columns(bgd_activations, eval_activations, "left")
 
-        pvalue_ranges[:, :, 0] = np.divide(pvalue_ranges[:, :, 0], bgrecords_n + 1)
-        pvalue_ranges[:, :, 1] = np.divide(pvalue_ranges[:, :, 1] + 1, bgrecords_n + 1)
+            pvalue_ranges[:, :, 0] /= bgrecords_n + 1
+            pvalue_ranges[:, :, 1] += 1
+            pvalue_ranges[:, :, 1] /= bgrecords_n + 1
 
-        return pvalue_ranges
+            yield pvalue_ranges
 
     def scan(
         self,
@@ -132,6 +155,8 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
         clean_size: Optional[int] = None,
         advs_size: Optional[int] = None,
         run: int = 10,
+        batch_size: int = 128,
+        nb_jobs: int = 1,
     ) -> Tuple[list, list, float]:
         """
         Returns scores of highest scoring subsets.
@@ -141,44 +166,67 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
         :param clean_size:
         :param advs_size:
         :param run:
+        :param batch_size: Number of records whose p-value ranges are computed at once. The individual scan consumes
+                           the p-value ranges batch by batch without materializing them for the whole dataset.
+        :param nb_jobs: Number of worker processes running the scans of different runs in parallel.
         :return: (clean_scores, adv_scores, detectionpower).
         """
-        clean_pvalranges = self.calculate_pvalue_ranges(clean_x)
-        adv_pvalranges = self.calculate_pvalue_ranges(adv_x)
-
         clean_scores = []
         adv_scores = []
 
         if clean_size is None and advs_size is None:
             # Individual scan
-            with tqdm(
-                total=len(clean_pvalranges) + len(adv_pvalranges), desc="Subset scanning", disable=not self.verbose
-            ) as pbar:
-                for _, c_p in enumerate(clean_pvalranges):
-                    best_score, _, _, _ = Scanner.fgss_individ_for_nets(c_p)
-                    clean_scores.append(best_score)
-                    pbar.update(1)
-                for _, a_p in enumerate(adv_pvalranges):
-                    best_score, _, _, _ = Scanner.fgss_individ_for_nets(a_p)
-                    adv_scores.append(best_score)
-                    pbar.update(1)
+            with tqdm(total=len(clean_x) + len(adv_x), desc="Subset scanning", disable=not self.verbose) as pbar:
+                for clean_pvalranges in self.iter_pvalue_ranges(clean_x, batch_size=batch_size):
+                    best_scores, _ = Scanner.fgss_individ_for_nets_batch(clean_pvalranges)
+                    clean_scores.extend(best_scores.tolist())
+                    pbar.update(len(clean_pvalranges))
+                for adv_pvalranges in self.iter_pvalue_ranges(adv_x, batch_size=batch_size):
+                    best_scores, _ = Scanner.fgss_individ_for_nets_batch(adv_pvalranges)
+                    adv_scores.extend(best_scores.tolist())
+                    pbar.update(len(adv_pvalranges))
 
         else:
+            clean_pvalranges = self.calculate_pvalue_ranges(clean_x, batch_size=batch_size)
+            adv_pvalranges = self.calculate_pvalue_ranges(adv_x, batch_size=batch_size)
+
             len_adv_x = len(adv_x)
             len_clean_x = len(clean_x)
 
-            for _ in trange(run, desc="Subset scanning", disable=not self.verbose):
+            if nb_jobs > 1:
+                # draw the samples of each run in the main process, the workers reseed for their restarts
                 np.random.seed()
-
-                advchoice = np.random.choice(range(len_adv_x), advs_size, replace=False)
-                cleanchoice = np.random.choice(range(len_clean_x), clean_size, replace=False)
-
-                combined_pvals = np.concatenate((clean_pvalranges[cleanchoice], adv_pvalranges[advchoice]), axis=0)
-
-                best_score, _, _, _ = Scanner.fgss_for_nets(clean_pvalranges[cleanchoice])
-                clean_scores.append(best_score)
-                best_score, _, _, _ = Scanner.fgss_for_nets(combined_pvals)
-                adv_scores.append(best_score)
+                choices = []
+                for _ in range(run):
+                    advchoice = np.random.choice(range(len_adv_x), advs_size, replace=False)
+                    cleanchoice = np.random.choice(range(len_clean_x), clean_size, replace=False)
+                    choices.append((cleanchoice, advchoice))
+                with ProcessPoolExecutor(max_workers=nb_jobs) as executor:
+                    futures = [
+                        executor.submit(
+                            _scan_run,
+                            clean_pvalranges[cleanchoice],
+                            np.concatenate((clean_pvalranges[cleanchoice], adv_pvalranges[advchoice]), axis=0),
+                        )
+                        for cleanchoice, advchoice in choices
+                    ]
+                    for future in tqdm(futures, desc="Subset scanning", disable=not self.verbose):
+                        clean_score, adv_score = future.result()
+                        clean_scores.append(clean_score)
+                        adv_scores.append(adv_score)
+            else:
+                for _ in trange(run, desc="Subset scanning", disable=not self.verbose):
+                    np.random.seed()
+
+                    advchoice = np.random.choice(range(len_adv_x), advs_size, replace=False)
+                    cleanchoice = np.random.choice(range(len_clean_x), clean_size, replace=False)
+
+                    combined_pvals = np.concatenate((clean_pvalranges[cleanchoice], adv_pvalranges[advchoice]), axis=0)
+
+                    best_score, _, _, _ = Scanner.fgss_for_nets(clean_pvalranges[cleanchoice])
+                    clean_scores.append(best_score)
+                    best_score, _, _, _ = Scanner.fgss_for_nets(combined_pvals)
+                    adv_scores.append(best_score)
 
         y_true = np.append([np.ones(len(adv_scores))], [np.zeros(len(clean_scores))])
         all_scores = np.append([adv_scores], [clean_scores])
@@ -299,3 +347,49 @@ class SubsetScanningDetector(ClassifierNeuralNetwork):
 
     def save(self, filename: str, path: Optional[str] = None) -> None:
         self.detector.save(filename, path)
+
+
+def _searchsorted_columns(sorted_values: np.ndarray, values: np.ndarray, side: str = "left") -> np.ndarray:
+    """
+    Vectorized version of `np.searchsorted` applied to each column: finds the indices into each column of
+    `sorted_values` at which the entries of the same column of `values` would have to be inserted to maintain order.
+
+    :param sorted_values: Array of shape `(nb_sorted, nb_columns)` sorted in ascending order along the first axis.
+    :param values: Array of shape `(nb_values, nb_columns)`.
+    :param side: If `left`, the index of the first suitable location is given, if `right` the last such index.
+    :return: Insertion indices of shape `(nb_values, nb_columns)`.
+    """
+    lower = np.zeros(values.shape, dtype=np.int64)
+    upper = np.full(values.shape, sorted_values.shape[0], dtype=np.int64)
+    columns = np.arange(values.shape[1])
+
+    # Binary search on all columns at once
+    active = lower < upper
+    while np.any(active):
+        middle = (lower + upper) // 2
+        middle_values = sorted_values[np.minimum(middle, sorted_values.shape[0] - 1), columns]
+        if side == "left":
+            go_right = middle_values < values
+        else:
+            go_right = middle_values <= values
+        lower = np.where(active & go_right, middle + 1, lower)
+        upper = np.where(active & ~go_right, middle, upper)
+        active = lower < upper
+
+    return lower
+
+
+def _scan_run(clean_pvalranges: np.ndarray, combined_pvalranges: np.ndarray) -> Tuple[float, float]:
+    """
+    Scan the p-value ranges of one run of `SubsetScanningDetector.scan` in a worker process.
+
+    :param clean_pvalranges: P-value ranges of the clean records of the run.
+    :param combined_pvalranges: P-value ranges of the clean and adversarial records of the run.
+    :return: (clean_score, adv_score).
+    """
+    np.random.seed()
+
+    clean_score, _, _, _ = Scanner.fgss_for_nets(clean_pvalranges)
+    adv_score, _, _, _ = Scanner.fgss_for_nets(combined_pvalranges)
+
+    return clean_score, adv_score
@@ -18,6 +18,7 @@
 """
 Subset scanning based on FGSS
 """
+from concurrent.futures import ProcessPoolExecutor
 from typing import Callable, Tuple
 
 import numpy as np
@@ -84,6 +85,43 @@ class Scanner:
 
         return best_score, image_sub, node_sub, optimal_alpha
 
+    @staticmethod
+    def fgss_individ_for_nets_batch(
+        pvalues: np.ndarray,
+        a_max: float = 0.5,
+        score_function: Callable[[list, list, np.ndarray], np.ndarray] = ScoringFunctions.get_score_bj_fast,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the highest scoring subset of nodes for each of a batch of individual inputs with the method of
+        `fgss_individ_for_nets`. The pmax values of each input are sorted once and every distinct pmax not greater
+        than `a_max` is scored as alpha threshold, with the number of pmax values less or equal to it.
+
+        :param pvalues: pvalue ranges of shape `(nb_inputs, nb_nodes, 2)`.
+        :param a_max: alpha max. determines the significance level threshold
+        :param score_function: scoring function
+        :return: (best_scores, optimal_alphas), arrays of shape `(nb_inputs,)`. Inputs without any pmax less or equal
+                 to `a_max` have a best score of `-inf`.
+        """
+        sorted_pmaxes = np.sort(pvalues[:, :, 1], axis=1)
+        nb_inputs, nb_nodes = sorted_pmaxes.shape
+
+        # a sorted pmax is a threshold to scan if it is the last occurrence of its value and at most a_max
+        is_threshold = np.ones((nb_inputs, nb_nodes), dtype=bool)
+        is_threshold[:, :-1] = sorted_pmaxes[:, :-1] != sorted_pmaxes[:, 1:]
+        is_threshold &= sorted_pmaxes <= a_max
+
+        # In individual input case we have n_a = N, so cumulative count is used for both.
+        cumulative_count = np.broadcast_to(np.arange(1, nb_nodes + 1), (nb_inputs, nb_nodes))[is_threshold]
+        scores = np.full((nb_inputs, nb_nodes), -np.inf)
+        scores[is_threshold] = score_function(cumulative_count, cumulative_count, sorted_pmaxes[is_threshold])
+
+        # scoring completed, now grab the max (and index)
+        best_score_idx = np.argmax(scores, axis=1)
+        best_scores = scores[np.arange(nb_inputs), best_score_idx]
+        optimal_alphas = sorted_pmaxes[np.arange(nb_inputs), best_score_idx]
+
+        return best_scores, optimal_alphas
+
     @staticmethod
     def fgss_for_nets(
         pvalues: np.ndarray,
@@ -91,6 +129,7 @@ class Scanner:
         restarts: int = 10,
         image_to_node_init: bool = False,
         score_function: Callable[[list, list, np.ndarray], np.ndarray] = ScoringFunctions.get_score_bj_fast,
+        nb_jobs: int = 1,
     ) -> Tuple[float, np.ndarray, np.ndarray, float]:
         """
         Finds the highest scoring subset of records and attribute. Return the subsets, the score, and the alpha that
@@ -101,6 +140,7 @@ class Scanner:
         :param restarts: number of iterative restarts
         :param image_to_node_init: intializes what direction to begin the search: image to node or vice-versa
         :param score_function: scoring function
+        :param nb_jobs: number of worker processes running the restarts in parallel
         :return: (best_score, image_sub, node_sub, optimal_alpha)
         """
         best_score = -100000.0
@@ -108,77 +148,41 @@ class Scanner:
         if len(pvalues) < restarts:
             restarts = len(pvalues)
 
+        # draw the seeds of all restarts upfront, the restarts themselves are deterministic
+        image_to_node = image_to_node_init
+        nb_seeds = pvalues.shape[0] if image_to_node else pvalues.shape[1]
+        seeds = []
         for r_indx in range(0, restarts):  # do random restarts to come close to global maximum
-            image_to_node = image_to_node_init
             if r_indx == 0:
-                if image_to_node:
-                    # all 1's for number of rows
-                    indices_of_seeds = np.arange(pvalues.shape[0])
-                else:
-                    # all 1's for number of cols
-                    indices_of_seeds = np.arange(pvalues.shape[1])
-
-                (
-                    best_score_from_restart,
-                    best_image_sub_from_restart,
-                    best_node_sub_from_restart,
-                    best_alpha_from_restart,
-                ) = ScanningOps.single_restart(pvalues, a_max, indices_of_seeds, image_to_node, score_function)
-
-                if best_score_from_restart > best_score:
-                    best_score = best_score_from_restart
-                    image_sub = best_image_sub_from_restart
-                    node_sub = best_node_sub_from_restart
-                    optimal_alpha = best_alpha_from_restart
-
-                # Finished A Restart
+                # all 1's for number of rows (image to node) or cols (node to image)
+                indices_of_seeds = np.arange(nb_seeds)
             else:
                 # New Restart
                 # some some randomizing and only leave in a random number of rows of pvalues TODO
-                prob = np.random.uniform(0, 1)
-                if image_to_node:
-                    indices_of_seeds = np.random.choice(
-                        np.arange(pvalues.shape[0]),
-                        int(pvalues.shape[0] * prob),
-                        replace=False,
-                    )
-                else:
-                    indices_of_seeds = np.random.choice(
-                        np.arange(pvalues.shape[1]),
-                        int(pvalues.shape[1] * prob),
-                        replace=False,
-                    )
+                indices_of_seeds = np.empty(0, dtype=int)
                 while indices_of_seeds.size == 0:
                     # eventually will make non zero
                     prob = np.random.uniform(0, 1)
-                    if image_to_node:
-                        indices_of_seeds = np.random.choice(
-                            np.arange(pvalues.shape[0]),
-                            int(pvalues.shape[0] * prob),
-                            replace=False,
-                        )
-                    else:
-                        indices_of_seeds = np.random.choice(
-                            np.arange(pvalues.shape[1]),
-                            int(pvalues.shape[1] * prob),
-                            replace=False,
-                        )
-
-                indices_of_seeds.astype(int)
-                # process a random subset of rows of pvalues array
-                (
-                    best_score_from_restart,
-                    best_image_sub_from_restart,
-                    best_node_sub_from_restart,
-                    best_alpha_from_restart,
-                ) = ScanningOps.single_restart(pvalues, a_max, indices_of_seeds, image_to_node, score_function)
-
-                if best_score_from_restart > best_score:
-                    best_score = best_score_from_restart
-                    image_sub = best_image_sub_from_restart
-                    node_sub = best_node_sub_from_restart
-                    optimal_alpha = best_alpha_from_restart
-
-                # Finished A Restart
+                    indices_of_seeds = np.random.choice(np.arange(nb_seeds), int(nb_seeds * prob), replace=False)
+            seeds.append(indices_of_seeds)
+
+        args = [(pvalues, a_max, indices_of_seeds, image_to_node, score_function) for indices_of_seeds in seeds]
+        if nb_jobs > 1:
+            with ProcessPoolExecutor(max_workers=nb_jobs) as executor:
+                results = list(executor.map(ScanningOps.single_restart, *zip(*args)))
+        else:
+            results = [ScanningOps.single_restart(*arg) for arg in args]
+
+        for (
+            best_score_from_restart,
+            best_image_sub_from_restart,
+            best_node_sub_from_restart,
+            best_alpha_from_restart,
+        ) in results:
+            if best_score_from_restart > best_score:
+                best_score = best_score_from_restart
+                image_sub = best_image_sub_from_restart
+                node_sub = best_node_sub_from_restart
+                optimal_alpha = best_alpha_from_restart
 
         return best_score, image_sub, node_sub, optimal_alpha
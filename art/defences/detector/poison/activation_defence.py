@@ -26,6 +26,7 @@ This module implements methods performing poisoning detection based on activatio
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ProcessPoolExecutor
 import logging
 import os
 import pickle
@@ -61,9 +62,17 @@ class ActivationDefence(PoisonFilteringDefence):
         in general, see https://arxiv.org/abs/1902.06705
     """
 
-    defence_params = ["nb_clusters", "clustering_method", "nb_dims", "reduce", "cluster_analysis", "generator"]
-    valid_clustering = ["KMeans"]
-    valid_reduce = ["PCA", "FastICA", "TSNE"]
+    defence_params = [
+        "nb_clusters",
+        "clustering_method",
+        "nb_dims",
+        "reduce",
+        "cluster_analysis",
+        "generator",
+        "nb_jobs",
+    ]
+    valid_clustering = ["KMeans", "MiniBatchKMeans"]
+    valid_reduce = ["PCA", "FastICA", "TSNE", "IncrementalPCA"]
     valid_analysis = ["smaller", "distance", "relative-size", "silhouette-scores"]
 
     TOO_SMALL_ACTIVATIONS = 32  # Threshold used to print a warning when activations are not enough
@@ -91,6 +100,7 @@ class ActivationDefence(PoisonFilteringDefence):
         self.reduce = "PCA"
         self.cluster_analysis = "smaller"
         self.generator = generator
+        self.nb_jobs = 1
         self.activations_by_class: List[np.ndarray] = []
         self.clusters_by_class: List[np.ndarray] = []
         self.assigned_clean_by_class: List[np.ndarray] = []
@@ -126,24 +136,23 @@ class ActivationDefence(PoisonFilteringDefence):
             self.clusters_by_class,
             self.red_activations_by_class,
         ) = self.cluster_activations()
-        _, self.assigned_clean_by_class = self.analyze_clusters()
+        _, self.assigned_clean_by_class = self.analyze_clusters(build_report=False)
 
         # Now check ground truth:
         if self.generator is not None:
             batch_size = self.generator.batch_size
             num_samples = self.generator.size
             num_classes = self.classifier.nb_classes
-            self.is_clean_by_class = [np.empty(0, dtype=int) for _ in range(num_classes)]
+            is_clean_by_class_batches: List[List[np.ndarray]] = [[np.empty(0, dtype=int)] for _ in range(num_classes)]
 
             # calculate is_clean_by_class for each batch
             for batch_idx in range(num_samples // batch_size):  # type: ignore
                 _, y_batch = self.generator.get_batch()
                 is_clean_batch = is_clean[batch_idx * batch_size : batch_idx * batch_size + batch_size]
                 clean_by_class_batch = self._segment_by_class(is_clean_batch, y_batch)
-                self.is_clean_by_class = [
-                    np.append(self.is_clean_by_class[class_idx], clean_by_class_batch[class_idx])
-                    for class_idx in range(num_classes)
-                ]
+                for class_idx in range(num_classes):
+                    is_clean_by_class_batches[class_idx].append(clean_by_class_batch[class_idx])
+            self.is_clean_by_class = [np.concatenate(batches) for batches in is_clean_by_class_batches]
 
         else:
             self.is_clean_by_class = self._segment_by_class(is_clean, self.y_train)
@@ -235,22 +244,70 @@ class ActivationDefence(PoisonFilteringDefence):
         self.set_params(**kwargs)
 
         if self.generator is not None:
-            batch_size = self.generator.batch_size
-            num_samples = self.generator.size
-            num_classes = self.classifier.nb_classes
-            for batch_idx in range(num_samples // batch_size):  # type: ignore
-                x_batch, y_batch = self.generator.get_batch()
+            return self._cluster_activations_generator()
+
+        if not self.activations_by_class:
+            activations = self._get_activations()
+            self.activations_by_class = self._segment_by_class(activations, self.y_train)
+
+        [self.clusters_by_class, self.red_activations_by_class] = cluster_activations(
+            self.activations_by_class,
+            nb_clusters=self.nb_clusters,
+            nb_dims=self.nb_dims,
+            reduce=self.reduce,
+            clustering_method=self.clustering_method,
+            nb_jobs=self.nb_jobs,
+        )
 
-                batch_activations = self._get_activations(x_batch)
-                activation_dim = batch_activations.shape[-1]
+        return self.clusters_by_class, self.red_activations_by_class
+
+    def _cluster_activations_generator(self) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Clusters the activations of the data provided by the generator. The activations of each class are collected
+        batch by batch and concatenated once. With the `IncrementalPCA` reduction, one reducer per class is fitted on
+        the batches as they arrive and the reduced activations of each class are clustered at the end, otherwise each
+        batch is reduced and clustered on its own.
+
+        :return: Clusters per class and activations by class.
+        """
+        if self.generator is None:
+            raise ValueError("No generator provided.")
+
+        from sklearn.decomposition import IncrementalPCA
+
+        batch_size = self.generator.batch_size
+        num_samples = self.generator.size
+        num_classes = self.classifier.nb_classes
+        incremental = self.reduce == "IncrementalPCA"
+
+        activations_batches: List[List[np.ndarray]] = [[] for _ in range(num_classes)]
+        clusters_batches: List[List[np.ndarray]] = [[np.empty(0, dtype=int)] for _ in range(num_classes)]
+        red_activations_batches: List[List[np.ndarray]] = [[] for _ in range(num_classes)]
+        reducers = [IncrementalPCA(n_components=self.nb_dims) for _ in range(num_classes)]
+        pending: List[List[np.ndarray]] = [[] for _ in range(num_classes)]
+        activation_dim = 0
 
-                # initialize values list of lists on first run
-                if batch_idx == 0:
-                    self.activations_by_class = [np.empty((0, activation_dim)) for _ in range(num_classes)]
-                    self.clusters_by_class = [np.empty(0, dtype=int) for _ in range(num_classes)]
-                    self.red_activations_by_class = [np.empty((0, self.nb_dims)) for _ in range(num_classes)]
+        for _ in range(num_samples // batch_size):  # type: ignore
+            x_batch, y_batch = self.generator.get_batch()
 
-                activations_by_class = self._segment_by_class(batch_activations, y_batch)
+            batch_activations = self._get_activations(x_batch)
+            activation_dim = batch_activations.shape[-1]
+            activations_by_class = self._segment_by_class(batch_activations, y_batch)
+
+            for class_idx in range(num_classes):
+                activations_batches[class_idx].append(activations_by_class[class_idx])
+
+            if incremental:
+                if activation_dim <= self.nb_dims:
+                    continue
+
+                # partially fit the reducers as soon as enough activations of a class are available
+                for class_idx in range(num_classes):
+                    pending[class_idx].append(activations_by_class[class_idx])
+                    if sum(len(activations) for activations in pending[class_idx]) >= self.nb_dims:
+                        reducers[class_idx].partial_fit(np.concatenate(pending[class_idx]))
+                        pending[class_idx] = []
+            else:
                 clusters_by_class, red_activations_by_class = cluster_activations(
                     activations_by_class,
                     nb_clusters=self.nb_clusters,
@@ -260,37 +317,48 @@ class ActivationDefence(PoisonFilteringDefence):
                     generator=self.generator,
                     clusterer_new=self.clusterer,
                 )
-
                 for class_idx in range(num_classes):
-                    self.activations_by_class[class_idx] = np.vstack(
-                        [self.activations_by_class[class_idx], activations_by_class[class_idx]]
-                    )
-                    self.clusters_by_class[class_idx] = np.append(
-                        self.clusters_by_class[class_idx], clusters_by_class[class_idx]
-                    )
-                    self.red_activations_by_class[class_idx] = np.vstack(
-                        [self.red_activations_by_class[class_idx], red_activations_by_class[class_idx]]
-                    )
-            return self.clusters_by_class, self.red_activations_by_class
+                    clusters_batches[class_idx].append(clusters_by_class[class_idx])
+                    red_activations_batches[class_idx].append(red_activations_by_class[class_idx])
 
-        if not self.activations_by_class:
-            activations = self._get_activations()
-            self.activations_by_class = self._segment_by_class(activations, self.y_train)
+        self.activations_by_class = [
+            np.concatenate([np.empty((0, activation_dim))] + batches) for batches in activations_batches
+        ]
 
-        [self.clusters_by_class, self.red_activations_by_class] = cluster_activations(
-            self.activations_by_class,
-            nb_clusters=self.nb_clusters,
-            nb_dims=self.nb_dims,
-            reduce=self.reduce,
-            clustering_method=self.clustering_method,
-        )
+        if incremental:
+            red_activations_by_class = []
+            for class_idx, activations in enumerate(self.activations_by_class):
+                if activation_dim > self.nb_dims and pending[class_idx]:
+                    remaining = np.concatenate(pending[class_idx])
+                    if len(remaining) >= self.nb_dims:
+                        reducers[class_idx].partial_fit(remaining)
+                if hasattr(reducers[class_idx], "components_"):
+                    red_activations_by_class.append(reducers[class_idx].transform(activations))
+                else:
+                    red_activations_by_class.append(activations)
+
+            self.clusters_by_class, self.red_activations_by_class = cluster_activations(
+                red_activations_by_class,
+                nb_clusters=self.nb_clusters,
+                nb_dims=self.nb_dims,
+                reduce=self.reduce,
+                clustering_method=self.clustering_method,
+                nb_jobs=self.nb_jobs,
+            )
+        else:
+            self.clusters_by_class = [np.concatenate(batches) for batches in clusters_batches]
+            self.red_activations_by_class = [
+                np.concatenate([np.empty((0, self.nb_dims))] + batches) for batches in red_activations_batches
+            ]
 
         return self.clusters_by_class, self.red_activations_by_class
 
-    def analyze_clusters(self, **kwargs) -> Tuple[Dict[str, Any], np.ndarray]:
+    def analyze_clusters(self, build_report: bool = True, **kwargs) -> Tuple[Dict[str, Any], np.ndarray]:
         """
         This function analyzes the clusters according to the provided method.
 
+        :param build_report: If False, the report only contains the summary of the analysis and not the details of
+                             every class.
         :param kwargs: A dictionary of cluster-analysis-specific parameters.
         :return: (report, assigned_clean_by_class), where the report is a dict object and assigned_clean_by_class
                  is an array of arrays that contains what data points where classified as clean.
@@ -306,22 +374,24 @@ class ActivationDefence(PoisonFilteringDefence):
                 self.assigned_clean_by_class,
                 self.poisonous_clusters,
                 report,
-            ) = analyzer.analyze_by_size(self.clusters_by_class)
+            ) = analyzer.analyze_by_size(self.clusters_by_class, build_report=build_report)
         elif self.cluster_analysis == "relative-size":
             (
                 self.assigned_clean_by_class,
                 self.poisonous_clusters,
                 report,
-            ) = analyzer.analyze_by_relative_size(self.clusters_by_class)
+            ) = analyzer.analyze_by_relative_size(self.clusters_by_class, build_report=build_report)
         elif self.cluster_analysis == "distance":
             (self.assigned_clean_by_class, self.poisonous_clusters, report,) = analyzer.analyze_by_distance(
                 self.clusters_by_class,
                 separated_activations=self.red_activations_by_class,
+                build_report=build_report,
             )
         elif self.cluster_analysis == "silhouette-scores":
             (self.assigned_clean_by_class, self.poisonous_clusters, report,) = analyzer.analyze_by_silhouette_score(
                 self.clusters_by_class,
                 reduced_activations_by_class=self.red_activations_by_class,
+                build_report=build_report,
             )
         else:
             raise ValueError("Unsupported cluster analysis technique " + self.cluster_analysis)
@@ -572,6 +642,8 @@ class ActivationDefence(PoisonFilteringDefence):
             raise ValueError("Unsupported method for cluster analysis method: " + self.cluster_analysis)
         if self.generator and not isinstance(self.generator, DataGenerator):
             raise TypeError("Generator must a an instance of DataGenerator")
+        if not isinstance(self.nb_jobs, (int, np.int)) or self.nb_jobs <= 0:
+            raise ValueError("The number of jobs must be a positive integer.")
 
     def _get_activations(self, x_train: Optional[np.ndarray] = None) -> np.ndarray:
         """
@@ -676,6 +748,7 @@ def cluster_activations(
     clustering_method: str = "KMeans",
     generator: Optional[DataGenerator] = None,
     clusterer_new: Optional[MiniBatchKMeans] = None,
+    nb_jobs: int = 1,
 ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
     """
     Clusters activations and returns two arrays.
@@ -692,43 +765,77 @@ def cluster_activations(
     :param generator: whether or not a the activations are a batch or full activations
     :return: (separated_clusters, separated_reduced_activations).
     :param clusterer_new: whether or not a the activations are a batch or full activations
+    :param nb_jobs: Number of worker processes clustering the activations of different classes in parallel. The
+                    classes are processed sequentially if `clusterer_new` is used with a generator.
     :return: (separated_clusters, separated_reduced_activations)
     """
-    separated_clusters = []
-    separated_reduced_activations = []
-
-    if clustering_method == "KMeans":
-        clusterer = KMeans(n_clusters=nb_clusters)
-    else:
+    if clustering_method not in ["KMeans", "MiniBatchKMeans"]:
         raise ValueError(clustering_method + " clustering method not supported.")
 
-    for activation in separated_activations:
-        # Apply dimensionality reduction
-        nb_activations = np.shape(activation)[1]
-        if nb_activations > nb_dims:
-            # TODO: address issue where if fewer samples than nb_dims this fails
-            reduced_activations = reduce_dimensionality(activation, nb_dims=nb_dims, reduce=reduce)
-        else:
-            logger.info(
-                "Dimensionality of activations = %i less than nb_dims = %i. Not applying dimensionality " "reduction.",
-                nb_activations,
-                nb_dims,
-            )
-            reduced_activations = activation
-        separated_reduced_activations.append(reduced_activations)
+    if generator is not None and clusterer_new is not None:
+        separated_clusters = []
+        separated_reduced_activations = []
+        for activation in separated_activations:
+            reduced_activations = _reduce_class_activations(activation, nb_dims, reduce)
+            separated_reduced_activations.append(reduced_activations)
 
-        # Get cluster assignments
-        if generator is not None and clusterer_new is not None:
+            # Get cluster assignments
             clusterer_new = clusterer_new.partial_fit(reduced_activations)
             # NOTE: this may cause earlier predictions to be less accurate
-            clusters = clusterer_new.predict(reduced_activations)
-        else:
-            clusters = clusterer.fit_predict(reduced_activations)
-        separated_clusters.append(clusters)
+            separated_clusters.append(clusterer_new.predict(reduced_activations))
+
+        return separated_clusters, separated_reduced_activations
+
+    args = [(activation, nb_clusters, nb_dims, reduce, clustering_method) for activation in separated_activations]
+    if nb_jobs > 1:
+        with ProcessPoolExecutor(max_workers=nb_jobs) as executor:
+            results = list(executor.map(_cluster_class_activations, *zip(*args)))
+    else:
+        results = [_cluster_class_activations(*arg) for arg in args]
+
+    separated_clusters = [clusters for clusters, _ in results]
+    separated_reduced_activations = [reduced_activations for _, reduced_activations in results]
 
     return separated_clusters, separated_reduced_activations
 
 
+def _reduce_class_activations(activation: np.ndarray, nb_dims: int, reduce: str) -> np.ndarray:
+    """
+    Apply dimensionality reduction to the activations of one class if they have more than `nb_dims` dimensions.
+    """
+    nb_activations = np.shape(activation)[1]
+    if nb_activations > nb_dims:
+        # TODO: address issue where if fewer samples than nb_dims this fails
+        return reduce_dimensionality(activation, nb_dims=nb_dims, reduce=reduce)
+
+    logger.info(
+        "Dimensionality of activations = %i less than nb_dims = %i. Not applying dimensionality " "reduction.",
+        nb_activations,
+        nb_dims,
+    )
+    return activation
+
+
+def _cluster_class_activations(
+    activation: np.ndarray, nb_clusters: int, nb_dims: int, reduce: str, clustering_method: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce and cluster the activations of one class.
+
+    :return: (clusters, reduced_activations).
+    """
+    reduced_activations = _reduce_class_activations(activation, nb_dims, reduce)
+
+    # Get cluster assignments
+    if clustering_method == "MiniBatchKMeans":
+        clusterer = MiniBatchKMeans(n_clusters=nb_clusters)
+    else:
+        clusterer = KMeans(n_clusters=nb_clusters)
+    clusters = clusterer.fit_predict(reduced_activations)
+
+    return clusters, reduced_activations
+
+
 def reduce_dimensionality(activations: np.ndarray, nb_dims: int = 10, reduce: str = "FastICA") -> np.ndarray:
     """
     Reduces dimensionality of the activations provided using the specified number of dimensions and reduction technique.
@@ -739,12 +846,14 @@ def reduce_dimensionality(activations: np.ndarray, nb_dims: int = 10, reduce: st
     :return: Array with the reduced activations.
     """
     # pylint: disable=E0001
-    from sklearn.decomposition import FastICA, PCA
+    from sklearn.decomposition import FastICA, IncrementalPCA, PCA
 
     if reduce == "FastICA":
         projector = FastICA(n_components=nb_dims, max_iter=1000, tol=0.005)
     elif reduce == "PCA":
         projector = PCA(n_components=nb_dims)
+    elif reduce == "IncrementalPCA":
+        projector = IncrementalPCA(n_components=nb_dims)
     else:
         raise ValueError(reduce + " dimensionality reduction method not supported.")
 
@@ -48,13 +48,77 @@ class ClusteringAnalyzer:
         assigned_clean[np.isin(clusters, poison_clusters)] = 0
         return assigned_clean
 
+    @staticmethod
+    def _cluster_sizes(separated_clusters: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Counts the data points of every cluster of every class in one pass over all cluster assignments.
+
+        :param separated_clusters: list where separated_clusters[i] is the cluster assignments for the ith class.
+        :return: sizes, present, clusters, class_ids:
+                 where sizes[i][j] is the number of data points of class i in cluster j, present[i][j] is True if
+                 cluster j is not larger than the largest cluster of class i, clusters is the concatenation of all
+                 cluster assignments and class_ids[k] is the class of clusters[k].
+        """
+        nb_classes = len(separated_clusters)
+        lengths = [len(clusters) for clusters in separated_clusters]
+        clusters = np.concatenate([np.empty(0, dtype=int)] + [np.asarray(c, dtype=int) for c in separated_clusters])
+        class_ids = np.repeat(np.arange(nb_classes), lengths)
+
+        nb_clusters = len(np.unique(separated_clusters[0]))
+        if clusters.size > 0:
+            nb_clusters = max(nb_clusters, int(np.max(clusters)) + 1)
+        sizes = np.bincount(class_ids * nb_clusters + clusters, minlength=nb_classes * nb_clusters)
+        sizes = sizes.reshape(nb_classes, nb_clusters)
+
+        max_clusters = np.full(nb_classes, -1)
+        np.maximum.at(max_clusters, class_ids, clusters)
+        present = np.arange(nb_clusters)[np.newaxis, :] <= max_clusters[:, np.newaxis]
+        return sizes, present, clusters, class_ids
+
+    @staticmethod
+    def _assign_clean_by_class(
+        separated_clusters: List[np.ndarray], clusters: np.ndarray, class_ids: np.ndarray, poison: np.ndarray
+    ) -> np.ndarray:
+        """
+        Determines for all data points at once whether they are in a clean or poisonous cluster of their class.
+
+        :param separated_clusters: list where separated_clusters[i] is the cluster assignments for the ith class.
+        :param clusters: Concatenation of all cluster assignments.
+        :param class_ids: `class_ids[k]` is the class of `clusters[k]`.
+        :param poison: `poison[i][j]` is True if cluster j of class i is poisonous.
+        :return: all_assigned_clean, where all_assigned_clean[i] indicates for every data point of class i whether it
+                 is clean.
+        """
+        assigned_clean = 1.0 - poison[class_ids, clusters]
+        splits = np.cumsum([len(clusters_i) for clusters_i in separated_clusters])[:-1]
+        return np.asarray(np.split(assigned_clean, splits))
+
+    @staticmethod
+    def _size_report(report: Dict[str, Any], sizes: np.ndarray, poison: np.ndarray) -> None:
+        """
+        Adds the relative size and suspiciousness of every cluster of every class to the report.
+
+        :param report: Dictionary with summary of the analysis.
+        :param sizes: `sizes[i][j]` is the number of data points of class i in cluster j.
+        :param poison: `poison[i][j]` is True if cluster j of class i is poisonous.
+        """
+        ptc = np.round(sizes / np.sum(sizes, axis=1, keepdims=True), 2).tolist()
+        poison = poison.tolist()
+        for i, (ptc_i, poison_i) in enumerate(zip(ptc, poison)):
+            report["Class_" + str(i)] = {
+                "cluster_" + str(cluster_id): dict(ptc_data_in_cluster=ptc_c, suspicious_cluster=susp)
+                for cluster_id, (ptc_c, susp) in enumerate(zip(ptc_i, poison_i))
+            }
+
     def analyze_by_size(
-        self, separated_clusters: List[np.ndarray]
+        self, separated_clusters: List[np.ndarray], build_report: bool = True
     ) -> Tuple[np.ndarray, List[List[int]], Dict[str, int]]:
         """
         Designates as poisonous the cluster with less number of items on it.
 
         :param separated_clusters: list where separated_clusters[i] is the cluster assignments for the ith class.
+        :param build_report: If False, only the summary of the analysis is reported and the per class details are
+                             skipped.
         :return: all_assigned_clean, summary_poison_clusters, report:
                  where all_assigned_clean[i] is a 1D boolean array indicating whether
                  a given data point was determined to be clean (as opposed to poisonous) and
@@ -67,46 +131,26 @@ class ClusteringAnalyzer:
             "suspicious_clusters": 0,
         }
 
-        all_assigned_clean = []
-        nb_classes = len(separated_clusters)
-        nb_clusters = len(np.unique(separated_clusters[0]))
-        summary_poison_clusters: List[List[int]] = [[0 for _ in range(nb_clusters)] for _ in range(nb_classes)]
-
-        for i, clusters in enumerate(separated_clusters):
-
-            # assume that smallest cluster is poisonous and all others are clean
-            sizes = np.bincount(clusters)
-            total_dp_in_class = np.sum(sizes)
-            poison_clusters: List[int] = [int(np.argmin(sizes))]
-            clean_clusters = list(set(clusters) - set(poison_clusters))
+        sizes, present, clusters, class_ids = self._cluster_sizes(separated_clusters)
 
-            for p_id in poison_clusters:
-                summary_poison_clusters[i][p_id] = 1
-            for c_id in clean_clusters:
-                summary_poison_clusters[i][c_id] = 0
+        # assume that smallest cluster is poisonous and all others are clean
+        smallest = np.argmin(np.where(present, sizes, np.inf), axis=1)
+        poison = np.zeros(sizes.shape, dtype=bool)
+        poison[np.arange(len(sizes)), smallest] = True
 
-            assigned_clean = self.assign_class(clusters, clean_clusters, poison_clusters)
-            all_assigned_clean.append(assigned_clean)
+        all_assigned_clean = self._assign_clean_by_class(separated_clusters, clusters, class_ids, poison)
 
-            # Generate report for this class:
-            report_class = dict()
-            for cluster_id in range(nb_clusters):
-                ptc = sizes[cluster_id] / total_dp_in_class
-                susp = cluster_id in poison_clusters
-                dict_i = dict(ptc_data_in_cluster=round(ptc, 2), suspicious_cluster=susp)
+        if build_report:
+            self._size_report(report, sizes, poison)
 
-                dict_cluster: Dict[str, Dict[str, int]] = {"cluster_" + str(cluster_id): dict_i}
-                report_class.update(dict_cluster)
-
-            report["Class_" + str(i)] = report_class
-
-        report["suspicious_clusters"] = report["suspicious_clusters"] + np.sum(summary_poison_clusters).item()
-        return np.asarray(all_assigned_clean), summary_poison_clusters, report
+        report["suspicious_clusters"] = report["suspicious_clusters"] + int(np.sum(poison))
+        return all_assigned_clean, poison.astype(int).tolist(), report
 
     def analyze_by_distance(
         self,
         separated_clusters: List[np.ndarray],
         separated_activations: List[np.ndarray],
+        build_report: bool = True,
     ) -> Tuple[np.ndarray, List[List[int]], Dict[str, int]]:
         """
         Assigns a cluster as poisonous if its median activation is closer to the median activation for another class
@@ -115,6 +159,8 @@ class ClusteringAnalyzer:
 
         :param separated_clusters: list where separated_clusters[i] is the cluster assignments for the ith class.
         :param separated_activations: list where separated_activations[i] is a 1D array of [0,1] for [poison,clean].
+        :param build_report: If False, only the summary of the analysis is reported and the per class details are
+                             skipped.
         :return: all_assigned_clean, summary_poison_clusters, report:
                  where all_assigned_clean[i] is a 1D boolean array indicating whether a given data point was determined
                  to be clean (as opposed to poisonous) and summary_poison_clusters: array, where
@@ -122,81 +168,62 @@ class ClusteringAnalyzer:
                  report: Dictionary with summary of the analysis.
         """
         report: Dict[str, Any] = {"cluster_analysis": 0.0}
-        all_assigned_clean = []
-        cluster_centers = []
 
         nb_classes = len(separated_clusters)
-        nb_clusters = len(np.unique(separated_clusters[0]))
-        summary_poison_clusters: List[List[int]] = [[0 for _ in range(nb_clusters)] for _ in range(nb_classes)]
+        _, _, clusters, class_ids = self._cluster_sizes(separated_clusters)
 
         # assign centers
-        for _, activations in enumerate(separated_activations):
-            cluster_centers.append(np.median(activations, axis=0))
-
-        for i, (clusters, activation) in enumerate(zip(separated_clusters, separated_activations)):
-            clusters = np.array(clusters)
-
-            cluster0_center = np.median(activation[np.where(clusters == 0)], axis=0)
-            cluster1_center = np.median(activation[np.where(clusters == 1)], axis=0)
-
-            cluster0_distance = np.linalg.norm(cluster0_center - cluster_centers[i])
-            cluster1_distance = np.linalg.norm(cluster1_center - cluster_centers[i])
-
-            cluster0_is_poison = False
-            cluster1_is_poison = False
-
-            dict_k = dict()
-            dict_cluster_0 = dict(cluster0_distance_to_its_class=str(cluster0_distance))
-            dict_cluster_1 = dict(cluster1_distance_to_its_class=str(cluster1_distance))
-            for k, center in enumerate(cluster_centers):
-                if k == i:
-                    pass
-                else:
-                    cluster0_distance_to_k = np.linalg.norm(cluster0_center - center)
-                    cluster1_distance_to_k = np.linalg.norm(cluster1_center - center)
-
-                    if cluster0_distance_to_k < cluster0_distance and cluster1_distance_to_k > cluster1_distance:
-                        cluster0_is_poison = True
-                    if cluster1_distance_to_k < cluster1_distance and cluster0_distance_to_k > cluster0_distance:
-                        cluster1_is_poison = True
-
-                    dict_cluster_0["distance_to_class_" + str(k)] = str(cluster0_distance_to_k)
-                    dict_cluster_0["suspicious"] = str(cluster0_is_poison)
-
-                    dict_cluster_1["distance_to_class_" + str(k)] = str(cluster1_distance_to_k)
-                    dict_cluster_1["suspicious"] = str(cluster1_is_poison)
-
-                    dict_k.update(dict_cluster_0)
-                    dict_k.update(dict_cluster_1)
-
-            report_class = dict(cluster_0=dict_cluster_0, cluster_1=dict_cluster_1)
-            report["Class_" + str(i)] = report_class
-
-            poison_clusters = []
-            if cluster0_is_poison:
-                poison_clusters.append(0)
-                summary_poison_clusters[i][0] = 1
-            else:
-                summary_poison_clusters[i][0] = 0
-
-            if cluster1_is_poison:
-                poison_clusters.append(1)
-                summary_poison_clusters[i][1] = 1
-            else:
-                summary_poison_clusters[i][1] = 0
-
-            clean_clusters = list(set(clusters) - set(poison_clusters))
-            assigned_clean = self.assign_class(clusters, clean_clusters, poison_clusters)
-            all_assigned_clean.append(assigned_clean)
-
-        all_assigned_clean = np.asarray(all_assigned_clean)
-        return all_assigned_clean, summary_poison_clusters, report
+        class_centers = np.array([np.median(activations, axis=0) for activations in separated_activations])
+        cluster_centers = np.array(
+            [
+                [np.median(activations[np.asarray(clusters_i) == cluster_id], axis=0) for cluster_id in range(2)]
+                for clusters_i, activations in zip(separated_clusters, separated_activations)
+            ]
+        )
+
+        # distances[i][j][k] is the distance between the center of cluster j of class i and the center of class k,
+        # computed with the same norm as the per class analysis to keep the reported values identical
+        distances = np.array(
+            [
+                [np.linalg.norm(cluster_center - class_center) for class_center in class_centers]
+                for cluster_center in np.reshape(cluster_centers, (2 * nb_classes,) + class_centers.shape[1:])
+            ]
+        )
+        distances = np.reshape(distances, (nb_classes, 2, nb_classes))
+        own_distances = distances[np.arange(nb_classes), :, np.arange(nb_classes)]
+
+        # the distances of a cluster to its own class are neither smaller nor larger and never flag a cluster
+        closer = distances < own_distances[:, :, np.newaxis]
+        farther = distances > own_distances[:, :, np.newaxis]
+        poison = np.stack(
+            [np.any(closer[:, 0] & farther[:, 1], axis=1), np.any(closer[:, 1] & farther[:, 0], axis=1)], axis=1
+        )
+
+        all_assigned_clean = self._assign_clean_by_class(separated_clusters, clusters, class_ids, poison)
+
+        if build_report:
+            for i in range(nb_classes):
+                report_class = dict()
+                for cluster_id in range(2):
+                    dict_cluster = {
+                        "cluster" + str(cluster_id) + "_distance_to_its_class": str(distances[i, cluster_id, i])
+                    }
+                    for k, distance in enumerate(distances[i, cluster_id]):
+                        if k != i:
+                            dict_cluster["distance_to_class_" + str(k)] = str(distance)
+                    if nb_classes > 1:
+                        dict_cluster["suspicious"] = str(bool(poison[i, cluster_id]))
+                    report_class["cluster_" + str(cluster_id)] = dict_cluster
+                report["Class_" + str(i)] = report_class
+
+        return all_assigned_clean, poison.astype(int).tolist(), report
 
     def analyze_by_relative_size(
         self,
         separated_clusters: List[np.ndarray],
         size_threshold: float = 0.35,
         r_size: int = 2,
+        build_report: bool = True,
     ) -> Tuple[np.ndarray, List[List[int]], Dict[str, int]]:
         """
         Assigns a cluster as poisonous if the smaller one contains less than threshold of the data.
@@ -205,6 +232,8 @@ class ClusteringAnalyzer:
         :param separated_clusters: List where `separated_clusters[i]` is the cluster assignments for the ith class.
         :param size_threshold: Threshold used to define when a cluster is substantially smaller.
         :param r_size: Round number used for size rate comparisons.
+        :param build_report: If False, only the summary of the analysis is reported and the per class details are
+                             skipped.
         :return: all_assigned_clean, summary_poison_clusters, report:
                  where all_assigned_clean[i] is a 1D boolean array indicating whether a given data point was determined
                  to be clean (as opposed to poisonous) and summary_poison_clusters: array, where
@@ -218,43 +247,20 @@ class ClusteringAnalyzer:
             "size_threshold": size_threshold,
         }
 
-        all_assigned_clean = []
-        nb_classes = len(separated_clusters)
-        nb_clusters = len(np.unique(separated_clusters[0]))
-        summary_poison_clusters: List[List[int]] = [[0 for _ in range(nb_clusters)] for _ in range(nb_classes)]
-
-        for i, clusters in enumerate(separated_clusters):
-            sizes = np.bincount(clusters)
-            total_dp_in_class = np.sum(sizes)
-
-            if np.size(sizes) > 2:
-                raise ValueError(" RelativeSizeAnalyzer does not support more than two clusters.")
-            percentages = np.round(sizes / float(np.sum(sizes)), r_size)
-            poison_clusters = np.where(percentages < size_threshold)
-            clean_clusters = np.where(percentages >= size_threshold)
+        sizes, present, clusters, class_ids = self._cluster_sizes(separated_clusters)
+        if np.any(present[:, 2:]):
+            raise ValueError(" RelativeSizeAnalyzer does not support more than two clusters.")
 
-            for p_id in poison_clusters[0]:
-                summary_poison_clusters[i][p_id] = 1
-            for c_id in clean_clusters[0]:
-                summary_poison_clusters[i][c_id] = 0
+        percentages = np.round(sizes / np.sum(sizes, axis=1, keepdims=True), r_size)
+        poison = present & (percentages < size_threshold)
 
-            assigned_clean = self.assign_class(clusters, clean_clusters, poison_clusters)
-            all_assigned_clean.append(assigned_clean)
+        all_assigned_clean = self._assign_clean_by_class(separated_clusters, clusters, class_ids, poison)
 
-            # Generate report for this class:
-            report_class = dict()
-            for cluster_id in range(nb_clusters):
-                ptc = sizes[cluster_id] / total_dp_in_class
-                susp = cluster_id in poison_clusters
-                dict_i = dict(ptc_data_in_cluster=round(ptc, 2), suspicious_cluster=susp)
+        if build_report:
+            self._size_report(report, sizes, poison)
 
-                dict_cluster = {"cluster_" + str(cluster_id): dict_i}
-                report_class.update(dict_cluster)
-
-            report["Class_" + str(i)] = report_class
-
-        report["suspicious_clusters"] = report["suspicious_clusters"] + np.sum(summary_poison_clusters).item()
-        return np.asarray(all_assigned_clean), summary_poison_clusters, report
+        report["suspicious_clusters"] = report["suspicious_clusters"] + int(np.sum(poison))
+        return all_assigned_clean, poison.astype(int).tolist(), report
 
     def analyze_by_silhouette_score(
         self,
@@ -264,6 +270,7 @@ class ClusteringAnalyzer:
         silhouette_threshold: float = 0.1,
         r_size: int = 2,
         r_silhouette: int = 4,
+        build_report: bool = True,
     ) -> Tuple[np.ndarray, List[List[int]], Dict[str, int]]:
         """
         Analyzes clusters to determine level of suspiciousness of poison based on the cluster's relative size
@@ -286,6 +293,8 @@ class ClusteringAnalyzer:
         value is used if the parameter is not provided.
         :param r_size: Round number used for size rate comparisons.
         :param r_silhouette: Round number used for silhouette rate comparisons.
+        :param build_report: If False, only the summary of the analysis is reported and the per class details are
+                             skipped. Silhouette scores are then only computed for classes with a small cluster.
         :return: all_assigned_clean, summary_poison_clusters, report:
                  where all_assigned_clean[i] is a 1D boolean array indicating whether a given data point was determined
                  to be clean (as opposed to poisonous) summary_poison_clusters: array, where
@@ -302,51 +311,37 @@ class ClusteringAnalyzer:
             "size_threshold": str(size_threshold),
             "silhouette_threshold": str(silhouette_threshold),
         }
-        all_assigned_clean = []
-        nb_classes = len(separated_clusters)
-        nb_clusters = len(np.unique(separated_clusters[0]))
-        summary_poison_clusters: List[List[int]] = [[0 for _ in range(nb_clusters)] for _ in range(nb_classes)]
-
-        for i, (clusters, activations) in enumerate(zip(separated_clusters, reduced_activations_by_class)):
-            bins = np.bincount(clusters)
-            if np.size(bins) > 2:
-                raise ValueError("Analyzer does not support more than two clusters.")
-            percentages = np.round(bins / float(np.sum(bins)), r_size)
-            poison_clusters = np.where(percentages < size_threshold)
-            clean_clusters = np.where(percentages >= size_threshold)
-
-            # Generate report for class
-            silhouette_avg = round(silhouette_score(activations, clusters), r_silhouette)
-            dict_i: Dict[str, Any] = dict(
-                sizes_clusters=str(bins),
-                ptc_cluster=str(percentages),
-                avg_silhouette_score=str(silhouette_avg),
+
+        sizes, present, clusters, class_ids = self._cluster_sizes(separated_clusters)
+        if np.any(present[:, 2:]):
+            raise ValueError("Analyzer does not support more than two clusters.")
+
+        percentages = np.round(sizes / np.sum(sizes, axis=1, keepdims=True), r_size)
+        small = present & (percentages < size_threshold)
+
+        # the silhouette score only matters for classes whose relative cluster sizes are suspicious
+        silhouette_avgs = np.full(len(sizes), -np.inf)
+        scored_classes = range(len(sizes)) if build_report else np.where(np.any(small, axis=1))[0]
+        for i in scored_classes:
+            silhouette_avgs[i] = round(
+                silhouette_score(reduced_activations_by_class[i], separated_clusters[i]), r_silhouette
             )
 
-            if np.shape(poison_clusters)[1] != 0:
-                # Relative size of the clusters is suspicious
-                if silhouette_avg > silhouette_threshold:
-                    # In this case the cluster is considered poisonous
-                    clean_clusters = np.where(percentages < size_threshold)
-                    logger.info("computed silhouette score: %s", silhouette_avg)
-                    dict_i.update(suspicious=True)
-                else:
-                    poison_clusters = [[]]
-                    clean_clusters = np.where(percentages >= 0)
-                    dict_i.update(suspicious=False)
-            else:
-                # If relative size of the clusters is Not suspicious, we conclude it's not suspicious.
-                dict_i.update(suspicious=False)
-
-            report_class: Dict[str, Dict[str, bool]] = {"class_" + str(i): dict_i}
-
-            for p_id in poison_clusters[0]:
-                summary_poison_clusters[i][p_id] = 1
-            for c_id in clean_clusters[0]:
-                summary_poison_clusters[i][c_id] = 0
-
-            assigned_clean = self.assign_class(clusters, clean_clusters, poison_clusters)
-            all_assigned_clean.append(assigned_clean)
-            report.update(report_class)
-
-        return np.asarray(all_assigned_clean), summary_poison_clusters, report
+        # In this case the cluster is considered poisonous
+        poison = small & (silhouette_avgs > silhouette_threshold)[:, np.newaxis]
+        for i in np.where(np.any(poison, axis=1))[0]:
+            logger.info("computed silhouette score: %s", silhouette_avgs[i])
+
+        all_assigned_clean = self._assign_clean_by_class(separated_clusters, clusters, class_ids, poison)
+
+        if build_report:
+            for i, (sizes_i, percentages_i) in enumerate(zip(sizes, percentages)):
+                nb_clusters_i = int(np.sum(present[i]))
+                report["class_" + str(i)] = dict(
+                    sizes_clusters=str(sizes_i[:nb_clusters_i]),
+                    ptc_cluster=str(percentages_i[:nb_clusters_i]),
+                    avg_silhouette_score=str(silhouette_avgs[i]),
+                    suspicious=bool(np.any(poison[i])),
+                )
+
+        return all_assigned_clean, poison.astype(int).tolist(), report
@@ -22,6 +22,7 @@ This module implements methods performing poisoning detection based on data prov
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from copy import deepcopy
 from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
@@ -56,6 +57,7 @@ class ProvenanceDefense(PoisonFilteringDefence):
         "eps",
         "perf_func",
         "pp_valid",
+        "nb_jobs",
     ]
 
     def __init__(
@@ -69,6 +71,7 @@ class ProvenanceDefense(PoisonFilteringDefence):
         eps: float = 0.2,
         perf_func: str = "accuracy",
         pp_valid: float = 0.2,
+        nb_jobs: int = 1,
     ) -> None:
         """
         Create an :class:`.ProvenanceDefense` object with the provided classifier.
@@ -82,6 +85,8 @@ class ProvenanceDefense(PoisonFilteringDefence):
         :param eps: Threshold for performance shift in suspicious data.
         :param perf_func: performance function used to evaluate effectiveness of defense.
         :param pp_valid: The percent of training data to use as validation data (for defense without validation data).
+        :param nb_jobs: Number of worker processes retraining the classifier without the data of different devices in
+                        parallel. The classifier needs to be picklable if larger than 1.
         """
         super().__init__(classifier, x_train, y_train)
         self.p_train = p_train
@@ -91,6 +96,7 @@ class ProvenanceDefense(PoisonFilteringDefence):
         self.eps = eps
         self.perf_func = perf_func
         self.pp_valid = pp_valid
+        self.nb_jobs = nb_jobs
         self.assigned_clean_by_device: List[np.ndarray] = []
         self.is_clean_by_device: List[np.ndarray] = []
         self.errors_by_device: Optional[np.ndarray] = None
@@ -162,28 +168,34 @@ class ProvenanceDefense(PoisonFilteringDefence):
         suspected = {}
         unfiltered_data = np.copy(self.x_train)
         unfiltered_labels = np.copy(self.y_train)
+        unfiltered_model = None
 
         segments = segment_by_class(self.x_train, self.p_train, self.num_devices)
-        for device_idx, segment in enumerate(segments):
-            filtered_data, filtered_labels = self.filter_input(unfiltered_data, unfiltered_labels, segment)
-
-            unfiltered_model = deepcopy(self.classifier)
-            filtered_model = deepcopy(self.classifier)
-
-            unfiltered_model.fit(unfiltered_data, unfiltered_labels)
-            filtered_model.fit(filtered_data, filtered_labels)
-
-            var_w = performance_diff(
-                filtered_model,
-                unfiltered_model,
-                self.x_val,
-                self.y_val,
-                perf_function=self.perf_func,
-            )
-            if self.eps < var_w:
-                suspected[device_idx] = var_w
-                unfiltered_data = filtered_data
-                unfiltered_labels = filtered_labels
+        executor = ProcessPoolExecutor(max_workers=self.nb_jobs) if self.nb_jobs > 1 else None
+        try:
+            device_idx = 0
+            while device_idx < self.num_devices:
+                # the unfiltered model only changes when a device is removed
+                if unfiltered_model is None:
+                    unfiltered_model = deepcopy(self.classifier)
+                    unfiltered_model.fit(unfiltered_data, unfiltered_labels)
+
+                # evaluate the next devices in parallel, assuming none of them is removed
+                devices = range(device_idx, min(device_idx + self.nb_jobs, self.num_devices))
+                filtered = [self.filter_input(unfiltered_data, unfiltered_labels, segments[i]) for i in devices]
+                tasks = [(data, labels, self.x_val, self.y_val) for data, labels in filtered]
+                var_ws = self._performance_shifts(unfiltered_model, tasks, executor)
+
+                for i, device_idx in enumerate(devices):
+                    if self.eps < var_ws[i]:
+                        suspected[device_idx] = var_ws[i]
+                        unfiltered_data, unfiltered_labels = filtered[i]
+                        unfiltered_model = None
+                        break
+                device_idx += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
         return suspected
 
@@ -207,33 +219,56 @@ class ProvenanceDefense(PoisonFilteringDefence):
 
         train_segments = segment_by_class(train_data, train_prov, self.num_devices)
         valid_segments = segment_by_class(valid_data, valid_prov, self.num_devices)
+        unfiltered_model = None
+
+        executor = ProcessPoolExecutor(max_workers=self.nb_jobs) if self.nb_jobs > 1 else None
+        try:
+            device_idx = 0
+            while device_idx < self.num_devices:
+                # the unfiltered model only changes when a device is removed
+                if unfiltered_model is None:
+                    unfiltered_model = deepcopy(self.classifier)
+                    unfiltered_model.fit(train_data, train_labels)
+
+                # evaluate the next devices in parallel, assuming none of them is removed
+                devices = range(device_idx, min(device_idx + self.nb_jobs, self.num_devices))
+                filtered = [self.filter_input(train_data, train_labels, train_segments[i]) for i in devices]
+                filtered_valid = [self.filter_input(valid_data, valid_labels, valid_segments[i]) for i in devices]
+                tasks = [filtered[i] + filtered_valid[i] for i in range(len(devices))]
+                var_ws = self._performance_shifts(unfiltered_model, tasks, executor)
+
+                for i, device_idx in enumerate(devices):
+                    if self.eps < var_ws[i]:
+                        suspected[device_idx] = var_ws[i]
+                        train_data, train_labels = filtered[i]
+                        valid_data, valid_labels = filtered_valid[i]
+                        unfiltered_model = None
+                        break
+                device_idx += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
-        for device_idx, (train_segment, valid_segment) in enumerate(zip(train_segments, valid_segments)):
-            filtered_data, filtered_labels = self.filter_input(train_data, train_labels, train_segment)
-
-            unfiltered_model = deepcopy(self.classifier)
-            filtered_model = deepcopy(self.classifier)
-
-            unfiltered_model.fit(train_data, train_labels)
-            filtered_model.fit(filtered_data, filtered_labels)
-
-            valid_non_device_data, valid_non_device_labels = self.filter_input(valid_data, valid_labels, valid_segment)
-            var_w = performance_diff(
-                filtered_model,
-                unfiltered_model,
-                valid_non_device_data,
-                valid_non_device_labels,
-                perf_function=self.perf_func,
-            )
+        return suspected
 
-            if self.eps < var_w:
-                suspected[device_idx] = var_w
-                train_data = filtered_data
-                train_labels = filtered_labels
-                valid_data = valid_non_device_data
-                valid_labels = valid_non_device_labels
+    def _performance_shifts(
+        self,
+        unfiltered_model: "CLASSIFIER_TYPE",
+        tasks: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]],
+        executor: Optional[ProcessPoolExecutor] = None,
+    ) -> List[float]:
+        """
+        Retrain the classifier on filtered data and compute the performance shifts compared to the unfiltered model.
 
-        return suspected
+        :param unfiltered_model: The classifier trained on the unfiltered data.
+        :param tasks: List of tuples of filtered data, filtered labels, evaluation data and evaluation labels.
+        :param executor: Optional process pool running the retraining in parallel.
+        :return: List of the performance differences of the filtered and unfiltered models.
+        """
+        args = [(self.classifier, unfiltered_model) + task + (self.perf_func,) for task in tasks]
+        if executor is None:
+            return [_performance_shift(*arg) for arg in args]
+        return list(executor.map(_performance_shift, *zip(*args)))
 
     @staticmethod
     def filter_input(data: np.ndarray, labels: np.ndarray, segment: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
@@ -245,7 +280,7 @@ class ProvenanceDefense(PoisonFilteringDefence):
         :param segment:
         :return: Tuple of (filtered_data, filtered_labels).
         """
-        filter_mask = np.array([np.isin(data[i, :], segment, invert=True).any() for i in range(data.shape[0])])
+        filter_mask = np.isin(data, segment, invert=True).reshape(data.shape[0], -1).any(axis=1)
         filtered_data = data[filter_mask]
         filtered_labels = labels[filter_mask]
 
@@ -263,3 +298,30 @@ class ProvenanceDefense(PoisonFilteringDefence):
 
         if len(self.x_train) != len(self.p_train):
             raise ValueError("Provenance features do not match data.")
+
+        if not isinstance(self.nb_jobs, (int, np.int)) or self.nb_jobs <= 0:
+            raise ValueError("Value of nb_jobs must be a positive integer.")
+
+
+def _performance_shift(
+    classifier: "CLASSIFIER_TYPE",
+    unfiltered_model: "CLASSIFIER_TYPE",
+    filtered_data: np.ndarray,
+    filtered_labels: np.ndarray,
+    x_eval: np.ndarray,
+    y_eval: np.ndarray,
+    perf_func: str,
+) -> float:
+    """
+    Train a copy of the classifier on filtered data and compute its performance shift compared to the unfiltered model.
+    """
+    filtered_model = deepcopy(classifier)
+    filtered_model.fit(filtered_data, filtered_labels)
+
+    return performance_diff(
+        filtered_model,
+        unfiltered_model,
+        x_eval,
+        y_eval,
+        perf_function=perf_func,
+    )
@@ -23,9 +23,10 @@ This module implements the Reject on Negative Impact (RONI) defense by Nelson et
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import Future, ProcessPoolExecutor
 import logging
 from copy import deepcopy
-from typing import Callable, List, Tuple, Union, TYPE_CHECKING
+from typing import Callable, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -57,6 +58,8 @@ class RONIDefense(PoisonFilteringDefence):
         "perf_func",
         "calibrated",
         "eps",
+        "incremental",
+        "nb_jobs",
     ]
 
     def __init__(
@@ -71,6 +74,8 @@ class RONIDefense(PoisonFilteringDefence):
         pp_quiz: float = 0.2,
         calibrated: bool = True,
         eps: float = 0.1,
+        incremental: bool = False,
+        nb_jobs: int = 1,
     ):
         """
         Create an :class:`.RONIDefense` object with the provided classifier.
@@ -85,6 +90,11 @@ class RONIDefense(PoisonFilteringDefence):
         :param pp_quiz: Percent of training data used for quiz set.
         :param calibrated: True if using the calibrated form of RONI.
         :param eps: performance threshold if using uncalibrated RONI.
+        :param incremental: True to update a copy of the current classifier with each evaluated point instead of
+                            refitting it from scratch. Requires a scikit-learn model supporting `partial_fit` or
+                            `warm_start`, otherwise the classifier is refitted.
+        :param nb_jobs: Number of worker processes evaluating the candidate and calibration points in parallel. The
+                        classifier and `perf_func` need to be picklable if larger than 1.
         """
         super().__init__(classifier, x_train, y_train)
         n_points = len(x_train)
@@ -99,7 +109,12 @@ class RONIDefense(PoisonFilteringDefence):
         self.x_val = x_val
         self.y_val = y_val
         self.perf_func = perf_func
+        self.incremental = incremental
+        self.nb_jobs = nb_jobs
         self.is_clean_lst: List[int] = list()
+        self._calibration_cache: Optional[Tuple["CLASSIFIER_TYPE", Tuple[np.ndarray, np.ndarray]]] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._update_mode = "fit"
         self._check_params()
 
     def evaluate_defence(self, is_clean: np.ndarray, **kwargs) -> str:
@@ -141,30 +156,37 @@ class RONIDefense(PoisonFilteringDefence):
         self.is_clean_lst = [1 for _ in range(len(x_suspect))]
         report = {}
 
+        if self.incremental and self._update_mode == "fit":
+            logger.warning("The model supports neither `partial_fit` nor `warm_start`, it is refitted from scratch.")
+
         before_classifier = deepcopy(self.classifier)
         before_classifier.fit(x_suspect, y_suspect)
 
-        for idx in np.random.permutation(len(x_suspect)):
-            x_i = x_suspect[idx]
-            y_i = y_suspect[idx]
-
-            after_classifier = deepcopy(before_classifier)
-            after_classifier.fit(x=np.vstack([x_trusted, x_i]), y=np.vstack([y_trusted, y_i]))
-            acc_shift = performance_diff(
-                before_classifier,
-                after_classifier,
-                self.x_quiz,
-                self.y_quiz,
-                perf_function=self.perf_func,
-            )
-            # print(acc_shift, median, std_dev)
-            if self.is_suspicious(before_classifier, acc_shift):
-                self.is_clean_lst[idx] = 0
-                report[idx] = acc_shift
-            else:
-                before_classifier = after_classifier
-                x_trusted = np.vstack([x_trusted, x_i])
-                y_trusted = np.vstack([y_trusted, y_i])
+        if self.nb_jobs > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.nb_jobs)
+
+        try:
+            for idx in np.random.permutation(len(x_suspect)):
+                x_i = x_suspect[idx]
+                y_i = y_suspect[idx]
+
+                future = self._submit(before_classifier, x_trusted, y_trusted, x_i, y_i)
+                if self.calibrated:
+                    # compute the calibration shifts while the candidate is evaluated
+                    self.get_calibration_info(before_classifier)
+                acc_shift, after_classifier = future.result()
+
+                if self.is_suspicious(before_classifier, acc_shift):
+                    self.is_clean_lst[idx] = 0
+                    report[idx] = acc_shift
+                else:
+                    before_classifier = after_classifier
+                    x_trusted = np.vstack([x_trusted, x_i])
+                    y_trusted = np.vstack([y_trusted, y_i])
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
 
         return report, self.is_clean_lst
 
@@ -190,22 +212,56 @@ class RONIDefense(PoisonFilteringDefence):
         :param before_classifier: The classifier trained without suspicious point.
         :return: A tuple consisting of `(median, std_dev)`.
         """
-        accs = []
-
-        for x_c, y_c in zip(self.x_cal, self.y_cal):
-            after_classifier = deepcopy(before_classifier)
-            after_classifier.fit(x=np.vstack([self.x_val, x_c]), y=np.vstack([self.y_val, y_c]))
-            accs.append(
-                performance_diff(
-                    before_classifier,
-                    after_classifier,
-                    self.x_quiz,
-                    self.y_quiz,
-                    perf_function=self.perf_func,
-                )
-            )
-
-        return np.median(accs), np.std(accs)
+        if self._calibration_cache is not None and self._calibration_cache[0] is before_classifier:
+            return self._calibration_cache[1]
+
+        futures = [
+            self._submit(before_classifier, self.x_val, self.y_val, x_c, y_c)
+            for x_c, y_c in zip(self.x_cal, self.y_cal)
+        ]
+        accs = [future.result()[0] for future in futures]
+
+        calibration_info = (np.median(accs), np.std(accs))
+        self._calibration_cache = (before_classifier, calibration_info)
+
+        return calibration_info
+
+    def _submit(
+        self,
+        before_classifier: "CLASSIFIER_TYPE",
+        x_fit: np.ndarray,
+        y_fit: np.ndarray,
+        x_new: np.ndarray,
+        y_new: np.ndarray,
+    ) -> Future:
+        """
+        Evaluate the performance shift caused by adding a point to the training data, in a worker process if
+        `nb_jobs` is larger than 1.
+
+        :param before_classifier: The classifier trained without the new point.
+        :param x_fit: Data the classifier is trained on.
+        :param y_fit: Labels the classifier is trained on.
+        :param x_new: The new data point.
+        :param y_new: The label of the new data point.
+        :return: A future of the performance shift and the classifier trained with the new point.
+        """
+        args = (
+            before_classifier,
+            x_fit,
+            y_fit,
+            x_new,
+            y_new,
+            self.x_quiz,
+            self.y_quiz,
+            self.perf_func,
+            self._update_mode,
+        )
+        if self._executor is not None:
+            return self._executor.submit(_performance_shift, *args)
+
+        future: Future = Future()
+        future.set_result(_performance_shift(*args))
+        return future
 
     def _check_params(self) -> None:
         if len(self.x_train) != len(self.y_train):
@@ -213,3 +269,70 @@ class RONIDefense(PoisonFilteringDefence):
 
         if self.eps < 0:
             raise ValueError("Value of `eps` must be at least 0.")
+
+        if not isinstance(self.nb_jobs, (int, np.int)) or self.nb_jobs <= 0:
+            raise ValueError("Value of `nb_jobs` must be a positive integer.")
+
+        # resolve how a copy of the classifier is updated with a new point
+        model = getattr(self.classifier, "model", None)
+        if self.incremental and hasattr(model, "partial_fit"):
+            self._update_mode = "partial_fit"
+        elif self.incremental and hasattr(model, "warm_start"):
+            self._update_mode = "warm_start"
+        else:
+            self._update_mode = "fit"
+
+        # the calibration shifts depend on the defence parameters
+        self._calibration_cache = None
+
+
+def _performance_shift(
+    before_classifier: "CLASSIFIER_TYPE",
+    x_fit: np.ndarray,
+    y_fit: np.ndarray,
+    x_new: np.ndarray,
+    y_new: np.ndarray,
+    x_quiz: np.ndarray,
+    y_quiz: np.ndarray,
+    perf_func: Union[str, Callable],
+    update_mode: str,
+) -> Tuple[float, "CLASSIFIER_TYPE"]:
+    """
+    Train a copy of a classifier with an additional point and compute the resulting performance shift on the quiz set.
+
+    :param before_classifier: The classifier trained without the new point.
+    :param x_fit: Data the classifier is trained on.
+    :param y_fit: Labels the classifier is trained on.
+    :param x_new: The new data point.
+    :param y_new: The label of the new data point.
+    :param x_quiz: Data of the quiz set.
+    :param y_quiz: Labels of the quiz set.
+    :param perf_func: Performance function to use.
+    :param update_mode: How the copy of the classifier is trained with the new point, one of `partial_fit` to update it
+                        with the new point only, `warm_start` to refit it starting from the current solution, or `fit`
+                        to refit it from scratch.
+    :return: A tuple of the performance shift and the classifier trained with the new point.
+    """
+    after_classifier = deepcopy(before_classifier)
+    model = getattr(after_classifier, "model", None)
+
+    if update_mode == "partial_fit":
+        # update the model with the new point only
+        x_preprocessed, y_preprocessed = after_classifier._apply_preprocessing(  # pylint: disable=W0212
+            x_new[None, ...], y_new[None, ...], fit=True
+        )
+        model.partial_fit(x_preprocessed, np.argmax(y_preprocessed, axis=1))
+    else:
+        if update_mode == "warm_start":
+            # start the optimization from the solution of the current model
+            model.set_params(warm_start=True)
+        after_classifier.fit(x=np.vstack([x_fit, x_new]), y=np.vstack([y_fit, y_new]))
+
+    acc_shift = performance_diff(
+        before_classifier,
+        after_classifier,
+        x_quiz,
+        y_quiz,
+        perf_function=perf_func,
+    )
+    return acc_shift, after_classifier
@@ -25,7 +25,7 @@ This module implements methods performing backdoor poisoning detection based on
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from typing import List, Tuple, TYPE_CHECKING
+from typing import Dict, List, Tuple, TYPE_CHECKING
 
 import numpy as np
 
@@ -49,6 +49,7 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
         "batch_size",
         "eps_multiplier",
         "expected_pp_poison",
+        "streaming",
     ]
 
     def __init__(
@@ -59,6 +60,7 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
         expected_pp_poison: float = 0.33,
         batch_size: int = 128,
         eps_multiplier: float = 1.5,
+        streaming: bool = False,
     ) -> None:
         """
         Create an :class:`.SpectralSignatureDefense` object with the provided classifier.
@@ -70,12 +72,16 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
         :param batch_size: The batch size for predictions
         :param eps_multiplier: The multiplier to add to the previous expectation. Numbers higher than one represent
                                a potentially higher false positive rate, but may detect more poison samples
+        :param streaming: If True, compute the activations batch by batch in two passes instead of holding them all
+                          in memory. The first pass accumulates per-class means and covariances and the top singular
+                          vector is found by power iteration, the second pass scores the samples.
         """
         super().__init__(classifier, x_train, y_train)
         self.classifier: "CLASSIFIER_NEURALNETWORK_TYPE" = classifier
         self.batch_size = batch_size
         self.eps_multiplier = eps_multiplier
         self.expected_pp_poison = expected_pp_poison
+        self.streaming = streaming
         self.y_train_sparse = np.argmax(y_train, axis=1)
         self.evaluator = GroundTruthEvaluator()
         self._check_params()
@@ -114,47 +120,98 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
             nb_layers = len(self.classifier.layer_names)
         else:
             raise ValueError("No layer names identified.")
-        features_x_poisoned = self.classifier.get_activations(
-            self.x_train, layer=nb_layers - 1, batch_size=self.batch_size
-        )
-
-        features_split = segment_by_class(features_x_poisoned, self.y_train_sparse, self.classifier.nb_classes)
-        score_by_class = []
-        keep_by_class = []
-
-        for idx, feature in enumerate(features_split):
-            # Check for empty list
-            if len(feature):  # pylint: disable=C1801
-                score = SpectralSignatureDefense.spectral_signature_scores(np.vstack(feature))
-                score_cutoff = np.quantile(score, max(1 - self.eps_multiplier * self.expected_pp_poison, 0.0))
-                score_by_class.append(score)
-                keep_by_class.append(score < score_cutoff)
-            else:
-                score_by_class.append([0])
-                keep_by_class.append([True])
-
-        base_indices_by_class = segment_by_class(
-            np.arange(len(self.y_train_sparse)),
-            self.y_train_sparse,
-            self.classifier.nb_classes,
-        )
-        is_clean_lst = [0] * len(self.y_train_sparse)
-        report = {}
-
-        for keep_booleans, all_scores, indices in zip(keep_by_class, score_by_class, base_indices_by_class):
-            for keep_boolean, all_score, idx in zip(keep_booleans, all_scores, indices):
-                if keep_boolean:
-                    is_clean_lst[idx] = 1
-                else:
-                    report[idx] = all_score[0]
+        layer = nb_layers - 1
+
+        if self.streaming:
+            scores = self._streaming_scores(layer)
+        else:
+            features_x_poisoned = self.classifier.get_activations(self.x_train, layer=layer, batch_size=self.batch_size)
+            features_x_poisoned = np.reshape(features_x_poisoned, (len(features_x_poisoned), -1))
+            scores = np.zeros(len(self.y_train_sparse))
+            for class_idx in np.unique(self.y_train_sparse):
+                in_class = self.y_train_sparse == class_idx
+                score = SpectralSignatureDefense.spectral_signature_scores(features_x_poisoned[in_class])
+                scores[in_class] = score[:, 0]
+
+        is_clean = np.ones(len(self.y_train_sparse), dtype=bool)
+        quantile = max(1 - self.eps_multiplier * self.expected_pp_poison, 0.0)
+        for class_idx in np.unique(self.y_train_sparse):
+            in_class = self.y_train_sparse == class_idx
+            is_clean[in_class] = scores[in_class] < np.quantile(scores[in_class], quantile)
+
+        poison_indices = np.where(~is_clean)[0]
+        report = dict(zip(poison_indices.tolist(), scores[poison_indices]))
+        is_clean_lst = is_clean.astype(int).tolist()
 
         return report, is_clean_lst
 
+    def _activation_batches(self, layer: int):
+        """
+        Iterate over the activations of `x_train` at the given layer one batch at a time.
+
+        :param layer: Index of the layer.
+        :return: Generator of tuples `(start, activations)` where `activations` are flattened to two dimensions.
+        """
+        for start in range(0, len(self.x_train), self.batch_size):
+            activations = self.classifier.get_activations(
+                self.x_train[start : start + self.batch_size], layer=layer, batch_size=self.batch_size
+            )
+            yield start, np.reshape(activations, (len(activations), -1))
+
+    def _streaming_scores(self, layer: int) -> np.ndarray:
+        """
+        Compute the spectral signature scores without materialising all activations. The first pass accumulates the
+        per-class means and scatter matrices of the activations, merging batches with the update of Chan et al., the
+        second pass projects every sample on the top right singular vector of its centred class representation.
+
+        :param layer: Index of the layer.
+        :return: Outlier score of each sample of `x_train`.
+        """
+        counts: Dict[int, int] = dict()
+        means: Dict[int, np.ndarray] = dict()
+        scatters: Dict[int, np.ndarray] = dict()
+        for start, activations in self._activation_batches(layer):
+            labels = self.y_train_sparse[start : start + len(activations)]
+            for class_idx in np.unique(labels):
+                features = activations[labels == class_idx].astype(np.float64)
+                count = len(features)
+                mean = np.mean(features, axis=0)
+                centred = features - mean
+                scatter = np.matmul(centred.T, centred)
+
+                # statistics are only allocated for the classes occurring in the data
+                if class_idx not in counts:
+                    counts[class_idx] = count
+                    means[class_idx] = mean
+                    scatters[class_idx] = scatter
+                else:
+                    total = counts[class_idx] + count
+                    delta = mean - means[class_idx]
+                    means[class_idx] += delta * count / total
+                    scatters[class_idx] += scatter + np.outer(delta, delta) * counts[class_idx] * count / total
+                    counts[class_idx] = total
+
+        eigs = dict()
+        for class_idx, count in counts.items():
+            eigs[class_idx] = SpectralSignatureDefense.top_eigenvector(scatters[class_idx] / count)
+            del scatters[class_idx]
+
+        scores = np.zeros(len(self.y_train_sparse))
+        for start, activations in self._activation_batches(layer):
+            labels = self.y_train_sparse[start : start + len(activations)]
+            for class_idx in np.unique(labels):
+                in_class = np.where(labels == class_idx)[0]
+                centred = activations[in_class] - means[class_idx]
+                scores[start + in_class] = np.abs(np.matmul(centred, eigs[class_idx]))
+        return scores
+
     def _check_params(self) -> None:
         if self.batch_size < 0:
             raise ValueError("Batch size must be positive integer. Unsupported batch size: " + str(self.batch_size))
         if self.eps_multiplier < 0:
             raise ValueError("eps_multiplier must be positive. Unsupported value: " + str(self.eps_multiplier))
+        if not isinstance(self.streaming, bool):
+            raise ValueError("The argument `streaming` has to be of type bool.")
         if self.expected_pp_poison < 0 or self.expected_pp_poison > 1:
             raise ValueError(
                 "expected_pp_poison must be between 0 and 1. Unsupported value: " + str(self.expected_pp_poison)
@@ -164,12 +221,38 @@ class SpectralSignatureDefense(PoisonFilteringDefence):
     def spectral_signature_scores(matrix_r: np.ndarray) -> np.ndarray:
         """
         :param matrix_r: Matrix of feature representations.
-        :return: Outlier scores for each observation based on spectral signature.
+        :return: Outlier scores for each observation based on spectral signature, of shape `(nb_observations, 1)`.
         """
         matrix_m = matrix_r - np.mean(matrix_r, axis=0)
         # Following Algorithm #1 in paper, use SVD of centered features, not of covariance
         _, _, matrix_v = np.linalg.svd(matrix_m, full_matrices=False)
         eigs = matrix_v[:1]
-        corrs = np.matmul(eigs, np.transpose(matrix_r))
-        score = np.expand_dims(np.linalg.norm(corrs, axis=1), axis=1)
+        corrs = np.matmul(eigs, np.transpose(matrix_m))
+        score = np.expand_dims(np.linalg.norm(corrs, axis=0), axis=1)
         return score
+
+    @staticmethod
+    def top_eigenvector(matrix: np.ndarray, max_iter: int = 1000, tol: float = 1e-10) -> np.ndarray:
+        """
+        Compute the eigenvector of the largest eigenvalue of a symmetric positive semi-definite matrix by power
+        iteration. Applied to the covariance of centred features it gives their top right singular vector.
+
+        :param matrix: Symmetric positive semi-definite matrix.
+        :param max_iter: Maximum number of iterations.
+        :param tol: Tolerance on the change of direction between two iterations.
+        :return: Unit eigenvector, up to its sign.
+        """
+        # fixed start vector so that the result is deterministic
+        vector = np.random.RandomState(0).normal(size=matrix.shape[0])
+        vector /= np.linalg.norm(vector)
+        for _ in range(max_iter):
+            product = np.matmul(matrix, vector)
+            norm = np.linalg.norm(product)
+            if norm == 0:
+                break
+            product /= norm
+            converged = 1 - abs(np.dot(product, vector)) < tol
+            vector = product
+            if converged:
+                break
+        return vector
@@ -57,6 +57,7 @@ class NeuralCleanse(Transformer):
         "early_stop_patience",
         "cost_multiplier",
         "batch_size",
+        "class_batch_size",
     ]
 
     def __init__(self, classifier: "CLASSIFIER_TYPE") -> None:
@@ -82,6 +83,7 @@ class NeuralCleanse(Transformer):
         early_stop_patience: int = 10,
         cost_multiplier: float = 1.5,
         batch_size: int = 32,
+        class_batch_size: int = 1,
     ) -> KerasNeuralCleanse:
         """
         Returns an new classifier with implementation of methods in Neural Cleanse: Identifying and Mitigating Backdoor
@@ -104,6 +106,8 @@ class NeuralCleanse(Transformer):
         :param early_stop_patience: How long to wait to determine early stopping in the Neural Cleanse optimization
         :param cost_multiplier: How much to change the cost in the Neural Cleanse optimization
         :param batch_size: The batch size for optimizations in the Neural Cleanse optimization
+        :param class_batch_size: The number of target classes for which the masks and patterns are optimized jointly.
+                                 If larger than 1, each class follows its own cost schedule and early stopping.
         """
         import keras
 
@@ -121,6 +125,7 @@ class NeuralCleanse(Transformer):
                 early_stop_patience=early_stop_patience,
                 cost_multiplier=cost_multiplier,
                 batch_size=batch_size,
+                class_batch_size=class_batch_size,
             )
             return transformed_classifier
 
@@ -48,6 +48,7 @@ class STRIP(Transformer):
     params = [
         "num_samples",
         "false_acceptance_rate",
+        "batch_size",
     ]
 
     def __init__(self, classifier: "CLASSIFIER_TYPE"):
@@ -63,12 +64,15 @@ class STRIP(Transformer):
         self,
         num_samples: int = 20,
         false_acceptance_rate: float = 0.01,
+        batch_size: int = 1,
     ) -> "ClassifierWithStrip":
         """
         Create a STRIP defense
 
         :param num_samples: The number of samples to use to test entropy at inference time
         :param false_acceptance_rate: The percentage of acceptable false acceptance
+        :param batch_size: The number of inputs to perturb together; each call to the classifier evaluates
+                           `batch_size * num_samples` superimposed images.
         """
         base_cls = self.classifier.__class__
         base_cls_name = self.classifier.__class__.__name__
@@ -76,7 +80,10 @@ class STRIP(Transformer):
             base_cls_name,
             (STRIPMixin, base_cls),
             dict(
-                num_samples=num_samples, false_acceptance_rate=false_acceptance_rate, predict_fn=self.classifier.predict
+                num_samples=num_samples,
+                false_acceptance_rate=false_acceptance_rate,
+                batch_size=batch_size,
+                predict_fn=self.classifier.predict,
             ),
         )
 
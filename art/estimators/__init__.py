@@ -6,6 +6,7 @@ from art.estimators.estimator import (
     LossGradientsMixin,
     NeuralNetworkMixin,
     DecisionTreeMixin,
+    QueryMonitor,
 )
 
 from art.estimators.keras import KerasEstimator
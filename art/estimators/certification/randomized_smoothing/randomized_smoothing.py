@@ -96,9 +96,11 @@ class RandomizedSmoothingMixin(ABC):
         logger.info("Applying randomized smoothing.")
         n_abstained = 0
         prediction = []
-        for x_i in tqdm(x, desc="Randomized smoothing"):
-            # get class counts
-            counts_pred = self._prediction_counts(x_i, batch_size=batch_size)
+
+        # get class counts of all samples
+        counts = self._prediction_counts_batch(x, batch_size=batch_size, verbose=True)
+
+        for counts_pred in counts:
             top = counts_pred.argsort()[::-1]
             count1 = np.max(counts_pred)
             count2 = counts_pred[top[1]]
@@ -157,15 +159,15 @@ class RandomizedSmoothingMixin(ABC):
         prediction = []
         radius = []
 
-        for x_i in x:
+        # get sample predictions for classification
+        counts_pred = self._prediction_counts_batch(x, n=self.sample_size, batch_size=batch_size)
 
-            # get sample prediction for classification
-            counts_pred = self._prediction_counts(x_i, n=self.sample_size, batch_size=batch_size)
-            class_select = np.argmax(counts_pred)
+        # get sample predictions for certification
+        counts_est = self._prediction_counts_batch(x, n=n, batch_size=batch_size)
 
-            # get sample prediction for certification
-            counts_est = self._prediction_counts(x_i, n=n, batch_size=batch_size)
-            count_class = counts_est[class_select]
+        for i in range(x.shape[0]):
+            class_select = np.argmax(counts_pred[i])
+            count_class = counts_est[i, class_select]
 
             prob_class = self._lower_confidence_bound(count_class, n)
 
@@ -178,6 +180,76 @@ class RandomizedSmoothingMixin(ABC):
 
         return np.array(prediction), np.array(radius)
 
+    def certify_sequential(
+        self, x: np.ndarray, n: int, batch_size: int = 32, nb_stages: int = 8, rtol: float = 0.1
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Computes certifiable radius around input `x` and returns radius `r` and prediction like `certify`, but stops
+        sampling for each input as soon as its result is settled. The `n` samples for certification are drawn in
+        `nb_stages` stages of geometrically increasing size. After each stage, Clopper-Pearson bounds on the
+        probability of the selected class are computed at level `alpha / nb_stages`, which makes the certificate valid
+        at level `alpha` for any stopping stage (union bound over the stages). Sampling for an input stops if the upper
+        bound is below 0.5 (abstain) or if the radius certified by the lower bound is within the relative tolerance
+        `rtol` of the largest radius that could still be certified with all `n` samples.
+
+        :param x: Sample input with shape as expected by the model.
+        :param n: Maximum number of samples for estimate certifiable radius.
+        :param batch_size: Batch size.
+        :param nb_stages: Maximum number of stages of sampling and testing.
+        :param rtol: Relative tolerance of the certified radius for stopping early.
+        :return: Tuple of length 3 of the selected class, certified radius and number of samples used for
+                 certification per input.
+        """
+        from statsmodels.stats.proportion import proportion_confint
+
+        if not isinstance(nb_stages, (int, np.integer)) or nb_stages <= 0:
+            raise ValueError("The number of stages `nb_stages` has to be a positive integer.")
+        if not 0.0 <= rtol < 1.0:
+            raise ValueError("The relative tolerance `rtol` has to be in [0, 1).")
+
+        # get sample predictions for classification
+        counts_pred = self._prediction_counts_batch(x, n=self.sample_size, batch_size=batch_size)
+        class_select = np.argmax(counts_pred, axis=1)
+
+        # cumulative number of samples after each stage, the confidence level is split over the stages
+        stages = np.unique(np.ceil(n / 2.0 ** np.arange(nb_stages - 1, -1, -1)).astype(int))
+        alpha_stage = self.alpha / len(stages)
+
+        # largest lower confidence bound attainable with all n samples
+        max_prob_class = proportion_confint(n, n, alpha=2 * alpha_stage, method="beta")[0]
+
+        prediction = np.full(x.shape[0], -1)
+        radius = np.zeros(x.shape[0])
+        count_class = np.zeros(x.shape[0])
+        nb_samples = np.zeros(x.shape[0], dtype=int)
+        active = np.arange(x.shape[0])
+        n_drawn = 0
+
+        for n_stage in stages:
+            # get sample predictions for certification of inputs not yet settled
+            counts_est = self._prediction_counts_batch(x[active], n=n_stage - n_drawn, batch_size=batch_size)
+            count_class[active] += counts_est[np.arange(active.size), class_select[active]]
+            nb_samples[active] = n_stage
+            n_drawn = n_stage
+
+            prob_class_lower, prob_class_upper = proportion_confint(
+                count_class[active], n_stage, alpha=2 * alpha_stage, method="beta"
+            )
+            is_certified = prob_class_lower >= 0.5
+            prediction[active] = np.where(is_certified, class_select[active], -1)
+            radius[active] = np.where(is_certified, self.scale * norm.ppf(np.maximum(prob_class_lower, 0.5)), 0.0)
+
+            # stop if abstaining is certain or the radius cannot improve by more than the tolerance
+            is_abstain = prob_class_upper < 0.5
+            radius_max = self.scale * norm.ppf(np.minimum(prob_class_upper, max_prob_class))
+            is_settled = is_certified & (radius[active] >= (1.0 - rtol) * radius_max)
+            active = active[~(is_abstain | is_settled)]
+
+            if active.size == 0:
+                break
+
+        return prediction, radius, nb_samples
+
     def _noisy_samples(self, x: np.ndarray, n: Optional[int] = None) -> np.ndarray:
         """
         Adds Gaussian noise to `x` to generate samples. Optionally augments `y` similarly.
@@ -206,17 +278,42 @@ class RandomizedSmoothingMixin(ABC):
         :param batch_size: Size of batches.
         :return: Array of counts with length equal to number of columns of `x`.
         """
-        # sample and predict
-        x_new = self._noisy_samples(x, n=n)
-        predictions = self._predict_classifier(x=x_new, batch_size=batch_size, training_mode=False)
+        return self._prediction_counts_batch(np.expand_dims(x, axis=0), n=n, batch_size=batch_size)[0]
+
+    def _prediction_counts_batch(
+        self, x: np.ndarray, n: Optional[int] = None, batch_size: int = 128, verbose: bool = False
+    ) -> np.ndarray:
+        """
+        Makes predictions for `n` noisy samples of each input and converts them to class counts. The noisy samples are
+        generated chunk by chunk into a reused buffer of `batch_size` samples, which is filled with the noisy samples
+        of as many inputs as fit. The memory required is therefore bounded by `batch_size` independently of `n`.
+
+        :param x: Sample inputs with shape as expected by the model.
+        :param n: Number of noisy samples to create per input.
+        :param batch_size: Size of batches.
+        :param verbose: Show progress bars.
+        :return: Array of counts of shape `(nb_inputs, nb_classes)`.
+        """
+        # set default value to sample_size
+        if n is None:
+            n = self.sample_size
+
+        nb_draws = x.shape[0] * n
+        counts = np.zeros((x.shape[0], self.nb_classes))  # type: ignore
+        buffer = np.empty((min(batch_size, nb_draws),) + x.shape[1:], dtype=ART_NUMPY_DTYPE)
+
+        for start in tqdm(range(0, nb_draws, batch_size), desc="Randomized smoothing", disable=not verbose):
+            end = min(start + batch_size, nb_draws)
+            rows = np.arange(start, end) // n
 
-        # convert to binary predictions
-        idx = np.argmax(predictions, axis=-1)
-        pred = np.zeros(predictions.shape)
-        pred[np.arange(pred.shape[0]), idx] = 1
+            # sample
+            x_noisy = buffer[: end - start]
+            x_noisy[...] = np.random.normal(scale=self.scale, size=x_noisy.shape)
+            x_noisy += x[rows]
 
-        # get class counts
-        counts = np.sum(pred, axis=0)
+            # predict and accumulate class counts of the binary predictions
+            predictions = self._predict_classifier(x=x_noisy, batch_size=batch_size, training_mode=False)
+            np.add.at(counts, (rows, np.argmax(predictions, axis=-1)), 1)
 
         return counts
 
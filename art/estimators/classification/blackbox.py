@@ -20,8 +20,13 @@ This module implements the classifier `BlackBoxClassifier` for black-box classif
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import logging
-from typing import Callable, List, Optional, Union, Tuple, TYPE_CHECKING
+import os
+import time
+from typing import Callable, Dict, List, Optional, Union, Tuple, TYPE_CHECKING
 
 import numpy as np
 
@@ -36,12 +41,130 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+class PredictionCache:
+    """
+    Content-addressed cache of model predictions with least-recently-used eviction. Inputs are identified by a hash of
+    their bytes, therefore identical rows are forwarded to the model only once, also within a single batch.
+    """
+
+    def __init__(self, max_size: int, path: Optional[str] = None) -> None:
+        """
+        Create a `PredictionCache` instance.
+
+        :param max_size: Maximum number of cached predictions. The least recently used predictions are evicted first.
+        :param path: Optional path of a `.npz` file used to persist the cache between runs. If the file exists, the
+                     cache is initialised with its content.
+        """
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._store: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
+        if self.max_size <= 0:
+            raise ValueError("The maximum size of the cache must be a positive integer.")
+
+        if self.path is not None and os.path.isfile(self.path):
+            self.load(self.path)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    @staticmethod
+    def _hash(row: np.ndarray) -> bytes:
+        return hashlib.sha1(np.ascontiguousarray(row).tobytes()).digest()
+
+    def predict(self, x: np.ndarray, predict_fn: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Return the predictions for `x`, calling `predict_fn` only on the unique rows that are not cached yet.
+
+        :param x: Input samples.
+        :param predict_fn: Function computing the predictions of a batch of samples.
+        :return: Array of predictions.
+        """
+        if x.shape[0] == 0:
+            return predict_fn(x)
+
+        results: List[Optional[np.ndarray]] = [None] * x.shape[0]
+        missing: Dict[bytes, List[int]] = OrderedDict()
+
+        for i, row in enumerate(x):
+            key = self._hash(row)
+            if key in self._store:
+                self._store.move_to_end(key)
+                results[i] = self._store[key]
+            else:
+                missing.setdefault(key, []).append(i)
+
+        self.misses += len(missing)
+        self.hits += x.shape[0] - len(missing)
+
+        if missing:
+            predictions = predict_fn(x[[indices[0] for indices in missing.values()]])
+            for (key, indices), prediction in zip(missing.items(), predictions):
+                self._store[key] = prediction
+                for i in indices:
+                    results[i] = prediction
+
+            while len(self._store) > self.max_size:
+                self._store.popitem(last=False)
+
+        return np.array(results)
+
+    def clear(self) -> None:
+        """
+        Remove all cached predictions and reset the hit and miss counters.
+        """
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Save the cached predictions to a `.npz` file.
+
+        :param path: Path of the file. If not provided, the path given at initialisation is used.
+        """
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("A path is required to save the cache.")
+
+        keys = np.array([np.frombuffer(key, dtype=np.uint8) for key in self._store.keys()], dtype=np.uint8)
+        values = np.array(list(self._store.values()))
+        with open(path, "wb") as file:
+            np.savez(file, keys=keys, values=values)
+
+    def load(self, path: str) -> None:
+        """
+        Load cached predictions from a `.npz` file created by `save`.
+
+        :param path: Path of the file.
+        """
+        with np.load(path) as data:
+            for key, value in zip(data["keys"], data["values"]):
+                self._store[bytes(key)] = value
+
+        while len(self._store) > self.max_size:
+            self._store.popitem(last=False)
+
+        logger.info("Loaded %d cached predictions from %s.", len(self._store), path)
+
+
 class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
     """
     Wrapper class for black-box classifiers.
     """
 
-    estimator_params = Classifier.estimator_params + ["nb_classes", "input_shape", "predict"]
+    estimator_params = Classifier.estimator_params + [
+        "nb_classes",
+        "input_shape",
+        "predict",
+        "cache_size",
+        "cache_path",
+        "max_concurrency",
+        "max_retries",
+        "retry_backoff",
+    ]
 
     def __init__(
         self,
@@ -52,6 +175,11 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         preprocessing_defences: Union["Preprocessor", List["Preprocessor"], None] = None,
         postprocessing_defences: Union["Postprocessor", List["Postprocessor"], None] = None,
         preprocessing: "PREPROCESSING_TYPE" = (0.0, 1.0),
+        cache_size: int = 0,
+        cache_path: Optional[str] = None,
+        max_concurrency: int = 1,
+        max_retries: int = 0,
+        retry_backoff: float = 1.0,
     ):
         """
         Create a `Classifier` instance for a black-box model.
@@ -68,6 +196,15 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         :param preprocessing: Tuple of the form `(subtrahend, divisor)` of floats or `np.ndarray` of values to be
                used for data preprocessing. The first value will be subtracted from the input. The input will then
                be divided by the second one.
+        :param cache_size: Maximum number of predictions cached by hash of the preprocessed inputs, identical inputs
+               are then forwarded to `predict_fn` only once. Set to 0 to disable the cache.
+        :param cache_path: Optional path of a `.npz` file to persist the cache between runs with
+               `prediction_cache.save()`. If the file exists, the cache is initialised with its content.
+        :param max_concurrency: Maximum number of batches passed concurrently to `predict_fn` from a thread pool. The
+               results are reassembled in the order of the inputs. Values larger than 1 are useful for remote models
+               served over the network and require a thread-safe `predict_fn`.
+        :param max_retries: Maximum number of times a batch is resubmitted to `predict_fn` after an exception.
+        :param retry_backoff: Delay in seconds before the first retry, doubled for every following retry.
         """
         super().__init__(
             model=None,
@@ -80,6 +217,14 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         self._predict_fn = predict_fn
         self._input_shape = input_shape
         self._nb_classes = nb_classes
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._check_params()
+
+        self._prediction_cache = PredictionCache(cache_size, cache_path) if cache_size > 0 else None
 
     @property
     def input_shape(self) -> Tuple[int, ...]:
@@ -90,6 +235,33 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         """
         return self._input_shape  # type: ignore
 
+    def set_params(self, **kwargs) -> None:
+        """
+        Take a dictionary of parameters and apply checks before setting them as attributes. The prediction cache is
+        recreated empty if `cache_size` or `cache_path` are changed.
+
+        :param kwargs: A dictionary of attributes.
+        """
+        super().set_params(**kwargs)
+
+        if "cache_size" in kwargs or "cache_path" in kwargs:
+            self._prediction_cache = PredictionCache(self.cache_size, self.cache_path) if self.cache_size > 0 else None
+
+    def _check_params(self) -> None:
+        super()._check_params()
+
+        if not isinstance(self.cache_size, int) or self.cache_size < 0:
+            raise ValueError("The cache size must be a non-negative integer.")
+
+        if not isinstance(self.max_concurrency, int) or self.max_concurrency <= 0:
+            raise ValueError("The maximum concurrency must be a positive integer.")
+
+        if not isinstance(self.max_retries, int) or self.max_retries < 0:
+            raise ValueError("The maximum number of retries must be a non-negative integer.")
+
+        if self.retry_backoff < 0:
+            raise ValueError("The retry backoff must be non-negative.")
+
     @property
     def predict_fn(self) -> Callable:
         """
@@ -99,6 +271,15 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         """
         return self._predict_fn  # type: ignore
 
+    @property
+    def prediction_cache(self) -> Optional[PredictionCache]:
+        """
+        Return the prediction cache.
+
+        :return: The prediction cache or None if caching is disabled.
+        """
+        return self._prediction_cache
+
     # pylint: disable=W0221
     def predict(self, x: np.ndarray, batch_size: int = 128, **kwargs) -> np.ndarray:
         """
@@ -113,20 +294,54 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         # Apply preprocessing
         x_preprocessed, _ = self._apply_preprocessing(x, y=None, fit=False)
 
-        # Run predictions with batching
-        predictions = np.zeros((x_preprocessed.shape[0], self.nb_classes), dtype=ART_NUMPY_DTYPE)
-        for batch_index in range(int(np.ceil(x_preprocessed.shape[0] / float(batch_size)))):
-            begin, end = (
-                batch_index * batch_size,
-                min((batch_index + 1) * batch_size, x_preprocessed.shape[0]),
-            )
-            predictions[begin:end] = self._predict_fn(x_preprocessed[begin:end])
+        def predict_batches(x_batches: np.ndarray) -> np.ndarray:
+            # Run predictions with batching
+            predictions = np.zeros((x_batches.shape[0], self.nb_classes), dtype=ART_NUMPY_DTYPE)
+            batches = [
+                (batch_index * batch_size, min((batch_index + 1) * batch_size, x_batches.shape[0]))
+                for batch_index in range(int(np.ceil(x_batches.shape[0] / float(batch_size))))
+            ]
+
+            if self.max_concurrency > 1 and len(batches) > 1:
+                with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                    results = executor.map(lambda batch: self._query(x_batches[batch[0] : batch[1]]), batches)
+                    for (begin, end), result in zip(batches, results):
+                        predictions[begin:end] = result
+            else:
+                for begin, end in batches:
+                    predictions[begin:end] = self._query(x_batches[begin:end])
+
+            return predictions
+
+        if self._prediction_cache is not None:
+            predictions = self._prediction_cache.predict(x_preprocessed, predict_batches)
+        else:
+            predictions = predict_batches(x_preprocessed)
 
         # Apply postprocessing
         predictions = self._apply_postprocessing(preds=predictions, fit=False)
 
         return predictions
 
+    def _query(self, x: np.ndarray) -> np.ndarray:
+        """
+        Call `predict_fn` on one batch, retrying with exponential backoff if it raises an exception.
+
+        :param x: Preprocessed input samples.
+        :return: Array of predictions.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self._predict_fn(x)
+            except Exception as exception:  # pylint: disable=W0703
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning("Call to `predict_fn` failed with %r, retrying in %.2f seconds.", exception, delay)
+                time.sleep(delay)
+                attempt += 1
+
     def fit(self, x: np.ndarray, y: np.ndarray, **kwargs) -> None:
         """
         Fit the classifier on the training set `(x, y)`.
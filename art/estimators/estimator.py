@@ -19,12 +19,16 @@
 This module implements abstract base and mixin classes for estimators in ART.
 """
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+from contextlib import contextmanager
+from functools import wraps
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
 from tqdm.auto import trange
 
 from art.config import ART_NUMPY_DTYPE
+from art.exceptions import QueryBudgetExceededError
 
 if TYPE_CHECKING:
     # pylint: disable=R0401
@@ -528,3 +532,152 @@ class DecisionTreeMixin(ABC):
         :return: A list of decision trees.
         """
         raise NotImplementedError
+
+
+class QueryMonitor:
+    """
+    Opt-in instrumentation of an estimator. While installed, it records the number of calls, the number of input rows
+    and the wall time of every call to `predict`, `loss_gradient` and `class_gradient`, grouped by user-defined phases,
+    and optionally enforces a hard budget on the number of rows passed to `predict`. Exceeding the budget raises
+    `QueryBudgetExceededError` before the estimator is called, which aborts a running `generate` cleanly.
+
+    Example usage:
+
+    .. code-block:: python
+
+        with QueryMonitor(classifier, max_queries=10000) as monitor:
+            with monitor.phase("HopSkipJump"):
+                x_adv = HopSkipJump(classifier).generate(x)
+        print(monitor.summary())
+    """
+
+    monitored_methods = ["predict", "loss_gradient", "class_gradient"]
+
+    def __init__(self, estimator: BaseEstimator, max_queries: Optional[int] = None) -> None:
+        """
+        Create a `QueryMonitor` instance.
+
+        :param estimator: The estimator to monitor.
+        :param max_queries: Maximum number of input rows that may be passed to `predict`. No limit if `None`.
+        """
+        self.estimator = estimator
+        self.max_queries = max_queries
+        self.records: List[Dict[str, Any]] = []
+        self.current_phase = "default"
+        self._nb_queries = 0
+        self._originals: Dict[str, Any] = {}
+        self._instance_attributes: List[str] = []
+        self._depth = 0
+
+        if self.max_queries is not None and self.max_queries < 0:
+            raise ValueError("The query budget must be a non-negative integer.")
+
+    def install(self) -> None:
+        """
+        Start monitoring the estimator by wrapping its instance methods.
+        """
+        if self._originals:
+            return
+
+        for name in self.monitored_methods:
+            if hasattr(self.estimator, name):
+                if name in vars(self.estimator):
+                    self._instance_attributes.append(name)
+                self._originals[name] = getattr(self.estimator, name)
+                setattr(self.estimator, name, self._wrap(name, self._originals[name]))
+
+    def uninstall(self) -> None:
+        """
+        Stop monitoring the estimator and restore its methods.
+        """
+        for name, method in self._originals.items():
+            if name in self._instance_attributes:
+                setattr(self.estimator, name, method)
+            else:
+                delattr(self.estimator, name)
+        self._originals = {}
+        self._instance_attributes = []
+
+    def __enter__(self) -> "QueryMonitor":
+        self.install()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.uninstall()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Attribute all calls within the context to the phase `name`.
+
+        :param name: Name of the phase, e.g. the name of an attack or of one of its stages.
+        """
+        previous_phase = self.current_phase
+        self.current_phase = name
+        try:
+            yield
+        finally:
+            self.current_phase = previous_phase
+
+    @property
+    def nb_queries(self) -> int:
+        """
+        Return the number of input rows passed to `predict` so far.
+
+        :return: Number of queries.
+        """
+        return self._nb_queries
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Aggregate the recorded calls.
+
+        :return: A dictionary mapping phase names to dictionaries mapping method names to the number of `calls`, the
+                 number of `rows` and the total wall `time` in seconds.
+        """
+        summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for record in self.records:
+            stats = summary.setdefault(record["phase"], {}).setdefault(
+                record["method"], {"calls": 0, "rows": 0, "time": 0.0}
+            )
+            stats["calls"] += 1
+            stats["rows"] += record["rows"]
+            stats["time"] += record["time"]
+        return summary
+
+    def reset(self) -> None:
+        """
+        Delete all recorded calls, which also resets the used query budget.
+        """
+        self.records = []
+        self._nb_queries = 0
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        @wraps(method)
+        def monitored(x, *args, **kwargs):
+            # Calls made from within a monitored call are accounted for by the outer call
+            if self._depth > 0:
+                return method(x, *args, **kwargs)
+
+            nb_rows = len(x)
+            if name == "predict":
+                if self.max_queries is not None and self._nb_queries + nb_rows > self.max_queries:
+                    raise QueryBudgetExceededError(self.max_queries, self._nb_queries, nb_rows)
+                self._nb_queries += nb_rows
+
+            self._depth += 1
+            time_start = time.perf_counter()
+            try:
+                return method(x, *args, **kwargs)
+            finally:
+                self._depth -= 1
+                self.records.append(
+                    {
+                        "phase": self.current_phase,
+                        "method": name,
+                        "rows": nb_rows,
+                        "time": time.perf_counter() - time_start,
+                    }
+                )
+
+        return monitored
@@ -62,6 +62,7 @@ class KerasNeuralCleanse(NeuralCleanseMixin, KerasClassifier):
         "cost_multiplier_up",
         "cost_multiplier_down",
         "batch_size",
+        "class_batch_size",
     ]
 
     def __init__(
@@ -86,6 +87,7 @@ class KerasNeuralCleanse(NeuralCleanseMixin, KerasClassifier):
         early_stop_patience: int = 10,
         cost_multiplier: float = 1.5,
         batch_size: int = 32,
+        class_batch_size: int = 1,
     ):
         """
         Create a Neural Cleanse classifier.
@@ -121,6 +123,8 @@ class KerasNeuralCleanse(NeuralCleanseMixin, KerasClassifier):
         :param early_stop_patience: How long to wait to determine early stopping in the Neural Cleanse optimization
         :param cost_multiplier: How much to change the cost in the Neural Cleanse optimization
         :param batch_size: The batch size for optimizations in the Neural Cleanse optimization
+        :param class_batch_size: The number of target classes for which the masks and patterns are optimized jointly.
+                                 If larger than 1, each class follows its own cost schedule and early stopping.
         """
         import keras.backend as K
         from keras.losses import categorical_crossentropy
@@ -148,6 +152,7 @@ class KerasNeuralCleanse(NeuralCleanseMixin, KerasClassifier):
             patience=patience,
             cost_multiplier=cost_multiplier,
             batch_size=batch_size,
+            class_batch_size=class_batch_size,
         )
         mask = np.random.uniform(size=super().input_shape)
         pattern = np.random.uniform(size=super().input_shape)
@@ -192,6 +197,66 @@ class KerasNeuralCleanse(NeuralCleanseMixin, KerasClassifier):
             updates=self.updates,
         )
 
+        if self.class_batch_size > 1:
+            self._build_joint_graph(input_tensor, y_true_tensor)
+
+    def _build_joint_graph(self, input_tensor, y_true_tensor) -> None:
+        """
+        Build the graph optimizing the masks and patterns of up to `class_batch_size` target classes jointly. Every
+        input batch is combined with the mask and pattern of each active class and evaluated in a single forward pass.
+
+        :param input_tensor: Placeholder for the clean input samples.
+        :param y_true_tensor: Placeholder for the target labels, repeated for every input sample of each active class.
+        """
+        import keras.backend as K
+        from keras.losses import categorical_crossentropy
+        from keras.metrics import categorical_accuracy
+        from keras.optimizers import Adam
+
+        input_shape = super().input_shape
+        self.joint_mask_tensor_raw = K.variable(np.random.uniform(size=(self.class_batch_size,) + input_shape))
+        self.joint_pattern_tensor_raw = K.variable(np.random.uniform(size=(self.class_batch_size,) + input_shape))
+        self.joint_cost_tensor = K.variable(np.full(self.class_batch_size, self.init_cost))
+        self.joint_mask_tensor = K.tanh(self.joint_mask_tensor_raw) / (2 - self.epsilon) + 0.5
+        self.joint_pattern_tensor = K.tanh(self.joint_pattern_tensor_raw) / (2 - self.epsilon) + 0.5
+
+        # Only the active classes take part in the forward and backward passes, selected with a dense matrix product
+        # to keep the gradients of the mask and pattern variables dense
+        selection_tensor = K.placeholder(shape=(None, self.class_batch_size))
+        mask_tensor_raw = K.dot(selection_tensor, K.reshape(self.joint_mask_tensor_raw, (self.class_batch_size, -1)))
+        pattern_tensor_raw = K.dot(
+            selection_tensor, K.reshape(self.joint_pattern_tensor_raw, (self.class_batch_size, -1))
+        )
+        mask_tensor = K.tanh(K.reshape(mask_tensor_raw, (-1,) + input_shape)) / (2 - self.epsilon) + 0.5
+        pattern_tensor = K.tanh(K.reshape(pattern_tensor_raw, (-1,) + input_shape)) / (2 - self.epsilon) + 0.5
+        cost_tensor = K.sum(selection_tensor * K.expand_dims(self.joint_cost_tensor, axis=0), axis=1)
+
+        mask_tensor = K.expand_dims(mask_tensor, axis=1)
+        pattern_tensor = K.expand_dims(pattern_tensor, axis=1)
+        x_adv_tensor = (1 - mask_tensor) * K.expand_dims(input_tensor, axis=0) + mask_tensor * pattern_tensor
+        output_tensor = self.model(K.reshape(x_adv_tensor, (-1,) + input_shape))
+
+        nb_active = K.shape(selection_tensor)[0]
+        loss_acc = K.reshape(categorical_accuracy(output_tensor, y_true_tensor), (nb_active, -1))
+        loss_ce = K.reshape(categorical_crossentropy(output_tensor, y_true_tensor), (nb_active, -1))
+
+        reduce_axes = list(range(1, len(input_shape) + 2))
+        if self.norm == 1:
+            loss_reg = K.sum(K.abs(mask_tensor), axis=reduce_axes) / 3
+        elif self.norm == 2:
+            loss_reg = K.sqrt(K.sum(K.square(mask_tensor), axis=reduce_axes) / 3)
+
+        loss_combined = loss_ce + K.expand_dims(loss_reg * cost_tensor, axis=1)
+        self.joint_opt = Adam(lr=self.learning_rate, beta_1=0.5, beta_2=0.9)
+        updates = self.joint_opt.get_updates(
+            params=[self.joint_pattern_tensor_raw, self.joint_mask_tensor_raw], loss=K.sum(loss_combined)
+        )
+        self.joint_train = K.function(
+            [input_tensor, y_true_tensor, selection_tensor],
+            [loss_ce, loss_reg, loss_acc],
+            updates=updates,
+        )
+
     @property
     def input_shape(self) -> Tuple[int, ...]:
         """
@@ -309,6 +374,135 @@ class KerasNeuralCleanse(NeuralCleanseMixin, KerasClassifier):
 
         return mask_best, pattern_best
 
+    def generate_backdoors(
+        self, x_val: np.ndarray, y_val: np.ndarray, y_targets: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generates possible backdoors for multiple target classes, optimizing up to `class_batch_size` of them jointly.
+        Returns the masks and patterns
+
+        :param x_val: Validation data.
+        :param y_val: Validation labels.
+        :param y_targets: One-hot encoded target classes of shape `(nb_targets, nb_classes)`.
+        :return: A tuple of the masks and patterns for the model, each with `nb_targets` as first dimension.
+        """
+        import keras.backend as K
+        from keras_preprocessing.image import ImageDataGenerator
+
+        if self.class_batch_size <= 1:
+            raise ValueError("Joint optimization of backdoors requires `class_batch_size` larger than 1.")
+
+        input_shape = super().input_shape
+        masks = np.zeros((len(y_targets),) + input_shape)
+        patterns = np.zeros((len(y_targets),) + input_shape)
+
+        datagen = ImageDataGenerator()
+        gen = datagen.flow(x_val, y_val, batch_size=self.batch_size)
+        mini_batch_size = len(x_val) // self.batch_size
+        selection = np.eye(self.class_batch_size)
+
+        for begin in range(0, len(y_targets), self.class_batch_size):
+            end = min(begin + self.class_batch_size, len(y_targets))
+            nb_targets = end - begin
+
+            # Reset the optimization state for the next group of target classes
+            K.set_value(self.joint_mask_tensor_raw, np.random.uniform(size=K.int_shape(self.joint_mask_tensor_raw)))
+            K.set_value(
+                self.joint_pattern_tensor_raw, np.random.uniform(size=K.int_shape(self.joint_pattern_tensor_raw))
+            )
+            K.set_value(self.joint_opt.iterations, 0)
+            for weight in self.joint_opt.weights:
+                K.set_value(weight, np.zeros(K.int_shape(weight)))
+
+            cost = np.full(self.class_batch_size, self.init_cost)
+            K.set_value(self.joint_cost_tensor, cost)
+            reg_best = np.full(nb_targets, np.inf)
+            has_mask_best = np.zeros(nb_targets, dtype=bool)
+            cost_set_counter = np.zeros(nb_targets, dtype=int)
+            cost_up_counter = np.zeros(nb_targets, dtype=int)
+            cost_down_counter = np.zeros(nb_targets, dtype=int)
+            cost_up_flag = np.zeros(nb_targets, dtype=bool)
+            cost_down_flag = np.zeros(nb_targets, dtype=bool)
+            early_stop_counter = np.zeros(nb_targets, dtype=int)
+            early_stop_reg_best = np.full(nb_targets, np.inf)
+            active = np.arange(nb_targets)
+
+            for _ in tqdm(range(self.steps), desc="Generating backdoors for classes {}-{}".format(begin, end - 1)):
+                loss_reg_sum = np.zeros(len(active))
+                loss_acc_sum = np.zeros(len(active))
+                nb_samples = 0
+
+                for _ in range(mini_batch_size):
+                    x_batch, _ = gen.next()
+                    y_batch = np.repeat(y_targets[begin + active], x_batch.shape[0], axis=0)
+                    _, batch_loss_reg, batch_loss_acc = self.joint_train([x_batch, y_batch, selection[active]])
+
+                    loss_reg_sum += batch_loss_reg
+                    loss_acc_sum += np.sum(batch_loss_acc, axis=1)
+                    nb_samples += x_batch.shape[0]
+
+                avg_loss_reg = loss_reg_sum / max(mini_batch_size, 1)
+                avg_loss_acc = loss_acc_sum / max(nb_samples, 1)
+                success = avg_loss_acc >= self.attack_success_threshold
+
+                # save best masks/patterns so far
+                improved = success & (avg_loss_reg < reg_best[active])
+                if np.any(improved):
+                    improved_active = active[improved]
+                    masks_eval, patterns_eval = K.batch_get_value([self.joint_mask_tensor, self.joint_pattern_tensor])
+                    masks[begin + improved_active] = masks_eval[improved_active]
+                    patterns[begin + improved_active] = patterns_eval[improved_active]
+                    reg_best[improved_active] = avg_loss_reg[improved]
+                    has_mask_best[improved_active] = True
+
+                # check early stop
+                done = np.zeros(len(active), dtype=bool)
+                if self.early_stop:
+                    found = reg_best[active] < np.inf
+                    stalled = reg_best[active] >= self.early_stop_threshold * early_stop_reg_best[active]
+                    early_stop_counter[active] = np.where(
+                        found, np.where(stalled, early_stop_counter[active] + 1, 0), early_stop_counter[active]
+                    )
+                    early_stop_reg_best[active] = np.minimum(reg_best[active], early_stop_reg_best[active])
+
+                    converged = early_stop_counter[active] >= self.early_stop_patience
+                    done = cost_down_flag[active] & cost_up_flag[active] & converged
+
+                # cost modification
+                cost_set_counter[active] = np.where(success, cost_set_counter[active] + 1, 0)
+                reset = success & (cost_set_counter[active] >= self.patience)
+                cost[active[reset]] = self.init_cost
+                for counters in [cost_up_counter, cost_down_counter, cost_up_flag, cost_down_flag]:
+                    counters[active[reset]] = 0
+
+                cost_up_counter[active] = np.where(success, cost_up_counter[active] + 1, 0)
+                cost_down_counter[active] = np.where(success, 0, cost_down_counter[active] + 1)
+
+                cost_up = cost_up_counter[active] >= self.patience
+                cost_down = ~cost_up & (cost_down_counter[active] >= self.patience)
+                cost_up_counter[active[cost_up]] = 0
+                cost[active[cost_up]] *= self.cost_multiplier_up
+                cost_up_flag[active[cost_up]] = True
+                cost_down_counter[active[cost_down]] = 0
+                cost[active[cost_down]] /= self.cost_multiplier_down
+                cost_down_flag[active[cost_down]] = True
+                K.set_value(self.joint_cost_tensor, cost)
+
+                if np.any(done):
+                    logger.info("Early stop for classes %s", str(begin + active[done]))
+                    active = active[~done]
+                    if len(active) == 0:
+                        break
+
+            # fall back to the final masks/patterns of classes without a successful backdoor
+            if not np.all(has_mask_best):
+                missing = np.where(~has_mask_best)[0]
+                masks_eval, patterns_eval = K.batch_get_value([self.joint_mask_tensor, self.joint_pattern_tensor])
+                masks[begin + missing] = masks_eval[missing]
+                patterns[begin + missing] = patterns_eval[missing]
+
+        return masks, patterns
+
     def _predict_classifier(
         self, x: np.ndarray, batch_size: int = 128, training_mode: bool = False, **kwargs
     ) -> np.ndarray:
@@ -347,6 +541,30 @@ class KerasNeuralCleanse(NeuralCleanseMixin, KerasClassifier):
         biases[index] = 0
         layer.set_weights([weights, biases])
 
+    def _get_penultimate_layer_weights(self) -> List[np.ndarray]:
+        """
+        Return a copy of the weights (and biases) of the penultimate layer of the neural network
+
+        :return: List of the weight arrays of the penultimate layer.
+        """
+        if self.layer_names is not None:
+            layer = self._model.layers[len(self.layer_names) - 2]
+        else:
+            raise ValueError("No layer names found.")
+        return [np.copy(weights) for weights in layer.get_weights()]
+
+    def _set_penultimate_layer_weights(self, weights: List[np.ndarray]) -> None:
+        """
+        Set the weights (and biases) of the penultimate layer of the neural network
+
+        :param weights: List of the weight arrays of the penultimate layer.
+        """
+        if self.layer_names is not None:
+            layer = self._model.layers[len(self.layer_names) - 2]
+        else:
+            raise ValueError("No layer names found.")
+        layer.set_weights(weights)
+
     def predict(self, x: np.ndarray, batch_size: int = 128, training_mode: bool = False, **kwargs) -> np.ndarray:
         """
         Perform prediction of the given classifier for a batch of inputs, potentially filtering suspicious input
@@ -358,16 +576,22 @@ class KerasNeuralCleanse(NeuralCleanseMixin, KerasClassifier):
         """
         return NeuralCleanseMixin.predict(self, x, batch_size=batch_size, training_mode=training_mode, **kwargs)
 
-    def mitigate(self, x_val: np.ndarray, y_val: np.ndarray, mitigation_types: List[str]) -> None:
+    def mitigate(
+        self, x_val: np.ndarray, y_val: np.ndarray, mitigation_types: List[str], pruning_search: str = "linear"
+    ) -> None:
         """
         Mitigates the effect of poison on a classifier
 
         :param x_val: Validation data to use to mitigate the effect of poison.
         :param y_val: Validation labels to use to mitigate the effect of poison.
         :param mitigation_types: The types of mitigation method, can include 'unlearning', 'pruning', or 'filtering'
+        :param pruning_search: How to search for the number of neurons to prune, either 'linear' to check the
+                               backdoors after pruning each neuron, or 'bisection' to search with exponential steps
+                               followed by bisection, assuming that pruning more neurons never reactivates the
+                               backdoors.
         :return: Tuple of length 2 of the selected class and certified radius.
         """
-        return NeuralCleanseMixin.mitigate(self, x_val, y_val, mitigation_types)
+        return NeuralCleanseMixin.mitigate(self, x_val, y_val, mitigation_types, pruning_search=pruning_search)
 
     def loss_gradient(self, x: np.ndarray, y: np.ndarray, training_mode: bool = False, **kwargs) -> np.ndarray:
         """
@@ -55,6 +55,7 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
         early_stop_patience: int = 10,
         cost_multiplier: float = 1.5,
         batch_size: int = 32,
+        class_batch_size: int = 1,
         **kwargs
     ) -> None:
         """
@@ -72,6 +73,8 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
         :param early_stop_patience: How long to wait to determine early stopping in the Neural Cleanse optimization
         :param cost_multiplier: How much to change the cost in the Neural Cleanse optimization
         :param batch_size: The batch size for optimizations in the Neural Cleanse optimization
+        :param class_batch_size: The number of target classes for which the masks and patterns are optimized jointly.
+                                 If larger than 1, each class follows its own cost schedule and early stopping.
         """
         super().__init__(*args, **kwargs)
         self.steps = steps
@@ -86,6 +89,7 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
         self.cost_multiplier_up = cost_multiplier
         self.cost_multiplier_down = cost_multiplier ** 1.5
         self.batch_size = batch_size
+        self.class_batch_size = class_batch_size
         self.top_indices: List[int] = []
         self.activation_threshold = 0
 
@@ -122,6 +126,22 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
         """
         raise NotImplementedError
 
+    def _get_penultimate_layer_weights(self) -> List[np.ndarray]:
+        """
+        Return a copy of the weights (and biases) of the penultimate layer of the neural network
+
+        :return: List of the weight arrays of the penultimate layer.
+        """
+        raise NotImplementedError
+
+    def _set_penultimate_layer_weights(self, weights: List[np.ndarray]) -> None:
+        """
+        Set the weights (and biases) of the penultimate layer of the neural network
+
+        :param weights: List of the weight arrays of the penultimate layer.
+        """
+        raise NotImplementedError
+
     def predict(self, x: np.ndarray, batch_size: int = 128, training_mode: bool = False, **kwargs) -> np.ndarray:
         """
         Perform prediction of the given classifier for a batch of inputs, potentially filtering suspicious input
@@ -142,15 +162,24 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
 
         return predictions
 
-    def mitigate(self, x_val: np.ndarray, y_val: np.ndarray, mitigation_types: List[str]) -> None:
+    def mitigate(
+        self, x_val: np.ndarray, y_val: np.ndarray, mitigation_types: List[str], pruning_search: str = "linear"
+    ) -> None:
         """
         Mitigates the effect of poison on a classifier
 
         :param x_val: Validation data to use to mitigate the effect of poison.
         :param y_val: Validation labels to use to mitigate the effect of poison.
         :param mitigation_types: The types of mitigation method, can include 'unlearning', 'pruning', or 'filtering'
+        :param pruning_search: How to search for the number of neurons to prune, either 'linear' to check the
+                               backdoors after pruning each neuron, or 'bisection' to search with exponential steps
+                               followed by bisection, assuming that pruning more neurons never reactivates the
+                               backdoors.
         :return: Tuple of length 2 of the selected class and certified radius.
         """
+        if pruning_search not in ["linear", "bisection"]:
+            raise ValueError("The pruning search must be either 'linear' or 'bisection'.")
+
         clean_data, backdoor_data, backdoor_labels = self.backdoor_examples(x_val, y_val)
 
         # If no backdoors detected from outlier detection, do nothing
@@ -184,14 +213,21 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
                 # starting from indices of high activation neurons, set weights (and biases) of high activation
                 # neurons to zero, until backdoor ineffective or pruned 30% of neurons
                 logger.info("Pruning model...")
-                while (
-                    backdoor_effective
-                    and num_neurons_pruned < 0.3 * total_neurons
-                    and num_neurons_pruned < len(ranked_indices)
-                ):
-                    self._prune_neuron_at_index(ranked_indices[num_neurons_pruned])
-                    num_neurons_pruned += 1
-                    backdoor_effective = self.check_backdoor_effective(backdoor_data, backdoor_labels)
+                if pruning_search == "bisection":
+                    if backdoor_effective:
+                        max_neurons_pruned = min(int(np.ceil(0.3 * total_neurons)), len(ranked_indices))
+                        num_neurons_pruned = self._prune_neurons_bisection(
+                            ranked_indices, max_neurons_pruned, backdoor_data, backdoor_labels
+                        )
+                else:
+                    while (
+                        backdoor_effective
+                        and num_neurons_pruned < 0.3 * total_neurons
+                        and num_neurons_pruned < len(ranked_indices)
+                    ):
+                        self._prune_neuron_at_index(ranked_indices[num_neurons_pruned])
+                        num_neurons_pruned += 1
+                        backdoor_effective = self.check_backdoor_effective(backdoor_data, backdoor_labels)
                 logger.info("Pruning complete. Pruned %d neurons", num_neurons_pruned)
 
             elif mitigation_type == "filtering":
@@ -214,6 +250,64 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
             else:
                 raise TypeError("Mitigation type: `" + mitigation_type + "` not supported")
 
+    def _prune_neurons_bisection(
+        self,
+        ranked_indices: np.ndarray,
+        max_neurons_pruned: int,
+        backdoor_data: np.ndarray,
+        backdoor_labels: np.ndarray,
+    ) -> int:
+        """
+        Prune the smallest number of highest ranked neurons that makes the backdoors ineffective, searching with
+        exponentially growing steps followed by bisection. Weight snapshots of the penultimate layer are used to roll
+        back to fewer pruned neurons.
+
+        :param ranked_indices: Indices of the neurons of the penultimate layer in the order in which they are pruned.
+        :param max_neurons_pruned: The maximum number of neurons to prune.
+        :param backdoor_data: data with the backdoor added
+        :param backdoor_labels: the correct label for the data
+        :return: The number of pruned neurons.
+        """
+        # largest number of pruned neurons known to leave the backdoors effective, and the weights for it
+        num_effective = 0
+        weights_effective = self._get_penultimate_layer_weights()
+
+        # exponential search for a number of pruned neurons that makes the backdoors ineffective
+        num_neurons_pruned = 0
+        step = 1
+        while num_neurons_pruned < max_neurons_pruned:
+            num_next = min(num_neurons_pruned + step, max_neurons_pruned)
+            for index in ranked_indices[num_neurons_pruned:num_next]:
+                self._prune_neuron_at_index(index)
+            num_neurons_pruned = num_next
+            if not self.check_backdoor_effective(backdoor_data, backdoor_labels):
+                break
+            num_effective = num_neurons_pruned
+            weights_effective = self._get_penultimate_layer_weights()
+            step *= 2
+        else:
+            # the backdoors remain effective after pruning the maximum number of neurons
+            return num_neurons_pruned
+
+        # bisection between the largest effective and the smallest ineffective number of pruned neurons
+        num_ineffective = num_neurons_pruned
+        while num_ineffective - num_effective > 1:
+            num_middle = (num_effective + num_ineffective) // 2
+            self._set_penultimate_layer_weights(weights_effective)
+            for index in ranked_indices[num_effective:num_middle]:
+                self._prune_neuron_at_index(index)
+            if self.check_backdoor_effective(backdoor_data, backdoor_labels):
+                num_effective = num_middle
+                weights_effective = self._get_penultimate_layer_weights()
+            else:
+                num_ineffective = num_middle
+
+        self._set_penultimate_layer_weights(weights_effective)
+        for index in ranked_indices[num_effective:num_ineffective]:
+            self._prune_neuron_at_index(index)
+
+        return num_ineffective
+
     def check_backdoor_effective(self, backdoor_data: np.ndarray, backdoor_labels: np.ndarray) -> bool:
         """
         Check if supposed backdoors are effective against the classifier
@@ -265,6 +359,20 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
         """
         raise NotImplementedError
 
+    def generate_backdoors(
+        self, x_val: np.ndarray, y_val: np.ndarray, y_targets: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generates possible backdoors for multiple target classes, optimizing up to `class_batch_size` of them jointly.
+        Returns the masks and patterns
+
+        :param x_val: Validation data.
+        :param y_val: Validation labels.
+        :param y_targets: One-hot encoded target classes of shape `(nb_targets, nb_classes)`.
+        :return: A tuple of the masks and patterns for the model, each with `nb_targets` as first dimension.
+        """
+        raise NotImplementedError
+
     def outlier_detection(self, x_val: np.ndarray, y_val: np.ndarray) -> List[Tuple[int, np.ndarray, np.ndarray]]:
         """
         Returns a tuple of suspected of suspected poison labels and their mask and pattern
@@ -274,14 +382,23 @@ class NeuralCleanseMixin(AbstainPredictorMixin):
         masks = []
         patterns = []
         num_classes = self.nb_classes
-        for class_idx in range(num_classes):
+        if self.class_batch_size > 1:
             # Assuming classes are indexed
-            target_label = to_categorical([class_idx], num_classes).flatten()
-            mask, pattern = self.generate_backdoor(x_val, y_val, target_label)
-            norm = np.sum(np.abs(mask))
-            l1_norms.append(norm)
-            masks.append(mask)
-            patterns.append(pattern)
+            target_labels = to_categorical(np.arange(num_classes), num_classes)
+            masks_all, patterns_all = self.generate_backdoors(x_val, y_val, target_labels)
+            for mask, pattern in zip(masks_all, patterns_all):
+                l1_norms.append(np.sum(np.abs(mask)))
+                masks.append(mask)
+                patterns.append(pattern)
+        else:
+            for class_idx in range(num_classes):
+                # Assuming classes are indexed
+                target_label = to_categorical([class_idx], num_classes).flatten()
+                mask, pattern = self.generate_backdoor(x_val, y_val, target_label)
+                norm = np.sum(np.abs(mask))
+                l1_norms.append(norm)
+                masks.append(mask)
+                patterns.append(pattern)
 
         # assuming l1 norms would naturally create a normal distribution
         consistency_constant = 1.4826
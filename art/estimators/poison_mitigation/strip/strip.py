@@ -46,6 +46,7 @@ class STRIPMixin(AbstainPredictorMixin):
         predict_fn: Callable[[np.ndarray], np.ndarray],
         num_samples: int = 20,
         false_acceptance_rate: float = 0.01,
+        batch_size: int = 1,
         **kwargs
     ) -> None:
         """
@@ -54,11 +55,14 @@ class STRIPMixin(AbstainPredictorMixin):
         :param predict_fn: The predict function of the original classifier
         :param num_samples: The number of samples to use to test entropy at inference time
         :param false_acceptance_rate: The percentage of acceptable false acceptance
+        :param batch_size: The number of inputs to perturb together; each call to `predict_fn` evaluates
+                           `batch_size * num_samples` superimposed images.
         """
         super().__init__(**kwargs)
         self.predict_fn = predict_fn
         self.num_samples = num_samples
         self.false_acceptance_rate = false_acceptance_rate
+        self.batch_size = batch_size
         self.entropy_threshold: Optional[float] = None
         self.validation_data: Optional[np.ndarray] = None
 
@@ -75,29 +79,12 @@ class STRIPMixin(AbstainPredictorMixin):
             logger.warning("Mitigation has not been performed. Predictions may be unsafe.")
             return raw_predictions
 
-        x_val = self.validation_data
-        final_predictions = []
+        # Abstain if entropy is below threshold
+        entropies = self._normalized_entropies(x, self.validation_data)
+        final_predictions = raw_predictions.copy()
+        final_predictions[entropies <= self.entropy_threshold] = self.abstain()
 
-        for i, img in enumerate(x):
-            # Randomly select samples from test set
-            selected_indices = np.random.choice(np.arange(len(x_val)), self.num_samples)
-
-            # Perturb the images by combining them
-            perturbed_images = np.array([combine_images(img, x_val[idx]) for idx in selected_indices])
-
-            # Predict on the perturbed images
-            perturbed_predictions = self.predict_fn(perturbed_images)
-
-            # Calculate normalized entropy
-            normalized_entropy = np.sum(entropy(perturbed_predictions, base=2, axis=0)) / float(self.num_samples)
-
-            # Abstain if entropy is below threshold
-            if normalized_entropy <= self.entropy_threshold:
-                final_predictions.append(self.abstain())
-            else:
-                final_predictions.append(raw_predictions[i])
-
-        return np.array(final_predictions)
+        return final_predictions
 
     def mitigate(self, x_val: np.ndarray) -> None:
         """
@@ -106,15 +93,9 @@ class STRIPMixin(AbstainPredictorMixin):
         :param x_val: Validation data to use to mitigate the effect of poison.
         """
         self.validation_data = x_val
-        entropies = []
 
         # Find normal entropy distribution
-        for _, img in enumerate(tqdm(x_val)):
-            selected_indices = np.random.choice(np.arange(len(x_val)), self.num_samples)
-            perturbed_images = np.array([combine_images(img, x_val[idx]) for idx in selected_indices])
-            perturbed_predictions = self.predict_fn(perturbed_images)
-            normalized_entropy = np.sum(entropy(perturbed_predictions, base=2, axis=0)) / float(self.num_samples)
-            entropies.append(normalized_entropy)
+        entropies = self._normalized_entropies(x_val, x_val, verbose=True)
 
         mean_entropy, std_entropy = norm.fit(entropies)
 
@@ -123,6 +104,36 @@ class STRIPMixin(AbstainPredictorMixin):
         if self.entropy_threshold is not None and self.entropy_threshold < 0:
             logger.warning("Entropy value is negative. Increase FAR for reasonable performance.")
 
+    def _normalized_entropies(self, x: np.ndarray, x_val: np.ndarray, verbose: bool = False) -> np.ndarray:
+        """
+        Compute the normalized entropy of the predictions on inputs superimposed with random validation samples.
+
+        :param x: Input samples.
+        :param x_val: Validation data to superimpose on the inputs.
+        :param verbose: Show progress bars.
+        :return: Array of normalized entropies of shape `(nb_inputs,)`.
+        """
+        entropies = np.zeros(len(x))
+        nb_batches = int(np.ceil(len(x) / float(self.batch_size)))
+
+        for batch_index in tqdm(range(nb_batches), disable=not verbose):
+            begin, end = batch_index * self.batch_size, min((batch_index + 1) * self.batch_size, len(x))
+
+            # Randomly select samples from validation set and perturb the images by combining them
+            selected_indices = np.random.choice(len(x_val), (end - begin, self.num_samples))
+            perturbed_images = combine_images(np.expand_dims(x[begin:end], axis=1), x_val[selected_indices])
+
+            # Predict on the perturbed images
+            perturbed_predictions = self.predict_fn(perturbed_images.reshape((-1,) + x.shape[1:]))
+            perturbed_predictions = perturbed_predictions.reshape((end - begin, self.num_samples, -1))
+
+            # Calculate normalized entropy
+            entropies[begin:end] = np.sum(entropy(perturbed_predictions, base=2, axis=1), axis=1) / float(
+                self.num_samples
+            )
+
+        return entropies
+
 
 def combine_images(img1: np.ndarray, img2: np.ndarray, alpha=0.5) -> np.ndarray:
     """
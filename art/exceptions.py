@@ -51,3 +51,22 @@ class EstimatorError(TypeError):
 
     def __str__(self) -> str:
         return self.message
+
+
+class QueryBudgetExceededError(RuntimeError):
+    """
+    Exception raised by `QueryMonitor` when a call would exceed the query budget of the monitored estimator.
+    """
+
+    def __init__(self, max_queries: int, nb_queries: int, nb_requested: int) -> None:
+        super().__init__()
+        self.max_queries = max_queries
+        self.nb_queries = nb_queries
+        self.nb_requested = nb_requested
+
+        self.message = "Query budget of {0} exceeded: {1} queries have been used and {2} more were requested.".format(
+            max_queries, nb_queries, nb_requested
+        )
+
+    def __str__(self) -> str:
+        return self.message
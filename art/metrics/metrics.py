@@ -42,6 +42,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of gradient entries requested from `class_gradient` in one call for all classes at once
+CLEVER_GRADIENT_BUDGET = 2 ** 26
+
 SUPPORTED_METHODS: Dict[str, Dict[str, Any]] = {
     "fgsm": {
         "class": FastGradientMethod,
@@ -223,13 +226,25 @@ def clever(
     else:
         # Assume it's iterable
         target_classes = target
-    score_list: List[Optional[float]] = []
-    for j in tqdm(target_classes, desc="CLEVER untargeted", disable=not verbose):
-        if j == pred_class:
-            score_list.append(None)
-            continue
-        score = clever_t(classifier, x, j, nb_batches, batch_size, radius, norm, c_init, pool_factor)
-        score_list.append(score)
+
+    # Compute the scores of all targeted classes at once
+    scores = np.full(classifier.nb_classes, np.nan)
+    untarget_classes = [j for j in target_classes if j != pred_class]
+    if untarget_classes:
+        scores = clever_batch(
+            classifier,
+            np.array([x]),
+            nb_batches,
+            batch_size,
+            radius,
+            norm,
+            target=untarget_classes,
+            c_init=c_init,
+            pool_factor=pool_factor,
+            verbose=verbose,
+        )[0]
+
+    score_list: List[Optional[float]] = [None if j == pred_class else scores[j] for j in target_classes]
     return np.array(score_list)
 
 
@@ -260,18 +275,20 @@ def clever_u(
     :param verbose: Show progress bars.
     :return: CLEVER score.
     """
-    # Get a list of untargeted classes
-    y_pred = classifier.predict(np.array([x]))
-    pred_class = np.argmax(y_pred, axis=1)[0]
-    untarget_classes = [i for i in range(classifier.nb_classes) if i != pred_class]
-
-    # Compute CLEVER score for each untargeted class
-    score_list = []
-    for j in tqdm(untarget_classes, desc="CLEVER untargeted", disable=not verbose):
-        score = clever_t(classifier, x, j, nb_batches, batch_size, radius, norm, c_init, pool_factor)
-        score_list.append(score)
+    # Compute CLEVER score for each untargeted class and take the minimum
+    scores = clever_batch(
+        classifier,
+        np.array([x]),
+        nb_batches,
+        batch_size,
+        radius,
+        norm,
+        c_init=c_init,
+        pool_factor=pool_factor,
+        verbose=verbose,
+    )
 
-    return np.min(score_list)
+    return np.nanmin(scores[0])
 
 
 def clever_t(
@@ -307,71 +324,167 @@ def clever_t(
     if target_class == pred_class:
         raise ValueError("The targeted class is the predicted class.")
 
+    scores = clever_batch(
+        classifier,
+        np.array([x]),
+        nb_batches,
+        batch_size,
+        radius,
+        norm,
+        target=target_class,
+        c_init=c_init,
+        pool_factor=pool_factor,
+        verbose=False,
+    )
+
+    return scores[0, target_class]
+
+
+def clever_batch(
+    classifier: "CLASSIFIER_CLASS_LOSS_GRADIENTS_TYPE",
+    x: np.ndarray,
+    nb_batches: int,
+    batch_size: int,
+    radius: float,
+    norm: int,
+    target: Union[int, List[int], None] = None,
+    c_init: float = 1.0,
+    pool_factor: int = 10,
+    grad_batch_size: int = 1024,
+    verbose: bool = True,
+) -> np.ndarray:
+    """
+    Compute targeted CLEVER scores for a set of samples and target classes at once. All target classes of a sample
+    share one pool of random samples, the gradients required for all target classes are computed together and the
+    pools of several samples are processed in the same gradient batches. The untargeted CLEVER score of each sample
+    is given by `np.nanmin(scores, axis=1)`.
+
+    | Paper link: https://arxiv.org/abs/1801.10578
+
+    :param classifier: A trained model.
+    :param x: Input samples of shape `(nb_samples, ...)`.
+    :param nb_batches: Number of repetitions of the estimate.
+    :param batch_size: Number of random examples to sample per batch.
+    :param radius: Radius of the maximum perturbation.
+    :param norm: Current support: 1, 2, np.inf.
+    :param target: Class or classes to target for all samples. If `None`, targets all classes.
+    :param c_init: Initialization of Weibull distribution.
+    :param pool_factor: The factor to create a pool of random samples with size pool_factor x n_s.
+    :param grad_batch_size: Number of random samples per gradient computation. The pools of
+           `max(1, grad_batch_size // (pool_factor * batch_size))` samples are generated at once.
+    :param verbose: Show progress bars.
+    :return: Array of shape `(nb_samples, nb_classes)` with the CLEVER score of each targeted class. The entries of the
+             predicted class and of classes that are not targeted are `np.nan`.
+    """
     # Check if pool_factor is smaller than 1
     if pool_factor < 1:
         raise ValueError("The `pool_factor` must be larger than 1.")
 
-    # Some auxiliary vars
-    rand_pool_grad_set = []
-    grad_norm_set = []
-    dim = reduce(lambda x_, y: x_ * y, x.shape, 1)
-    shape = [pool_factor * batch_size]
-    shape.extend(x.shape)
-
-    # Generate a pool of samples
-    rand_pool = np.reshape(
-        random_sphere(nb_points=pool_factor * batch_size, nb_dims=dim, radius=radius, norm=norm),
-        shape,
-    )
-    rand_pool += np.repeat(np.array([x]), pool_factor * batch_size, 0)
-    rand_pool = rand_pool.astype(ART_NUMPY_DTYPE)
-    if hasattr(classifier, "clip_values") and classifier.clip_values is not None:
-        np.clip(rand_pool, classifier.clip_values[0], classifier.clip_values[1], out=rand_pool)
+    if grad_batch_size < 1:
+        raise ValueError("The `grad_batch_size` must be a positive integer.")
 
     # Change norm since q = p / (p-1)
     if norm == 1:
-        norm = np.inf
+        dual_norm = np.inf
     elif norm == np.inf:
-        norm = 1
-    elif norm != 2:
+        dual_norm = 1
+    elif norm == 2:
+        dual_norm = 2
+    else:
         raise ValueError("Norm {} not supported".format(norm))
 
-    # Compute gradients for all samples in rand_pool
-    for i in range(batch_size):
-        rand_pool_batch = rand_pool[i * pool_factor : (i + 1) * pool_factor]
-
-        # Compute gradients
-        grad_pred_class = classifier.class_gradient(rand_pool_batch, label=pred_class)
-        grad_target_class = classifier.class_gradient(rand_pool_batch, label=target_class)
-
-        if np.isnan(grad_pred_class).any() or np.isnan(grad_target_class).any():
-            raise Exception("The classifier results NaN gradients.")
-
-        grad = grad_pred_class - grad_target_class
-        grad = np.reshape(grad, (pool_factor, -1))
-        grad = np.linalg.norm(grad, ord=norm, axis=1)
-        rand_pool_grad_set.extend(grad)
-
-    rand_pool_grads = np.array(rand_pool_grad_set)
-
-    # Loop over the batches
-    for _ in range(nb_batches):
-        # Random selection of gradients
-        grad_norm = rand_pool_grads[np.random.choice(pool_factor * batch_size, batch_size)]
-        grad_norm = np.max(grad_norm)
-        grad_norm_set.append(grad_norm)
-
-    # Maximum likelihood estimation for max gradient norms
-    [_, loc, _] = weibull_min.fit(-np.array(grad_norm_set), c_init, optimizer=scipy_optimizer)
-
-    # Compute function value
-    values = classifier.predict(np.array([x]))
-    value = values[:, pred_class] - values[:, target_class]
+    nb_classes = classifier.nb_classes
+    if target is None:
+        target_classes = np.arange(nb_classes)
+    elif isinstance(target, (int, np.integer)):
+        target_classes = np.array([target])
+    else:
+        # Assume it's iterable
+        target_classes = np.unique(np.array(target, dtype=int))
 
-    # Compute scores
-    score = np.min([-value[0] / loc, radius])
+    y_pred = classifier.predict(x)
+    pred_classes = np.argmax(y_pred, axis=1)
+    scores = np.full((x.shape[0], nb_classes), np.nan)
+    if target_classes.size == 0:
+        return scores
 
-    return score
+    # Some auxiliary vars
+    dim = reduce(lambda x_, y: x_ * y, x.shape[1:], 1)
+    pool_size = pool_factor * batch_size
+    nb_samples_chunk = max(1, grad_batch_size // pool_size)
+
+    # Gradients of all classes are computed at once if (almost) all classes are required and fit the budget
+    all_classes = target_classes.size >= nb_classes - 1 and grad_batch_size * nb_classes * dim <= CLEVER_GRADIENT_BUDGET
+
+    for chunk_start in tqdm(range(0, x.shape[0], nb_samples_chunk), desc="CLEVER", disable=not verbose):
+        x_chunk = x[chunk_start : chunk_start + nb_samples_chunk]
+        pred_chunk = pred_classes[chunk_start : chunk_start + nb_samples_chunk]
+        nb_chunk = x_chunk.shape[0]
+
+        # Generate one pool of samples for each sample, shared by all targeted classes
+        rand_pool = np.reshape(
+            random_sphere(nb_points=nb_chunk * pool_size, nb_dims=dim, radius=radius, norm=norm),
+            (nb_chunk * pool_size,) + x.shape[1:],
+        )
+        rand_pool += np.repeat(x_chunk, pool_size, axis=0)
+        rand_pool = rand_pool.astype(ART_NUMPY_DTYPE)
+        if hasattr(classifier, "clip_values") and classifier.clip_values is not None:
+            np.clip(rand_pool, classifier.clip_values[0], classifier.clip_values[1], out=rand_pool)
+        pool_pred_classes = np.repeat(pred_chunk, pool_size)
+
+        # Compute the gradient norms of all targeted classes for all samples in rand_pool
+        rand_pool_grads = np.zeros((nb_chunk * pool_size, target_classes.size), dtype=ART_NUMPY_DTYPE)
+        for i in range(0, rand_pool.shape[0], grad_batch_size):
+            rand_pool_batch = rand_pool[i : i + grad_batch_size]
+            nb_rows = rand_pool_batch.shape[0]
+            batch_pred_classes = pool_pred_classes[i : i + grad_batch_size]
+
+            if all_classes:
+                grads = classifier.class_gradient(rand_pool_batch, label=None)
+                grads = np.reshape(grads, (nb_rows, nb_classes, -1))
+                if np.isnan(grads).any():
+                    raise Exception("The classifier results NaN gradients.")
+                grad_pred_class = grads[np.arange(nb_rows), batch_pred_classes]
+            else:
+                grad_pred_class = classifier.class_gradient(rand_pool_batch, label=batch_pred_classes)
+                grad_pred_class = np.reshape(grad_pred_class, (nb_rows, -1))
+                if np.isnan(grad_pred_class).any():
+                    raise Exception("The classifier results NaN gradients.")
+
+            for t, j in enumerate(target_classes):
+                if all_classes:
+                    grad_target_class = grads[:, j]
+                else:
+                    grad_target_class = classifier.class_gradient(rand_pool_batch, label=int(j))
+                    grad_target_class = np.reshape(grad_target_class, (nb_rows, -1))
+                    if np.isnan(grad_target_class).any():
+                        raise Exception("The classifier results NaN gradients.")
+
+                grad = grad_pred_class - grad_target_class
+                rand_pool_grads[i : i + grad_batch_size, t] = np.linalg.norm(grad, ord=dual_norm, axis=1)
+
+        # Random selection of gradients for all batches, samples and targeted classes at once
+        rand_pool_grads = np.reshape(rand_pool_grads, (nb_chunk, pool_size, target_classes.size))
+        selection = np.random.randint(0, pool_size, size=(nb_chunk, nb_batches * batch_size, target_classes.size))
+        grad_norm_set = np.take_along_axis(rand_pool_grads, selection, axis=1)
+        grad_norm_set = np.max(np.reshape(grad_norm_set, (nb_chunk, nb_batches, batch_size, -1)), axis=2)
+
+        # Compute function values
+        values = y_pred[chunk_start : chunk_start + nb_chunk]
+        values = values[np.arange(nb_chunk), pred_chunk][:, np.newaxis] - values[:, target_classes]
+
+        for k in range(nb_chunk):
+            for t, j in enumerate(target_classes):
+                if j == pred_chunk[k]:
+                    continue
+
+                # Maximum likelihood estimation for max gradient norms
+                [_, loc, _] = weibull_min.fit(-grad_norm_set[k, :, t], c_init, optimizer=scipy_optimizer)
+
+                # Compute scores
+                scores[chunk_start + k, j] = np.min([-values[k, t] / loc, radius])
+
+    return scores
 
 
 def wasserstein_distance(
@@ -20,11 +20,14 @@ This module implements robustness verifications for decision-tree-based models.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
 import logging
+import os
 from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
-from tqdm.auto import trange
+from tqdm.auto import tqdm
 
 if TYPE_CHECKING:
     from art.estimators.classification.classifier import ClassifierDecisionTree
@@ -176,8 +179,15 @@ class RobustnessVerificationTreeModelsCliqueMethod:
         """
         self._classifier = classifier
         self.verbose = verbose
+        self._nb_classes = self._classifier.nb_classes
         self._trees = self._classifier.get_trees()
 
+    def __getstate__(self) -> dict:
+        # The worker processes only require the trees, do not ship the classifier
+        state = self.__dict__.copy()
+        state["_classifier"] = None
+        return state
+
     def verify(
         self,
         x: np.ndarray,
@@ -187,6 +197,8 @@ class RobustnessVerificationTreeModelsCliqueMethod:
         nb_search_steps: int = 10,
         max_clique: int = 2,
         max_level: int = 2,
+        nb_jobs: int = 1,
+        checkpoint: Optional[str] = None,
     ) -> Tuple[float, float]:
         """
         Verify the robustness of the classifier on the dataset `(x, y)`.
@@ -198,87 +210,190 @@ class RobustnessVerificationTreeModelsCliqueMethod:
         :param nb_search_steps: The number of search steps.
         :param max_clique: The maximum number of nodes in a clique.
         :param max_level: The maximum number of clique search levels.
+        :param nb_jobs: Number of worker processes the samples are distributed to. If -1, all CPUs are used.
+        :param checkpoint: Path of a file to which the result of each sample is appended as soon as it is available.
+                           Samples already stored in an existing file are not verified again, which allows to resume
+                           an interrupted run on the same dataset `(x, y)` with the same parameters.
         :return: A tuple of the average robustness bound and the verification error at `eps`.
         """
+        bounds, initial_robust = self.verify_samples(
+            x=x,
+            y=y,
+            eps_init=eps_init,
+            norm=norm,
+            nb_search_steps=nb_search_steps,
+            max_clique=max_clique,
+            max_level=max_level,
+            nb_jobs=nb_jobs,
+            checkpoint=checkpoint,
+        )
+
+        verified_error = 1.0 - int(np.sum(initial_robust)) / x.shape[0]
+        average_bound = sum(bounds.tolist()) / x.shape[0]
+
+        logger.info("The average interval bound is: {:.4g}".format(average_bound))
+        logger.info("The verified error at eps = {0:.4g} is: {1:.4g}".format(eps_init, verified_error))
+
+        return average_bound, verified_error
+
+    def verify_samples(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        eps_init: float,
+        norm: int = np.inf,
+        nb_search_steps: int = 10,
+        max_clique: int = 2,
+        max_level: int = 2,
+        nb_jobs: int = 1,
+        checkpoint: Optional[str] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Verify the robustness of the classifier for each sample of the dataset `(x, y)`.
+
+        :param x: Feature data of shape `(nb_samples, nb_features)`.
+        :param y: Labels, one-vs-rest encoding of shape `(nb_samples, nb_classes)`.
+        :param eps_init: Attack budget for the first search step.
+        :param norm: The norm to apply epsilon.
+        :param nb_search_steps: The number of search steps.
+        :param max_clique: The maximum number of nodes in a clique.
+        :param max_level: The maximum number of clique search levels.
+        :param nb_jobs: Number of worker processes the samples are distributed to. If -1, all CPUs are used.
+        :param checkpoint: Path of a file to which the result of each sample is appended as soon as it is available.
+                           Samples already stored in an existing file are not verified again, which allows to resume
+                           an interrupted run on the same dataset `(x, y)` with the same parameters.
+        :return: A tuple of the robustness bound of each sample (0 if no robust eps has been found) and a boolean array
+                 indicating whether each sample is robust at `eps_init`.
+        """
+        if nb_jobs == -1:
+            nb_jobs = os.cpu_count() or 1
+        if not isinstance(nb_jobs, int) or nb_jobs < 1:
+            raise ValueError("The number of jobs `nb_jobs` has to be a positive integer or -1.")
+
         self.x: np.ndarray = x
         self.y: np.ndarray = np.argmax(y, axis=1)
         self.max_clique: int = max_clique
         self.max_level: int = max_level
 
-        average_bound: float = 0.0
-        num_initial_successes: int = 0
         num_samples: int = x.shape[0]
+        bounds = np.zeros(num_samples)
+        initial_robust = np.zeros(num_samples, dtype=bool)
+        done = np.zeros(num_samples, dtype=bool)
+
+        if checkpoint is not None and os.path.isfile(checkpoint):
+            results = np.loadtxt(checkpoint, delimiter=",", ndmin=2)
+            if results.size > 0:
+                i_samples = results[:, 0].astype(int)
+                bounds[i_samples] = results[:, 1]
+                initial_robust[i_samples] = results[:, 2].astype(bool)
+                done[i_samples] = True
+                logger.info("Resuming verification with %d of %d samples completed.", np.sum(done), num_samples)
+
+        pending = np.where(~done)[0].tolist()
+
+        with ExitStack() as stack:
+            checkpoint_file = stack.enter_context(open(checkpoint, "a")) if checkpoint is not None else None
+
+            def store(i_sample: int, bound: float, is_robust: bool) -> None:
+                bounds[i_sample] = bound
+                initial_robust[i_sample] = is_robust
+                if checkpoint_file is not None:
+                    checkpoint_file.write("{0:d},{1:.17g},{2:d}\n".format(i_sample, bound, int(is_robust)))
+                    checkpoint_file.flush()
+
+            with tqdm(
+                total=num_samples,
+                initial=num_samples - len(pending),
+                desc="Decision tree verification",
+                disable=not self.verbose,
+            ) as pbar:
+                if nb_jobs == 1:
+                    for i_sample in pending:
+                        store(i_sample, *self._verify_sample(i_sample, eps_init, norm, nb_search_steps))
+                        pbar.update(1)
+                else:
+                    # The verifier including the trees is shipped to each worker process only once
+                    executor = ProcessPoolExecutor(max_workers=nb_jobs, initializer=_init_worker, initargs=(self,))
+                    with executor:
+                        futures = {
+                            executor.submit(_verify_sample_worker, i_sample, eps_init, norm, nb_search_steps): i_sample
+                            for i_sample in pending
+                        }
+                        for future in as_completed(futures):
+                            store(futures[future], *future.result())
+                            pbar.update(1)
+
+        return bounds, initial_robust
+
+    def _verify_sample(self, i_sample: int, eps_init: float, norm: int, nb_search_steps: int) -> Tuple[float, bool]:
+        """
+        Run the binary search for the robustness bound of a single sample.
+
+        :param i_sample: Index of training sample in `x`.
+        :param eps_init: Attack budget for the first search step.
+        :param norm: The norm to apply epsilon.
+        :param nb_search_steps: The number of search steps.
+        :return: A tuple of the robustness bound (0 if no robust eps has been found) and whether the sample is robust
+                 at `eps_init`.
+        """
+        eps: float = eps_init
+        robust_log: List[bool] = list()
+        i_robust = None
+        i_not_robust = None
+        eps_robust: float = 0.0
+        eps_not_robust: float = 0.0
+        best_score: Optional[float]
+        initial_success = False
 
         # pylint: disable=R1702
-        pbar = trange(num_samples, desc="Decision tree verification", disable=not self.verbose)
-        for i_sample in pbar:
-
-            eps: float = eps_init
-            robust_log: List[bool] = list()
-            i_robust = None
-            i_not_robust = None
-            eps_robust: float = 0.0
-            eps_not_robust: float = 0.0
-            best_score: Optional[float]
-
-            for i_step in range(nb_search_steps):
-                logger.info("Search step {0:d}: eps = {1:.4g}".format(i_step, eps))
-
-                is_robust = True
-
-                if self._classifier.nb_classes <= 2:
-                    best_score = self._get_best_score(i_sample, eps, norm, target_label=None)
-                    is_robust = (self.y[i_sample] < 0.5 and best_score < 0) or (
-                        self.y[i_sample] > 0.5 and best_score > 0.0
-                    )
-                else:
-                    for i_class in range(self._classifier.nb_classes):
-                        if i_class != self.y[i_sample]:
-                            best_score = self._get_best_score(i_sample, eps, norm, target_label=i_class)
-                            is_robust = is_robust and (best_score > 0.0)
-                            if not is_robust:
-                                break
-
-                robust_log.append(is_robust)
-
-                if is_robust:
-                    if i_step == 0:
-                        num_initial_successes += 1
-                    logger.info("Model is robust at eps = {:.4g}".format(eps))
-                    i_robust = i_step
-                    eps_robust = eps
-                else:
-                    logger.info("Model is not robust at eps = {:.4g}".format(eps))
-                    i_not_robust = i_step
-                    eps_not_robust = eps
+        for i_step in range(nb_search_steps):
+            logger.info("Search step {0:d}: eps = {1:.4g}".format(i_step, eps))
 
-                if i_robust is None:
-                    eps /= 2.0
-                else:
-                    if i_not_robust is None:
-                        if eps >= 1.0:
-                            logger.info("Abort binary search because eps increased above 1.0")
+            is_robust = True
+
+            if self._nb_classes <= 2:
+                best_score = self._get_best_score(i_sample, eps, norm, target_label=None)
+                is_robust = (self.y[i_sample] < 0.5 and best_score < 0) or (self.y[i_sample] > 0.5 and best_score > 0.0)
+            else:
+                for i_class in range(self._nb_classes):
+                    if i_class != self.y[i_sample]:
+                        best_score = self._get_best_score(i_sample, eps, norm, target_label=i_class)
+                        is_robust = is_robust and (best_score > 0.0)
+                        if not is_robust:
                             break
-                        eps = min(eps * 2.0, 1.0)
-                    else:
-                        eps = (eps_robust + eps_not_robust) / 2.0
 
-            if i_robust is not None:
-                clique_bound = eps_robust
-                average_bound += clique_bound
+            robust_log.append(is_robust)
+
+            if is_robust:
+                if i_step == 0:
+                    initial_success = True
+                logger.info("Model is robust at eps = {:.4g}".format(eps))
+                i_robust = i_step
+                eps_robust = eps
             else:
-                logger.info(
-                    "point %s: WARNING! no robust eps found, verification bound is set as 0 !",
-                    i_sample,
-                )
+                logger.info("Model is not robust at eps = {:.4g}".format(eps))
+                i_not_robust = i_step
+                eps_not_robust = eps
 
-        verified_error = 1.0 - num_initial_successes / num_samples
-        average_bound = average_bound / num_samples
+            if i_robust is None:
+                eps /= 2.0
+            else:
+                if i_not_robust is None:
+                    if eps >= 1.0:
+                        logger.info("Abort binary search because eps increased above 1.0")
+                        break
+                    eps = min(eps * 2.0, 1.0)
+                else:
+                    eps = (eps_robust + eps_not_robust) / 2.0
 
-        logger.info("The average interval bound is: {:.4g}".format(average_bound))
-        logger.info("The verified error at eps = {0:.4g} is: {1:.4g}".format(eps_init, verified_error))
+        if i_robust is None:
+            logger.info(
+                "point %s: WARNING! no robust eps found, verification bound is set as 0 !",
+                i_sample,
+            )
+            return 0.0, initial_success
 
-        return average_bound, verified_error
+        return eps_robust, initial_success
 
     def _get_k_partite_clique(
         self,
@@ -304,11 +419,7 @@ class RobustnessVerificationTreeModelsCliqueMethod:
 
             # Start searching for cliques
             for accessible_leaf in accessible_leaves[start_tree]:
-                if (
-                    self._classifier.nb_classes > 2
-                    and target_label is not None
-                    and target_label == accessible_leaf.class_label
-                ):
+                if self._nb_classes > 2 and target_label is not None and target_label == accessible_leaf.class_label:
                     new_leaf_value = -accessible_leaf.value
                 else:
                     new_leaf_value = accessible_leaf.value
@@ -327,7 +438,7 @@ class RobustnessVerificationTreeModelsCliqueMethod:
                         leaf_box = accessible_leaf.box.get_intersection(clique["box"])  # type: ignore
                         if leaf_box.intervals:
                             if (
-                                self._classifier.nb_classes > 2
+                                self._nb_classes > 2
                                 and target_label is not None
                                 and target_label == accessible_leaf.class_label
                             ):
@@ -360,7 +471,7 @@ class RobustnessVerificationTreeModelsCliqueMethod:
                 if i == 0:
                     best_score = clique["value"]  # type: ignore
                 else:
-                    if label < 0.5 and self._classifier.nb_classes <= 2:
+                    if label < 0.5 and self._nb_classes <= 2:
                         best_score = max(best_score, clique["value"])  # type: ignore
                     else:
                         best_score = min(best_score, clique["value"])  # type: ignore
@@ -384,7 +495,7 @@ class RobustnessVerificationTreeModelsCliqueMethod:
         best_score: float = 0.0
 
         for i_level in range(self.max_level):
-            if self._classifier.nb_classes > 2 and i_level > 0:
+            if self._nb_classes > 2 and i_level > 0:
                 target_label = None
             best_score, nodes = self._get_k_partite_clique(nodes, label=self.y[i_sample], target_label=target_label)
 
@@ -447,11 +558,7 @@ class RobustnessVerificationTreeModelsCliqueMethod:
         accessible_leaves = list()
 
         for tree in self._trees:
-            if (
-                self._classifier.nb_classes <= 2
-                or target_label is None
-                or tree.class_id in [self.y[i_sample], target_label]
-            ):
+            if self._nb_classes <= 2 or target_label is None or tree.class_id in [self.y[i_sample], target_label]:
 
                 leaves = list()
 
@@ -466,3 +573,23 @@ class RobustnessVerificationTreeModelsCliqueMethod:
                 accessible_leaves.append(leaves)
 
         return accessible_leaves
+
+
+_WORKER_VERIFIER: Optional[RobustnessVerificationTreeModelsCliqueMethod] = None
+
+
+def _init_worker(verifier: RobustnessVerificationTreeModelsCliqueMethod) -> None:
+    """
+    Store the verifier shipped to a worker process of `RobustnessVerificationTreeModelsCliqueMethod.verify_samples`.
+    """
+    global _WORKER_VERIFIER  # pylint: disable=W0603
+    _WORKER_VERIFIER = verifier
+
+
+def _verify_sample_worker(i_sample: int, eps_init: float, norm: int, nb_search_steps: int) -> Tuple[float, bool]:
+    """
+    Verify a single sample with the verifier of the current worker process.
+    """
+    if _WORKER_VERIFIER is None:
+        raise ValueError("The worker process has not been initialised.")
+    return _WORKER_VERIFIER._verify_sample(i_sample, eps_init, norm, nb_search_steps)  # pylint: disable=W0212
@@ -76,7 +76,7 @@ class EoTImageRotationTensorFlow(EoTTensorFlowV2):
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
         """
-        Transformation of an input image and its label by randomly sampled rotation.
+        Transformation of input images and their labels by randomly sampled rotations.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -86,7 +86,7 @@ class EoTImageRotationTensorFlow(EoTTensorFlowV2):
         import tensorflow_addons as tfa
 
         # pylint: disable=E1120,E1123
-        angles = tf.random.uniform(shape=(), minval=self.angles_range[0], maxval=self.angles_range[1])
+        angles = tf.random.uniform(shape=(x.shape[0],), minval=self.angles_range[0], maxval=self.angles_range[1])
         angles = angles / 360.0 * 2.0 * np.pi
         x_preprocess = tfa.image.rotate(images=x, angles=angles, interpolation="NEAREST", name=None)
         x_preprocess = tf.clip_by_value(
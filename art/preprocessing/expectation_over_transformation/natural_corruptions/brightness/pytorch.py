@@ -67,7 +67,7 @@ class EoTBrightnessPyTorch(EoTPyTorch):
         self, x: "torch.Tensor", y: Optional["torch.Tensor"], **kwargs
     ) -> Tuple["torch.Tensor", Optional["torch.Tensor"]]:
         """
-        Transformation of an image with randomly sampled brightness.
+        Transformation of images with randomly sampled brightness.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -75,8 +75,9 @@ class EoTBrightnessPyTorch(EoTPyTorch):
         """
         import torch  # lgtm [py/repeated-import]
 
-        delta_i = np.random.uniform(low=self.delta_range[0], high=self.delta_range[1])
-        return torch.clamp(x + delta_i, min=self.clip_values[0], max=self.clip_values[1]), y
+        delta = np.random.uniform(low=self.delta_range[0], high=self.delta_range[1], size=x.shape[0])
+        delta = self._broadcast_parameters(x, delta)
+        return torch.clamp(x + delta, min=self.clip_values[0], max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
 
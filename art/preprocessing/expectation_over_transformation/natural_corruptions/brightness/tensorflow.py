@@ -67,7 +67,7 @@ class EoTBrightnessTensorFlow(EoTTensorFlowV2):
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
         """
-        Transformation of an image with randomly sampled brightness.
+        Transformation of images with randomly sampled brightness.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -75,8 +75,9 @@ class EoTBrightnessTensorFlow(EoTTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        delta_i = np.random.uniform(low=self.delta_range[0], high=self.delta_range[1])
-        return tf.clip_by_value(x + delta_i, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
+        delta = np.random.uniform(low=self.delta_range[0], high=self.delta_range[1], size=x.shape[0])
+        delta = self._broadcast_parameters(x, delta)
+        return tf.clip_by_value(x + delta, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
 
@@ -69,7 +69,7 @@ class EoTContrastTensorFlow(EoTTensorFlowV2):
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
         """
-        Transformation of an image with randomly sampled contrast.
+        Transformation of images with randomly sampled contrast.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -77,19 +77,22 @@ class EoTContrastTensorFlow(EoTTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        contrast_factor_i = np.random.uniform(low=self.contrast_factor_range[0], high=self.contrast_factor_range[1])
-        if x.shape[2] == 3:
-            red, green, blue = x[:, :, 0], x[:, :, 1], x[:, :, 2]
+        contrast_factor = np.random.uniform(
+            low=self.contrast_factor_range[0], high=self.contrast_factor_range[1], size=x.shape[0]
+        )
+        if x.shape[3] == 3:
+            red, green, blue = x[:, :, :, 0], x[:, :, :, 1], x[:, :, :, 2]
             x_gray = 0.2989 * red + 0.587 * green + 0.114 * blue
-        elif x.shape[2] == 1:
-            x_gray = x[:, :, 0]
+        elif x.shape[3] == 1:
+            x_gray = x[:, :, :, 0]
         else:
-            raise ValueError("Number of color channels is not 1 or 3 in input `x` of format HWC.")
-        mean = tf.math.reduce_mean(x_gray, axis=None)
+            raise ValueError("Number of color channels is not 1 or 3 in input `x` of format NHWC.")
+        mean = tf.math.reduce_mean(x_gray, axis=(1, 2), keepdims=True)[:, :, :, tf.newaxis]
 
         return (
             tf.clip_by_value(
-                contrast_factor_i * x + (1.0 - contrast_factor_i) * mean,
+                self._broadcast_parameters(x, contrast_factor) * x
+                + self._broadcast_parameters(x, 1.0 - contrast_factor) * mean,
                 clip_value_min=self.clip_values[0],
                 clip_value_max=self.clip_values[1],
             ),
@@ -67,7 +67,7 @@ class EoTGaussianNoisePyTorch(EoTPyTorch):
         self, x: "torch.Tensor", y: Optional["torch.Tensor"], **kwargs
     ) -> Tuple["torch.Tensor", Optional["torch.Tensor"]]:
         """
-        Transformation of an image with randomly sampled Gaussian noise.
+        Transformation of images with randomly sampled Gaussian noise.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -75,9 +75,9 @@ class EoTGaussianNoisePyTorch(EoTPyTorch):
         """
         import torch  # lgtm [py/repeated-import]
 
-        std_i = np.random.uniform(low=self.std_range[0], high=self.std_range[1])
-        delta_i = torch.normal(mean=torch.zeros_like(x), std=torch.ones_like(x) * std_i)
-        return torch.clamp(x + delta_i, min=self.clip_values[0], max=self.clip_values[1]), y
+        std = np.random.uniform(low=self.std_range[0], high=self.std_range[1], size=x.shape[0])
+        delta = torch.normal(mean=torch.zeros_like(x), std=torch.ones_like(x) * self._broadcast_parameters(x, std))
+        return torch.clamp(x + delta, min=self.clip_values[0], max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
 
@@ -67,7 +67,7 @@ class EoTGaussianNoiseTensorFlow(EoTTensorFlowV2):
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
         """
-        Transformation of an image with randomly sampled Gaussian noise.
+        Transformation of images with randomly sampled Gaussian noise.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -75,9 +75,10 @@ class EoTGaussianNoiseTensorFlow(EoTTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        std_i = np.random.uniform(low=self.std_range[0], high=self.std_range[1])
-        delta_i = tf.random.normal(shape=x.shape, mean=0.0, stddev=std_i, seed=None)
-        return tf.clip_by_value(x + delta_i, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
+        std = np.random.uniform(low=self.std_range[0], high=self.std_range[1], size=x.shape[0])
+        delta = tf.random.normal(shape=x.shape, mean=0.0, stddev=1.0, dtype=x.dtype, seed=None)
+        delta = delta * self._broadcast_parameters(x, std)
+        return tf.clip_by_value(x + delta, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
 
@@ -67,7 +67,7 @@ class EoTShotNoisePyTorch(EoTPyTorch):
         self, x: "torch.Tensor", y: Optional["torch.Tensor"], **kwargs
     ) -> Tuple["torch.Tensor", Optional["torch.Tensor"]]:
         """
-        Transformation of an image with randomly sampled shot (Poisson) noise.
+        Transformation of images with randomly sampled shot (Poisson) noise.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -75,9 +75,10 @@ class EoTShotNoisePyTorch(EoTPyTorch):
         """
         import torch  # lgtm [py/repeated-import]
 
-        lam_i = np.random.uniform(low=self.lam_range[0], high=self.lam_range[1])
-        delta_i = torch.poisson(input=torch.ones_like(x) * lam_i) / lam_i * self.clip_values[1]
-        return torch.clamp(x + delta_i, min=self.clip_values[0], max=self.clip_values[1]), y
+        lam = np.random.uniform(low=self.lam_range[0], high=self.lam_range[1], size=x.shape[0])
+        lam = self._broadcast_parameters(x, lam)
+        delta = torch.poisson(input=torch.ones_like(x) * lam) / lam * self.clip_values[1]
+        return torch.clamp(x + delta, min=self.clip_values[0], max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
 
@@ -67,7 +67,7 @@ class EoTShotNoiseTensorFlow(EoTTensorFlowV2):
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
         """
-        Transformation of an image with randomly sampled shot (Poisson) noise.
+        Transformation of images with randomly sampled shot (Poisson) noise.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -75,10 +75,12 @@ class EoTShotNoiseTensorFlow(EoTTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        lam_i = np.random.uniform(low=self.lam_range[0], high=self.lam_range[1])
+        lam = np.random.uniform(low=self.lam_range[0], high=self.lam_range[1], size=x.shape[0])
+        lam = self._broadcast_parameters(x, lam)
         # pylint: disable=E1123,E1120
-        delta_i = tf.random.poisson(shape=x.shape, lam=lam_i, seed=None) / lam_i * self.clip_values[1]
-        return tf.clip_by_value(x + delta_i, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
+        delta = tf.random.poisson(shape=[], lam=tf.ones_like(x) * lam, dtype=x.dtype, seed=None)
+        delta = delta / lam * self.clip_values[1]
+        return tf.clip_by_value(x + delta, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
 
     def _check_params(self) -> None:
 
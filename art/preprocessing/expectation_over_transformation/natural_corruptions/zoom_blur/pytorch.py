@@ -23,6 +23,10 @@ from typing import Tuple, Union, TYPE_CHECKING, Optional
 
 import numpy as np
 
+from art.preprocessing.expectation_over_transformation.natural_corruptions.zoom_blur.utils import (
+    sample_zooms,
+    zoom_indices,
+)
 from art.preprocessing.expectation_over_transformation.pytorch import EoTPyTorch
 
 if TYPE_CHECKING:
@@ -67,35 +71,45 @@ class EoTZoomBlurPyTorch(EoTPyTorch):
         self, x: "torch.Tensor", y: Optional["torch.Tensor"], **kwargs
     ) -> Tuple["torch.Tensor", Optional["torch.Tensor"]]:
         """
-        Transformation of an image with randomly sampled zoom blur.
+        Transformation of images with randomly sampled zoom blur.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
         :return: Transformed samples and labels.
         """
         import torch  # lgtm [py/repeated-import]
-        import torchvision
 
         nb_zooms = 10
-        x_blur = torch.zeros_like(x)
-        max_zoom_i = np.random.uniform(low=self.zoom_range[0], high=self.zoom_range[1])
-        zooms = np.arange(start=1.0, stop=max_zoom_i, step=(max_zoom_i - 1.0) / nb_zooms)
-
-        height = x.shape[0]
-        width = x.shape[1]
-
-        x_chw = x.permute(2, 0, 1)
+        max_zooms = np.random.uniform(low=self.zoom_range[0], high=self.zoom_range[1], size=x.shape[0])
+        zooms, valid = sample_zooms(max_zooms, nb_zooms)
+        valid = torch.from_numpy(valid).to(device=x.device, dtype=x.dtype)
+
+        # source pixels and weights resizing and center cropping every sample along each axis for every zoom
+        lower_h, upper_h, lerp_h = zoom_indices(x.shape[1], zooms)
+        lower_w, upper_w, lerp_w = zoom_indices(x.shape[2], zooms)
+        lower_h, upper_h, lower_w, upper_w = [
+            torch.from_numpy(index).to(device=x.device) for index in [lower_h, upper_h, lower_w, upper_w]
+        ]
+        lerp_h, lerp_w = [torch.from_numpy(lerp).to(device=x.device, dtype=x.dtype) for lerp in [lerp_h, lerp_w]]
 
-        for zoom in zooms:
-            size = [int(a * zoom) for a in x.shape[0:2]]
-            x_resized = torchvision.transforms.functional.resize(
-                img=x_chw, size=size, interpolation=torchvision.transforms.InterpolationMode.BILINEAR
-            ).permute(1, 2, 0)
-
-            trim_top = (x_resized.shape[0] - height) // 2
-            trim_left = (x_resized.shape[0] - width) // 2
-
-            x_blur += x_resized[trim_top : trim_top + height, trim_left : trim_left + width, :]
+        x_blur = torch.zeros_like(x)
+        for i_zoom in range(zooms.shape[1]):
+            index = lower_h[:, i_zoom, :, None, None].expand(x.shape)
+            x_lower = torch.gather(x, 1, index)
+            index = upper_h[:, i_zoom, :, None, None].expand(x.shape)
+            x_upper = torch.gather(x, 1, index)
+            lerp = lerp_h[:, i_zoom, :, None, None]
+            x_resized = x_lower + lerp * (x_upper - x_lower)
+
+            index = lower_w[:, i_zoom, None, :, None].expand(x.shape)
+            x_lower = torch.gather(x_resized, 2, index)
+            index = upper_w[:, i_zoom, None, :, None].expand(x.shape)
+            x_upper = torch.gather(x_resized, 2, index)
+            lerp = lerp_w[:, i_zoom, None, :, None]
+            x_resized = x_lower + lerp * (x_upper - x_lower)
+
+            # padding zooms of samples with less zoom steps do not contribute
+            x_blur += valid[:, i_zoom, None, None, None] * x_resized
 
         x_out = (x + x_blur) / (nb_zooms + 1)
         return torch.clamp(x_out, min=self.clip_values[0], max=self.clip_values[1]), y
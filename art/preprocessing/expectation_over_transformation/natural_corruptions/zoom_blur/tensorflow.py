@@ -23,6 +23,10 @@ from typing import Tuple, Union, TYPE_CHECKING, Optional
 
 import numpy as np
 
+from art.preprocessing.expectation_over_transformation.natural_corruptions.zoom_blur.utils import (
+    sample_zooms,
+    zoom_indices,
+)
 from art.preprocessing.expectation_over_transformation.tensorflow import EoTTensorFlowV2
 
 if TYPE_CHECKING:
@@ -67,7 +71,7 @@ class EoTZoomBlurTensorFlow(EoTTensorFlowV2):
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
         """
-        Transformation of an image with randomly sampled zoom blur.
+        Transformation of images with randomly sampled zoom blur.
 
         :param x: Input samples.
         :param y: Label of the samples `x`.
@@ -76,28 +80,30 @@ class EoTZoomBlurTensorFlow(EoTTensorFlowV2):
         import tensorflow as tf  # lgtm [py/repeated-import]
 
         nb_zooms = 10
-        x_blur = tf.zeros_like(x)
-        max_zoom_i = np.random.uniform(low=self.zoom_range[0], high=self.zoom_range[1])
-        zooms = np.arange(start=1.0, stop=max_zoom_i, step=(max_zoom_i - 1.0) / nb_zooms)
-
-        height = x.shape[0]
-        width = x.shape[1]
-
-        for zoom in zooms:
-            size = [int(a * zoom) for a in x.shape[0:2]]
-            x_resized = tf.image.resize(
-                images=x,
-                size=size,
-                method=tf.image.ResizeMethod.BILINEAR,
-                preserve_aspect_ratio=True,
-                antialias=False,
-                name=None,
-            )
+        max_zooms = np.random.uniform(low=self.zoom_range[0], high=self.zoom_range[1], size=x.shape[0])
+        zooms, valid = sample_zooms(max_zooms, nb_zooms)
+        valid = tf.cast(valid, dtype=x.dtype)
 
-            trim_top = (x_resized.shape[0] - height) // 2
-            trim_left = (x_resized.shape[0] - width) // 2
+        # source pixels and weights resizing and center cropping every sample along each axis for every zoom
+        lower_h, upper_h, lerp_h = zoom_indices(x.shape[1], zooms)
+        lower_w, upper_w, lerp_w = zoom_indices(x.shape[2], zooms)
+        lerp_h = tf.constant(lerp_h, dtype=x.dtype)
+        lerp_w = tf.constant(lerp_w, dtype=x.dtype)
 
-            x_blur += x_resized[trim_top : trim_top + height, trim_left : trim_left + width, :]
+        x_blur = tf.zeros_like(x)
+        for i_zoom in range(zooms.shape[1]):
+            x_lower = tf.gather(x, lower_h[:, i_zoom], axis=1, batch_dims=1)
+            x_upper = tf.gather(x, upper_h[:, i_zoom], axis=1, batch_dims=1)
+            lerp = lerp_h[:, i_zoom, :, tf.newaxis, tf.newaxis]
+            x_resized = x_lower + lerp * (x_upper - x_lower)
+
+            x_lower = tf.gather(x_resized, lower_w[:, i_zoom], axis=2, batch_dims=1)
+            x_upper = tf.gather(x_resized, upper_w[:, i_zoom], axis=2, batch_dims=1)
+            lerp = lerp_w[:, i_zoom, tf.newaxis, :, tf.newaxis]
+            x_resized = x_lower + lerp * (x_upper - x_lower)
+
+            # padding zooms of samples with less zoom steps do not contribute
+            x_blur += valid[:, i_zoom, tf.newaxis, tf.newaxis, tf.newaxis] * x_resized
 
         x_out = (x + x_blur) / (nb_zooms + 1)
         return tf.clip_by_value(x_out, clip_value_min=self.clip_values[0], clip_value_max=self.clip_values[1]), y
@@ -0,0 +1,65 @@
+# MIT License
+#
+# Copyright (C) The Adversarial Robustness Toolbox (ART) Authors 2021
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""
+This module implements utility functions for EoT of zoom blur.
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+def sample_zooms(max_zooms: np.ndarray, nb_zooms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample the zoom factors of every sample, starting at 1 and increasing in `nb_zooms` steps towards its maximum zoom.
+
+    :param max_zooms: Array of shape `(nb_samples,)` with the maximum zoom of every sample.
+    :param nb_zooms: Number of zoom steps.
+    :return: Tuple of arrays `(zooms, valid)` of shape `(nb_samples, nb_steps)`, where `valid` is False for padding
+             entries of samples with less zoom steps than others.
+    """
+    zooms_lst = [np.arange(start=1.0, stop=max_zoom, step=(max_zoom - 1.0) / nb_zooms) for max_zoom in max_zooms]
+    nb_steps = max(len(zooms_i) for zooms_i in zooms_lst)
+
+    zooms = np.ones((len(max_zooms), nb_steps))
+    valid = np.zeros((len(max_zooms), nb_steps), dtype=bool)
+    for i, zooms_i in enumerate(zooms_lst):
+        zooms[i, : len(zooms_i)] = zooms_i
+        valid[i, : len(zooms_i)] = True
+    return zooms, valid
+
+
+def zoom_indices(length: int, zooms: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the source pixels and weights that resize an image axis of `length` pixels by bilinear interpolation (with
+    half-pixel centers) to `int(length * zoom)` pixels and crop the centered `length` pixels of the result.
+
+    :param length: Number of pixels along the image axis.
+    :param zooms: Array of zoom factors greater than or equal to 1.
+    :return: Tuple of arrays `(lower, upper, lerp)` of shape `zooms.shape + (length,)`, where output pixel `i` is
+             `(1 - lerp[..., i]) * input[lower[..., i]] + lerp[..., i] * input[upper[..., i]]`.
+    """
+    sizes = (length * zooms).astype(int)
+    scales = np.float32(length) / sizes.astype(np.float32)
+    positions = ((sizes - length) // 2)[..., np.newaxis] + np.arange(length)
+
+    sources = (scales[..., np.newaxis].astype(np.float64) * (positions + 0.5) - 0.5).astype(np.float32)
+    sources = np.maximum(sources, 0.0)
+    lower = np.minimum(np.floor(sources).astype(int), length - 1)
+    upper = np.minimum(lower + 1, length - 1)
+    lerp = sources - lower.astype(np.float32)
+    return lower, upper, lerp
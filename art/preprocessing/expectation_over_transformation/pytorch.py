@@ -20,7 +20,9 @@ This module defines a base class for EoT in PyTorch.
 """
 from abc import abstractmethod
 import logging
-from typing import Optional, Tuple, TYPE_CHECKING, List
+from typing import Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
 
 from art.preprocessing.preprocessing import PreprocessorPyTorch
 
@@ -61,9 +63,10 @@ class EoTPyTorch(PreprocessorPyTorch):
         self, x: "torch.Tensor", y: Optional["torch.Tensor"], **kwargs
     ) -> Tuple["torch.Tensor", Optional["torch.Tensor"]]:
         """
-        Internal method implementing the transformation per input sample.
+        Internal method implementing the transformation of a batch of input samples. Every sample is transformed with
+        its own randomly sampled parameters.
 
-        :param x: Input samples.
+        :param x: Input samples, containing `nb_samples` consecutive copies of every original input sample.
         :param y: Label of the samples `x`.
         :return: Transformed samples and labels.
         """
@@ -81,30 +84,25 @@ class EoTPyTorch(PreprocessorPyTorch):
         """
         import torch  # lgtm [py/repeated-import]
 
-        x_preprocess_list = list()
-        y_preprocess_list: List["torch.Tensor"] = list()
-
-        for i_image in range(x.shape[0]):
-            for _ in range(self.nb_samples):
-                x_i = x[i_image]
-                y_i: Optional["torch.Tensor"]
-                if y is not None:
-                    y_i = y[i_image]
-                else:
-                    y_i = None
-                x_preprocess, y_preprocess_i = self._transform(x_i, y_i)
-                x_preprocess_list.append(x_preprocess)
-
-                if y is not None and y_preprocess_i is not None:
-                    y_preprocess_list.append(y_preprocess_i)
-
-        x_preprocess = torch.stack(x_preprocess_list, dim=0)
-        if y is None:
-            y_preprocess = y
-        else:
-            y_preprocess = torch.stack(y_preprocess_list, dim=0)
-
-        return x_preprocess, y_preprocess
+        x_preprocess = torch.repeat_interleave(x, repeats=self.nb_samples, dim=0)
+        y_preprocess: Optional["torch.Tensor"] = None
+        if y is not None:
+            y_preprocess = torch.repeat_interleave(y, repeats=self.nb_samples, dim=0)
+
+        return self._transform(x_preprocess, y_preprocess)
+
+    @staticmethod
+    def _broadcast_parameters(x: "torch.Tensor", parameters: np.ndarray) -> "torch.Tensor":
+        """
+        Convert one transformation parameter per sample into a tensor that broadcasts against the samples `x`.
+
+        :param x: Input samples.
+        :param parameters: Array of shape `(nb_samples,)` with the parameter of every sample of `x`.
+        :return: Parameters of shape `(nb_samples, 1, ..., 1)` with the dtype and device of `x`.
+        """
+        import torch  # lgtm [py/repeated-import]
+
+        return torch.tensor(parameters, dtype=x.dtype, device=x.device).reshape((-1,) + (1,) * (x.dim() - 1))
 
     def _check_params(self) -> None:
 
@@ -22,6 +22,8 @@ from abc import abstractmethod
 import logging
 from typing import Optional, Tuple, TYPE_CHECKING
 
+import numpy as np
+
 from art.preprocessing.preprocessing import PreprocessorTensorFlowV2
 
 if TYPE_CHECKING:
@@ -61,9 +63,10 @@ class EoTTensorFlowV2(PreprocessorTensorFlowV2):
         self, x: "tf.Tensor", y: Optional["tf.Tensor"], **kwargs
     ) -> Tuple["tf.Tensor", Optional["tf.Tensor"]]:
         """
-        Internal method implementing the transformation per input sample.
+        Internal method implementing the transformation of a batch of input samples. Every sample is transformed with
+        its own randomly sampled parameters.
 
-        :param x: Input samples.
+        :param x: Input samples, containing `nb_samples` consecutive copies of every original input sample.
         :param y: Label of the samples `x`.
         :return: Transformed samples and labels.
         """
@@ -79,29 +82,25 @@ class EoTTensorFlowV2(PreprocessorTensorFlowV2):
         """
         import tensorflow as tf  # lgtm [py/repeated-import]
 
-        x_preprocess_list = list()
-        y_preprocess_list = list()
-
-        for i_image in range(x.shape[0]):
-            for _ in range(self.nb_samples):
-                x_i = x[i_image]
-                if y is not None:
-                    y_i = y[i_image]
-                else:
-                    y_i = None
-                x_preprocess, y_preprocess_i = self._transform(x_i, y_i)
-                x_preprocess_list.append(x_preprocess)
-
-                if y is not None and y_preprocess_i is not None:
-                    y_preprocess_list.append(y_preprocess_i)
-
-        x_preprocess = tf.stack(x_preprocess_list, axis=0)
-        if y is None:
-            y_preprocess = y
-        else:
-            y_preprocess = tf.stack(y_preprocess_list, axis=0)
-
-        return x_preprocess, y_preprocess
+        x_preprocess = tf.repeat(x, repeats=self.nb_samples, axis=0)
+        y_preprocess: Optional["tf.Tensor"] = None
+        if y is not None:
+            y_preprocess = tf.repeat(y, repeats=self.nb_samples, axis=0)
+
+        return self._transform(x_preprocess, y_preprocess)
+
+    @staticmethod
+    def _broadcast_parameters(x: "tf.Tensor", parameters: np.ndarray) -> "tf.Tensor":
+        """
+        Convert one transformation parameter per sample into a tensor that broadcasts against the samples `x`.
+
+        :param x: Input samples.
+        :param parameters: Array of shape `(nb_samples,)` with the parameter of every sample of `x`.
+        :return: Parameters of shape `(nb_samples, 1, ..., 1)` with the dtype of `x`.
+        """
+        import tensorflow as tf  # lgtm [py/repeated-import]
+
+        return tf.reshape(tf.cast(parameters, x.dtype), [-1] + [1] * (len(x.shape) - 1))
 
     def _check_params(self) -> None:
 
@@ -23,7 +23,7 @@ This module implements the Expectation Over Transformation applied to classifier
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
-from typing import List, Optional, Union, Tuple, TYPE_CHECKING
+from typing import Callable, Iterator, List, Optional, Union, Tuple, TYPE_CHECKING
 
 import numpy as np
 
@@ -44,7 +44,13 @@ class ExpectationOverTransformations(ClassifierWrapper, ClassifierClassLossGradi
     | Paper link: https://arxiv.org/abs/1707.07397
     """
 
-    def __init__(self, classifier: "CLASSIFIER_CLASS_LOSS_GRADIENTS_TYPE", sample_size: int, transformation) -> None:
+    def __init__(
+        self,
+        classifier: "CLASSIFIER_CLASS_LOSS_GRADIENTS_TYPE",
+        sample_size: int,
+        transformation,
+        max_batch_size: Optional[int] = None,
+    ) -> None:
         """
         Create an expectation over transformations wrapper.
 
@@ -52,12 +58,19 @@ class ExpectationOverTransformations(ClassifierWrapper, ClassifierClassLossGradi
         :param sample_size: Number of transformations to sample.
         :param transformation: An iterator over transformations.
         :type transformation: :class:`.Classifier`
+        :param max_batch_size: If provided, the transformed copies of the inputs are concatenated and passed to the
+                               classifier in chunks of at most this many samples (but at least one copy of the inputs)
+                               instead of one call per sampled transformation.
         """
         super().__init__(classifier)
         self.sample_size = sample_size
         self.transformation = transformation
+        self.max_batch_size = max_batch_size
         self._predict = self.classifier.predict
 
+        if max_batch_size is not None and (not isinstance(max_batch_size, int) or max_batch_size < 1):
+            raise ValueError("The maximum batch size `max_batch_size` has to be a positive integer.")
+
     @property
     def input_shape(self) -> Tuple[int, ...]:
         """
@@ -76,10 +89,9 @@ class ExpectationOverTransformations(ClassifierWrapper, ClassifierClassLossGradi
         :return: Array of predictions of shape `(nb_inputs, nb_classes)`.
         """
         logger.info("Applying expectation over transformations.")
-        prediction = self._predict(next(self.transformation())(x), **{"batch_size": batch_size})
-        for _ in range(self.sample_size - 1):
-            prediction += self._predict(next(self.transformation())(x), **{"batch_size": batch_size})
-        return prediction / self.sample_size
+        if self.max_batch_size is not None:
+            batch_size = self.max_batch_size
+        return self._expectation(x, lambda x_chunk, _: self._predict(x_chunk, **{"batch_size": batch_size}))
 
     def fit(  # pylint: disable=W0221
         self, x: np.ndarray, y: np.ndarray, batch_size: int = 128, nb_epochs: int = 20, **kwargs
@@ -114,14 +126,12 @@ class ExpectationOverTransformations(ClassifierWrapper, ClassifierClassLossGradi
         :return: Array of gradients of the same shape as `x`.
         """
         logger.info("Applying expectation over transformations.")
-        loss_gradient = self.classifier.loss_gradient(
-            x=next(self.transformation())(x), y=y, training_mode=training_mode, **kwargs
+        return self._expectation(
+            x,
+            lambda x_chunk, nb_copies: self.classifier.loss_gradient(
+                x=x_chunk, y=np.concatenate([y] * nb_copies), training_mode=training_mode, **kwargs
+            ),
         )
-        for _ in range(self.sample_size - 1):
-            loss_gradient += self.classifier.loss_gradient(
-                x=next(self.transformation())(x), y=y, training_mode=training_mode, **kwargs
-            )
-        return loss_gradient / self.sample_size
 
     def class_gradient(  # pylint: disable=W0221
         self, x: np.ndarray, label: Union[int, List[int], None] = None, training_mode: bool = False, **kwargs
@@ -140,16 +150,49 @@ class ExpectationOverTransformations(ClassifierWrapper, ClassifierClassLossGradi
                  `(batch_size, 1, input_shape)` when `label` parameter is specified.
         """
         logger.info("Apply Expectation over Transformations.")
-        class_gradient = self.classifier.class_gradient(
-            x=next(self.transformation())(x), label=label, training_mode=training_mode, *kwargs
-        )
 
-        for _ in range(self.sample_size - 1):
-            class_gradient += self.classifier.class_gradient(
-                x=next(self.transformation())(x), label=label, training_mode=training_mode, *kwargs
-            )
+        def class_gradient_chunk(x_chunk: np.ndarray, nb_copies: int) -> np.ndarray:
+            label_chunk = label
+            if label is not None and not isinstance(label, (int, np.integer)):
+                label_chunk = np.concatenate([np.array(label)] * nb_copies)
+            return self.classifier.class_gradient(x=x_chunk, label=label_chunk, training_mode=training_mode, **kwargs)
+
+        return self._expectation(x, class_gradient_chunk)
+
+    def _transformed_chunks(self, x: np.ndarray) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Sample `sample_size` transformations of `x` and group the transformed copies into chunks of at most
+        `max_batch_size` samples, or of one copy each if `max_batch_size` is not provided.
+
+        :param x: Input samples.
+        :return: Iterator over tuples `(x_chunk, nb_copies)`, where `x_chunk` concatenates `nb_copies` transformed
+                 copies of `x`.
+        """
+        nb_copies_per_chunk = 1
+        if self.max_batch_size is not None:
+            nb_copies_per_chunk = max(1, self.max_batch_size // max(len(x), 1))
+
+        for i_copy in range(0, self.sample_size, nb_copies_per_chunk):
+            nb_copies = min(nb_copies_per_chunk, self.sample_size - i_copy)
+            x_chunk = np.concatenate([next(self.transformation())(x) for _ in range(nb_copies)])
+            yield x_chunk, nb_copies
 
-        return class_gradient / self.sample_size
+    def _expectation(self, x: np.ndarray, evaluate: Callable[[np.ndarray, int], np.ndarray]) -> np.ndarray:
+        """
+        Compute the mean of a classifier output over `sample_size` transformations of `x`, accumulating the results of
+        the chunks of transformed copies one at a time.
+
+        :param x: Input samples.
+        :param evaluate: Function computing the classifier output for a chunk of transformed copies of `x` and the
+                         number of copies in the chunk.
+        :return: Mean of the outputs over the transformations, with the first dimension matching `x`.
+        """
+        total = None
+        for x_chunk, nb_copies in self._transformed_chunks(x):
+            result = evaluate(x_chunk, nb_copies)
+            result = np.sum(np.reshape(result, (nb_copies, len(x)) + result.shape[1:]), axis=0)
+            total = result if total is None else total + result
+        return total / self.sample_size
 
     @property
     def layer_names(self) -> List[str]:
@@ -40,10 +40,11 @@ def fix_get_mnist_subset(get_mnist_dataset):
 
 @pytest.mark.framework_agnostic
 @pytest.mark.parametrize("clipped_classifier, targeted", [(True, True), (True, False), (False, True), (False, False)])
-def test_tabular(art_warning, tabular_dl_estimator, framework, get_iris_dataset, clipped_classifier, targeted):
+@pytest.mark.parametrize("batched", [False, True])
+def test_tabular(art_warning, tabular_dl_estimator, framework, get_iris_dataset, clipped_classifier, targeted, batched):
     try:
         classifier = tabular_dl_estimator(clipped=clipped_classifier)
-        attack = BoundaryAttack(classifier, targeted=targeted, max_iter=10, verbose=False)
+        attack = BoundaryAttack(classifier, targeted=targeted, max_iter=10, batched=batched, verbose=False)
         if targeted:
             backend_targeted_tabular(attack, get_iris_dataset)
         else:
@@ -54,10 +55,11 @@ def test_tabular(art_warning, tabular_dl_estimator, framework, get_iris_dataset,
 
 @pytest.mark.framework_agnostic
 @pytest.mark.parametrize("targeted", [True, False])
-def test_images(art_warning, fix_get_mnist_subset, image_dl_estimator_for_attack, framework, targeted):
+@pytest.mark.parametrize("batched", [False, True])
+def test_images(art_warning, fix_get_mnist_subset, image_dl_estimator_for_attack, framework, targeted, batched):
     try:
         classifier = image_dl_estimator_for_attack(BoundaryAttack)
-        attack = BoundaryAttack(estimator=classifier, targeted=targeted, max_iter=20, verbose=False)
+        attack = BoundaryAttack(estimator=classifier, targeted=targeted, max_iter=20, batched=batched, verbose=False)
         if targeted:
             backend_targeted_images(attack, fix_get_mnist_subset)
         else:
@@ -781,6 +781,106 @@ class TestHopSkipJump(TestBase):
             # Check that x_test has not been modified by attack and classifier
             self.assertAlmostEqual(float(np.max(np.abs(x_test_original - self.x_test_iris))), 0.0, delta=0.00001)
 
+    def test_9_scikitlearn_batched(self):
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.tree import DecisionTreeClassifier
+
+        from art.estimators.classification.scikitlearn import SklearnClassifier
+
+        x_test_original = self.x_test_iris.copy()
+
+        for model in [DecisionTreeClassifier(), LogisticRegression(solver="lbfgs", multi_class="auto")]:
+            classifier = SklearnClassifier(model=model, clip_values=(0, 1))
+            classifier.fit(x=self.x_test_iris, y=self.y_test_iris)
+
+            for norm in [2, np.inf]:
+                # Untargeted attack
+                attack = HopSkipJump(
+                    classifier,
+                    targeted=False,
+                    max_iter=20,
+                    max_eval=100,
+                    init_eval=10,
+                    norm=norm,
+                    batched=True,
+                    verbose=False,
+                )
+                x_test_adv = attack.generate(self.x_test_iris)
+                self.assertFalse((self.x_test_iris == x_test_adv).all())
+                self.assertTrue((x_test_adv <= 1).all())
+                self.assertTrue((x_test_adv >= 0).all())
+
+                preds_adv = np.argmax(classifier.predict(x_test_adv), axis=1)
+                self.assertFalse((np.argmax(self.y_test_iris, axis=1) == preds_adv).all())
+
+                # Targeted attack with mask
+                mask = np.random.binomial(n=1, p=0.5, size=np.prod(self.x_test_iris.shape))
+                mask = mask.reshape(self.x_test_iris.shape)
+                targets = random_targets(self.y_test_iris, classifier.nb_classes)
+
+                attack = HopSkipJump(
+                    classifier,
+                    targeted=True,
+                    max_iter=20,
+                    max_eval=100,
+                    init_eval=10,
+                    norm=norm,
+                    batched=True,
+                    verbose=False,
+                )
+                x_test_adv = attack.generate(self.x_test_iris, y=targets, mask=mask)
+                mask_diff = (1 - mask) * (x_test_adv - self.x_test_iris)
+                self.assertAlmostEqual(float(np.max(np.abs(mask_diff))), 0.0, delta=0.00001)
+
+                preds_adv = np.argmax(classifier.predict(x_test_adv), axis=1)
+                self.assertTrue((np.argmax(targets, axis=1) == preds_adv).any())
+
+            # Check that x_test has not been modified by attack and classifier
+            self.assertAlmostEqual(float(np.max(np.abs(x_test_original - self.x_test_iris))), 0.0, delta=0.00001)
+
+    def test_9_scikitlearn_batched_max_probes(self):
+        from sklearn.linear_model import LogisticRegression
+
+        from art.estimators.classification.scikitlearn import SklearnClassifier
+
+        classifier = SklearnClassifier(model=LogisticRegression(solver="lbfgs", multi_class="auto"), clip_values=(0, 1))
+        classifier.fit(x=self.x_test_iris, y=self.y_test_iris)
+
+        # Record the number of samples of every call to predict
+        nb_rows = []
+        predict = classifier.predict
+
+        def predict_recorded(x, *args, **kwargs):
+            nb_rows.append(x.shape[0])
+            return predict(x, *args, **kwargs)
+
+        classifier.predict = predict_recorded
+
+        max_probes = 200
+        self.assertGreater(len(self.x_test_iris) * 10, max_probes)
+
+        attack = HopSkipJump(
+            classifier,
+            targeted=False,
+            max_iter=10,
+            max_eval=100,
+            init_eval=10,
+            batched=True,
+            max_probes=max_probes,
+            verbose=False,
+        )
+        x_test_adv = attack.generate(self.x_test_iris)
+
+        self.assertLessEqual(max(nb_rows), max(max_probes, len(self.x_test_iris)))
+        self.assertTrue((x_test_adv <= 1).all())
+        self.assertTrue((x_test_adv >= 0).all())
+
+        preds_adv = np.argmax(predict(x_test_adv), axis=1)
+        self.assertFalse((np.argmax(self.y_test_iris, axis=1) == preds_adv).all())
+
+        with self.assertRaises(ValueError):
+            _ = HopSkipJump(classifier, batched=True, max_probes=0)
+
     def test_1_classifier_type_check_fail(self):
         backend_test_classifier_type_check_fail(HopSkipJump, [BaseEstimator, ClassifierMixin])
 
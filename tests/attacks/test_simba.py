@@ -142,6 +142,19 @@ class TestSimBA(TestBase):
         accuracy = np.sum(np.argmax(y_pred, axis=1) == np.argmax(self.y_test_mnist, axis=1)) / self.n_test
         logger.info("Accuracy on adversarial examples: %.2f%%", (accuracy * 100))
 
+        # Attack all images at once
+        df = SimBA(classifier, attack="dct", targeted=targeted, batch_size=2 * self.n_test)
+        if targeted:
+            x_test_adv_batch = df.generate(x_test_original, y=np.tile(y_target, (self.n_test, 1)))
+        else:
+            x_test_adv_batch = df.generate(x_test_original)
+
+        self.assertEqual(x_test_adv_batch.shape, x_test_original.shape)
+        self.assertFalse((x_test == x_test_adv_batch).all())
+
+        y_pred = get_labels_np_array(classifier.predict(x_test_adv_batch))
+        self.assertFalse((y_test == y_pred).all())
+
         # Check that x_test has not been modified by attack and classifier
         self.assertAlmostEqual(float(np.max(np.abs(x_test_original - x_test))), 0.0, delta=0.00001)
 
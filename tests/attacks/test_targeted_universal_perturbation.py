@@ -124,6 +124,18 @@ class TestTargetedUniversalPerturbation(TestBase):
         # Check that x_test has not been modified by attack and classifier
         self.assertAlmostEqual(float(np.max(np.abs(x_test_original - self.x_test_mnist))), 0.0, delta=0.00001)
 
+        # Attack mini-batches of examples
+        up = TargetedUniversalPerturbation(
+            krc,
+            max_iter=1,
+            attacker="fgsm",
+            attacker_params={"eps": 0.3, "targeted": True, "verbose": False},
+            attack_batch_size=10,
+        )
+        x_train_adv = up.generate(self.x_train_mnist, y=y_target)
+        self.assertTrue((up.fooling_rate >= 0.2) or not up.converged)
+        self.assertFalse((self.x_train_mnist == x_train_adv).all())
+
     def test_3_pytorch_mnist(self):
         """
         Third test with the PyTorchClassifier.
@@ -126,8 +126,9 @@ class TestThresholdAttack(TestBase):
         else:
             targets = y_test
 
-        for es in [1]:  # Option 0 is not easy to reproduce reliably, we should consider it at a later time
-            df = ThresholdAttack(classifier, th=128, es=es, targeted=targeted, verbose=False)
+        # Option 0 is not easy to reproduce reliably, we should consider it at a later time
+        for es, batch_size in [(1, 1), (1, self.n_test)]:
+            df = ThresholdAttack(classifier, th=128, es=es, targeted=targeted, verbose=False, batch_size=batch_size)
             x_test_adv = df.generate(x_test_original, targets, max_iter=10)
 
             np.testing.assert_raises(AssertionError, np.testing.assert_array_equal, x_test, x_test_adv)
@@ -163,6 +163,13 @@ class TestUniversalPerturbation(TestBase):
         acc = np.sum(preds_adv == np.argmax(self.y_test_iris, axis=1)) / self.y_test_iris.shape[0]
         logger.info("Accuracy on Iris with universal adversarial examples: %.2f%%", (acc * 100))
 
+        # Test attacking mini-batches of examples
+        attack.set_params(attack_batch_size=10)
+        x_test_iris_adv = attack.generate(self.x_test_iris)
+        self.assertFalse((self.x_test_iris == x_test_iris_adv).all())
+        self.assertTrue((x_test_iris_adv <= 1).all())
+        self.assertTrue((x_test_iris_adv >= 0).all())
+
     def test_7_keras_iris_unbounded(self):
         classifier = get_tabular_classifier_kr()
 
@@ -28,6 +28,7 @@ import numpy as np
 
 from art.attacks.evasion.fast_gradient import FastGradientMethod
 from art.defences.detector.evasion.subsetscanning import SubsetScanningDetector
+from art.defences.detector.evasion.subsetscanning.scanner import Scanner
 from art.utils import load_dataset
 
 from tests.utils import master_seed, get_image_classifier_kr
@@ -81,6 +82,25 @@ class TestSubsetScanningDetector(unittest.TestCase):
         _, _, dpwr = detector.scan(clean, x_train_detector, 85, 15)
         self.assertGreater(dpwr, 0.5)
 
+        _, _, dpwr = detector.scan(clean, anom, batch_size=32)
+        self.assertGreater(dpwr, 0.5)
+
+        pvalue_ranges = detector.calculate_pvalue_ranges(clean)
+        self.assertEqual(pvalue_ranges.dtype, np.float32)
+        self.assertEqual(pvalue_ranges.shape[0], NB_TEST)
+        pvalue_ranges_batches = list(detector.iter_pvalue_ranges(clean, batch_size=32))
+        self.assertEqual(len(pvalue_ranges_batches), 4)
+        np.testing.assert_array_equal(np.concatenate(pvalue_ranges_batches), pvalue_ranges)
+
+        _, _, dpwr = detector.scan(clean, x_train_detector, 85, 15, run=4, nb_jobs=2)
+        self.assertGreater(dpwr, 0.5)
+
+        best_scores, optimal_alphas = Scanner.fgss_individ_for_nets_batch(pvalue_ranges)
+        for i, pvalue_range in enumerate(pvalue_ranges):
+            best_score, _, _, optimal_alpha = Scanner.fgss_individ_for_nets(pvalue_range)
+            self.assertEqual(best_scores[i], best_score)
+            self.assertEqual(optimal_alphas[i], optimal_alpha)
+
 
 if __name__ == "__main__":
     unittest.main()
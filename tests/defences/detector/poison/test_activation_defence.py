@@ -178,6 +178,28 @@ class TestActivationDefence(unittest.TestCase):
         self.assertNotEqual(sum_dist, sum_size)
         self.assertNotEqual(sum_dist_gen, sum_size_gen)
 
+    def test_detect_poison_incremental_parallel(self):
+        # Get MNIST
+        (x_train, _), (_, _), (_, _) = self.mnist
+
+        kwargs = {
+            "nb_clusters": 2,
+            "nb_dims": 10,
+            "reduce": "IncrementalPCA",
+            "clustering_method": "MiniBatchKMeans",
+            "nb_jobs": 2,
+        }
+        _, is_clean_lst = self.defence.detect_poison(**kwargs)
+        _, is_clean_lst_gen = self.defence_gen.detect_poison(**kwargs)
+        self.assertEqual(len(x_train), len(is_clean_lst))
+        self.assertEqual(len(x_train), len(is_clean_lst_gen))
+
+        for defence in [self.defence, self.defence_gen]:
+            self.assertEqual(len(np.unique(defence.clusters_by_class[0])), 2)
+            for red_activations in defence.red_activations_by_class:
+                self.assertEqual(red_activations.shape[1], 10)
+            defence.set_params(nb_jobs=1, reduce="PCA", clustering_method="KMeans")
+
     def test_evaluate_defense(self):
         # Get MNIST
         (x_train, _), (_, _), (_, _) = self.mnist
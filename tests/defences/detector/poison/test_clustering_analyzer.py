@@ -212,6 +212,49 @@ class TestActivationDefence(unittest.TestCase):
         self.assertEqual(assigned_clean_by_class[2][4], poison)
         self.assertEqual(sum(assigned_clean_by_class[3]), len(assigned_clean_by_class[3]))
 
+    def test_distance_analyzer(self):
+        clusters_by_class = [np.array([0, 0, 0, 1, 1]), np.array([0, 0, 0, 0, 1]), np.array([1, 1, 1, 0, 0])]
+        # cluster 1 of class 0 lies on class 1
+        activations_by_class = [
+            np.array([[0.0, 0.0], [0.1, 0.0], [0.0, 0.1], [10.0, 0.0], [10.1, 0.0]]),
+            np.array([[10.0, 0.0], [10.1, 0.1], [9.9, 0.0], [10.0, 0.1], [10.0, 0.2]]),
+            np.array([[0.0, 20.0], [0.1, 20.0], [0.0, 20.1], [0.1, 20.1], [0.2, 20.0]]),
+        ]
+        analyzer = ClusteringAnalyzer()
+        assigned_clean_by_class, poison_clusters, report = analyzer.analyze_by_distance(
+            clusters_by_class, activations_by_class
+        )
+
+        self.assertEqual(poison_clusters, [[0, 1], [0, 0], [0, 0]])
+        np.testing.assert_array_equal(assigned_clean_by_class[0], [1, 1, 1, 0, 0])
+        self.assertEqual(sum(assigned_clean_by_class[1]), 5)
+        self.assertEqual(sum(assigned_clean_by_class[2]), 5)
+        self.assertEqual(report["Class_0"]["cluster_1"]["suspicious"], "True")
+        self.assertEqual(report["Class_0"]["cluster_0"]["suspicious"], "False")
+        self.assertLess(
+            float(report["Class_0"]["cluster_1"]["distance_to_class_1"]),
+            float(report["Class_0"]["cluster_1"]["cluster1_distance_to_its_class"]),
+        )
+
+        _, poison_clusters_no_report, report_no_report = analyzer.analyze_by_distance(
+            clusters_by_class, activations_by_class, build_report=False
+        )
+        self.assertEqual(poison_clusters_no_report, poison_clusters)
+        self.assertNotIn("Class_0", report_no_report)
+
+    def test_size_analyzer_no_report(self):
+        clusters_by_class = [[0, 1, 1, 1, 1], [1, 0, 0, 0, 0], [0, 0, 0, 0, 1]]
+        analyzer = ClusteringAnalyzer()
+        assigned_clean_by_class, poison_clusters, report = analyzer.analyze_by_size(clusters_by_class)
+        assigned_clean_no_report, poison_clusters_no_report, report_no_report = analyzer.analyze_by_size(
+            clusters_by_class, build_report=False
+        )
+
+        self.assertEqual(poison_clusters_no_report, poison_clusters)
+        np.testing.assert_array_equal(assigned_clean_no_report, assigned_clean_by_class)
+        self.assertEqual(report_no_report["suspicious_clusters"], report["suspicious_clusters"])
+        self.assertNotIn("Class_0", report_no_report)
+
     @unittest.expectedFailure
     def test_relative_size_analyzer_three(self):
         nb_clusters = 3
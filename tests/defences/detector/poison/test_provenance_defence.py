@@ -185,6 +185,14 @@ class TestProvenanceDefence(unittest.TestCase):
         self.assertGreaterEqual(pc_tn_no_trust, 0.7)
         self.assertGreaterEqual(pc_tp_no_trust, 0.7)
 
+    def test_detect_poison_parallel(self):
+        report_trust, clean_trust = self.defence_trust.detect_poison()
+        report_parallel, clean_parallel = self.defence_trust.detect_poison(nb_jobs=2)
+        self.defence_trust.set_params(nb_jobs=1)
+        self.assertEqual(report_trust.keys(), report_parallel.keys())
+        np.testing.assert_array_equal(clean_trust, clean_parallel)
+        self.assertRaises(ValueError, self.defence_no_trust.set_params, nb_jobs=0)
+
     def test_evaluate_defense(self):
         real_clean = np.array([1 if i < NB_TRAIN else 0 for i in range(NB_TRAIN + NB_POISON)])
         self.defence_no_trust.detect_poison()
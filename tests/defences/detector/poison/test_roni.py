@@ -21,6 +21,7 @@ import logging
 import unittest
 
 import numpy as np
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.svm import SVC
 
 from art.attacks.poisoning.poisoning_attack_svm import PoisoningAttackSVM
@@ -36,6 +37,11 @@ NB_TRAIN, NB_POISON, NB_VALID, NB_TRUSTED = 40, 5, 40, 15
 kernel = "linear"
 
 
+def accuracy(y_true, y_pred):
+    # Module level so that it can be sent to the worker processes
+    return np.mean(np.argmax(y_true, axis=1) == np.argmax(y_pred, axis=1))
+
+
 class TestRONI(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -162,6 +168,43 @@ class TestRONI(unittest.TestCase):
         self.assertGreaterEqual(pc_tn_no_cal, 0)
         self.assertGreaterEqual(pc_tp_no_cal, 0.7)
 
+    def test_detect_poison_incremental_parallel(self):
+        (all_data, all_labels), (_, _), (trusted_data, trusted_labels), (_, _), (min_, max_) = self.mnist
+
+        for model, update_mode in [
+            (SGDClassifier(random_state=1234), "partial_fit"),
+            (LogisticRegression(solver="lbfgs", random_state=1234), "warm_start"),
+            (SVC(kernel=kernel), "fit"),
+        ]:
+            classifier = SklearnClassifier(model=model, clip_values=(min_, max_))
+            classifier.fit(all_data, all_labels)
+            defence = RONIDefense(
+                classifier,
+                all_data,
+                all_labels,
+                trusted_data,
+                trusted_labels,
+                perf_func=accuracy,
+                eps=0.1,
+                calibrated=True,
+                incremental=True,
+            )
+            self.assertEqual(defence._update_mode, update_mode)
+
+            # The parallel evaluation gives the same detections as the sequential one
+            master_seed(seed=1234)
+            report, clean = defence.detect_poison(nb_jobs=1)
+            master_seed(seed=1234)
+            report_parallel, clean_parallel = defence.detect_poison(nb_jobs=2)
+
+            self.assertEqual(len(clean), NB_TRAIN + NB_POISON)
+            self.assertEqual(clean_parallel, clean)
+            self.assertEqual(report_parallel.keys(), report.keys())
+            for idx, shift in report.items():
+                self.assertAlmostEqual(report_parallel[idx], shift)
+
+        self.assertRaises(ValueError, defence.set_params, nb_jobs=0)
+
     def test_evaluate_defense(self):
         real_clean = np.array([1 if i < NB_TRAIN else 0 for i in range(NB_TRAIN + NB_POISON)])
         self.defence_no_cal.detect_poison()
@@ -31,7 +31,10 @@ logger = logging.getLogger(__name__)
 NB_TRAIN, NB_TEST, BATCH_SIZE, EPS_MULTIPLIER, UB_PCT_POISON = 300, 10, 128, 1.5, 0.2
 
 
-@pytest.mark.parametrize("params", [dict(batch_size=-1), dict(eps_multiplier=-1.0), dict(expected_pp_poison=2.0)])
+@pytest.mark.parametrize(
+    "params",
+    [dict(batch_size=-1), dict(eps_multiplier=-1.0), dict(expected_pp_poison=2.0), dict(streaming="yes")],
+)
 def test_wrong_parameters(params, art_warning, get_default_mnist_subset, image_dl_estimator):
     try:
         (x_train_mnist, y_train_mnist), (_, _) = get_default_mnist_subset
@@ -66,6 +69,45 @@ def test_detect_poison(art_warning, get_default_mnist_subset, image_dl_estimator
         art_warning(e)
 
 
+@pytest.mark.skip_framework("non_dl_frameworks", "mxnet")
+def test_detect_poison_streaming(art_warning, get_default_mnist_subset, image_dl_estimator):
+    try:
+        (x_train_mnist, y_train_mnist), (_, _) = get_default_mnist_subset
+
+        classifier, _ = image_dl_estimator()
+
+        classifier.fit(x_train_mnist[:NB_TRAIN], y_train_mnist[:NB_TRAIN], nb_epochs=1)
+        kwargs = dict(batch_size=BATCH_SIZE, eps_multiplier=EPS_MULTIPLIER, expected_pp_poison=UB_PCT_POISON)
+        defence = SpectralSignatureDefense(classifier, x_train_mnist[:NB_TRAIN], y_train_mnist[:NB_TRAIN], **kwargs)
+        _, is_clean = defence.detect_poison()
+        report_streaming, is_clean_streaming = defence.detect_poison(streaming=True)
+
+        assert len(is_clean) == NB_TRAIN
+        assert len(is_clean_streaming) == NB_TRAIN
+
+        layer = len(classifier.layer_names) - 1
+        activations = classifier.get_activations(x_train_mnist[:NB_TRAIN], layer=layer, batch_size=BATCH_SIZE)
+        activations = np.reshape(activations, (NB_TRAIN, -1))
+        scores = np.zeros(NB_TRAIN)
+        for class_idx in np.unique(defence.y_train_sparse):
+            in_class = defence.y_train_sparse == class_idx
+            scores[in_class] = SpectralSignatureDefense.spectral_signature_scores(activations[in_class])[:, 0]
+
+        scores_streaming = defence._streaming_scores(layer)
+        np.testing.assert_allclose(scores_streaming, scores, rtol=1e-3, atol=1e-5 * np.max(scores))
+        for idx, score in report_streaming.items():
+            assert score == pytest.approx(scores_streaming[idx])
+
+        # the detections may only differ for samples with scores at the cutoff of their class
+        quantile = 1 - EPS_MULTIPLIER * UB_PCT_POISON
+        for idx in np.where(np.array(is_clean_streaming) != np.array(is_clean))[0]:
+            in_class = defence.y_train_sparse == defence.y_train_sparse[idx]
+            cutoff = np.quantile(scores[in_class], quantile)
+            assert scores[idx] == pytest.approx(cutoff, rel=1e-3, abs=1e-5 * np.max(scores))
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.skip_framework("non_dl_frameworks", "mxnet")
 def test_evaluate_defense(art_warning, get_default_mnist_subset, image_dl_estimator):
     try:
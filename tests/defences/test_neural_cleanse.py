@@ -71,6 +71,47 @@ class TestNeuralCleanse(unittest.TestCase):
             defense_cleanse = cleanse(krc, steps=2)
             defense_cleanse.mitigate(x_test, y_test, mitigation_types=["filtering", "pruning", "unlearning"])
 
+    def test_keras_joint(self):
+        """
+        Test with a KerasClassifier optimizing the backdoors of multiple classes jointly.
+        :return:
+        """
+        if keras.__version__ != "2.2.4":
+            self.assertRaises(NotImplementedError)
+        else:
+            krc = get_image_classifier_kr()
+            (x_train, y_train), (x_test, y_test) = self.mnist
+            krc.fit(x_train, y_train, nb_epochs=1)
+
+            cleanse = NeuralCleanse(krc)
+            defense_cleanse = cleanse(krc, steps=2, batch_size=5, class_batch_size=4)
+
+            masks, patterns = defense_cleanse.generate_backdoors(x_test, y_test, y_test[:6])
+            self.assertEqual(masks.shape, (6,) + x_test.shape[1:])
+            self.assertEqual(patterns.shape, (6,) + x_test.shape[1:])
+            self.assertTrue((masks >= 0).all() and (masks <= 1).all())
+
+            defense_cleanse.mitigate(x_test, y_test, mitigation_types=["filtering", "pruning", "unlearning"])
+
+    def test_keras_pruning_bisection(self):
+        """
+        Test pruning with bisection search with a KerasClassifier.
+        :return:
+        """
+        if keras.__version__ != "2.2.4":
+            self.assertRaises(NotImplementedError)
+        else:
+            krc = get_image_classifier_kr()
+            (x_train, y_train), (x_test, y_test) = self.mnist
+            krc.fit(x_train, y_train, nb_epochs=1)
+
+            cleanse = NeuralCleanse(krc)
+            defense_cleanse = cleanse(krc, steps=2)
+            defense_cleanse.mitigate(x_test, y_test, mitigation_types=["pruning"], pruning_search="bisection")
+
+            with self.assertRaises(ValueError):
+                defense_cleanse.mitigate(x_test, y_test, mitigation_types=["pruning"], pruning_search="binary")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -40,3 +40,22 @@ def test_strip(art_warning, get_default_mnist_subset, image_dl_estimator):
         defense_cleanse.mitigate(x_test_mnist)
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.framework_agnostic
+def test_strip_batched(art_warning, get_default_mnist_subset, image_dl_estimator):
+    try:
+        (x_train_mnist, y_train_mnist), (x_test_mnist, y_test_mnist) = get_default_mnist_subset
+
+        classifier, _ = image_dl_estimator()
+
+        classifier.fit(x_train_mnist, y_train_mnist, nb_epochs=1)
+        strip = STRIP(classifier)
+        defense_cleanse = strip(batch_size=16)
+        defense_cleanse.mitigate(x_test_mnist)
+        assert defense_cleanse.entropy_threshold is not None
+
+        predictions = defense_cleanse.predict(x_test_mnist)
+        assert predictions.shape == (x_test_mnist.shape[0], 10)
+    except ARTTestException as e:
+        art_warning(e)
@@ -158,6 +158,11 @@ class TestRandomizedSmoothingVectors(unittest.TestCase):
         self.assertEqual(y_test_smooth.shape, y_test.shape)
         self.assertTrue((np.sum(y_test_smooth, axis=1) <= 1).all())
 
+        # check streaming class counts, the noisy samples of several inputs share one batch
+        counts = rs._prediction_counts_batch(x_test[:5], n=30, batch_size=16)
+        self.assertEqual(counts.shape, (5, y_test.shape[1]))
+        self.assertTrue((np.sum(counts, axis=1) == 30).all())
+
         # check certification
         pred, radius = rs.certify(x=x_test, n=250)
         self.assertEqual(len(pred), len(x_test))
@@ -165,6 +170,15 @@ class TestRandomizedSmoothingVectors(unittest.TestCase):
         self.assertTrue((radius <= 1).all())
         self.assertTrue((pred < y_test.shape[1]).all())
 
+        # check sequential certification
+        pred, radius, nb_samples = rs.certify_sequential(x=x_test, n=250)
+        self.assertEqual(len(pred), len(x_test))
+        self.assertEqual(len(radius), len(x_test))
+        self.assertTrue((radius <= 1).all())
+        self.assertTrue((pred < y_test.shape[1]).all())
+        self.assertTrue((nb_samples <= 250).all())
+        self.assertTrue((radius[pred == -1] == 0).all())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -18,6 +18,7 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
+import os
 import tempfile
 import unittest
 
@@ -75,6 +76,124 @@ class TestBlackBoxClassifier(TestBase):
         # Check that the prediction results match
         np.testing.assert_array_almost_equal(predictions_classifier, predictions_check, decimal=4)
 
+    def test_prediction_cache(self):
+        from art.estimators.classification import BlackBoxClassifier
+
+        queried = []
+        weights = np.random.RandomState(0).randn(4, 3)
+
+        def predict_fn(x):
+            queried.append(x.shape[0])
+            return np.eye(3)[np.argmax(x.reshape(x.shape[0], -1) @ weights, axis=1)]
+
+        classifier = BlackBoxClassifier(predict_fn, (4,), 3, cache_size=10)
+        x = np.random.rand(8, 4).astype(np.float32)
+
+        # Duplicated rows are only forwarded once
+        predictions = classifier.predict(np.concatenate([x, x[:3]]), batch_size=3)
+        self.assertEqual(sum(queried), 8)
+        self.assertEqual(classifier.prediction_cache.misses, 8)
+        self.assertEqual(classifier.prediction_cache.hits, 3)
+        np.testing.assert_array_equal(predictions[:3], predictions[8:])
+
+        # Cached rows are not forwarded again
+        np.testing.assert_array_equal(classifier.predict(x), predictions[:8])
+        self.assertEqual(sum(queried), 8)
+
+        # Least recently used predictions are evicted
+        classifier.predict(np.random.rand(5, 4).astype(np.float32))
+        self.assertEqual(len(classifier.prediction_cache), 10)
+
+        # The cache is persisted between classifiers
+        path = os.path.join(self.test_dir, "cache.npz")
+        classifier.prediction_cache.save(path)
+        classifier_loaded = BlackBoxClassifier(predict_fn, (4,), 3, cache_size=10, cache_path=path)
+        self.assertEqual(len(classifier_loaded.prediction_cache), 10)
+
+        queried.clear()
+        np.testing.assert_array_equal(classifier_loaded.predict(x[3:]), predictions[3:8])
+        self.assertEqual(sum(queried), 0)
+
+    def test_concurrent_predict(self):
+        import json
+        import threading
+        import time
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.request import urlopen
+
+        from art.estimators.classification import BlackBoxClassifier
+
+        weights = np.random.RandomState(0).randn(4, 3)
+        lock = threading.Lock()
+        state = {"in_flight": 0, "max_in_flight": 0, "failures": 0}
+
+        class MockHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                with lock:
+                    state["in_flight"] += 1
+                    state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+                    fail = state["failures"] < 2
+                    state["failures"] += int(fail)
+                time.sleep(0.05)
+                x = np.array(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                with lock:
+                    state["in_flight"] -= 1
+                if fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps(np.eye(3)[np.argmax(x @ weights, axis=1)].tolist()).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://127.0.0.1:{}".format(server.server_address[1])
+
+        def predict_fn(x):
+            with urlopen(url, data=json.dumps(x.tolist()).encode()) as response:
+                return np.array(json.loads(response.read()))
+
+        try:
+            x = np.random.rand(40, 4).astype(np.float32)
+            classifier = BlackBoxClassifier(predict_fn, (4,), 3, max_concurrency=4, max_retries=2, retry_backoff=0.01)
+            predictions = classifier.predict(x, batch_size=5)
+
+            np.testing.assert_array_equal(predictions, np.eye(3)[np.argmax(x @ weights, axis=1)])
+            self.assertEqual(state["failures"], 2)
+            self.assertGreater(state["max_in_flight"], 1)
+            self.assertLessEqual(state["max_in_flight"], 4)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_set_params(self):
+        from art.estimators.classification import BlackBoxClassifier
+
+        classifier = BlackBoxClassifier(lambda x: np.eye(3)[np.zeros(x.shape[0], dtype=int)], (4,), 3)
+        self.assertIsNone(classifier.prediction_cache)
+
+        classifier.set_params(max_concurrency=4, max_retries=2, retry_backoff=0.5, cache_size=10)
+        params = classifier.get_params()
+        self.assertEqual(params["max_concurrency"], 4)
+        self.assertEqual(params["max_retries"], 2)
+        self.assertEqual(params["retry_backoff"], 0.5)
+        self.assertEqual(params["cache_size"], 10)
+        self.assertEqual(classifier.prediction_cache.max_size, 10)
+
+        classifier.set_params(cache_size=0)
+        self.assertIsNone(classifier.prediction_cache)
+
+        with self.assertRaises(ValueError):
+            classifier.set_params(max_concurrency=0)
+        with self.assertRaises(ValueError):
+            BlackBoxClassifier(lambda x: x, (4,), 3, max_retries=-1)
+
     def test_save(self):
         path = "tmp"
         filename = "model.h5"
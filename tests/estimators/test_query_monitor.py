@@ -0,0 +1,83 @@
+# MIT License
+#
+# Copyright (C) The Adversarial Robustness Toolbox (ART) Authors 2021
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import logging
+
+import numpy as np
+import pytest
+
+from art.attacks.evasion import HopSkipJump
+from art.estimators import QueryMonitor
+from art.estimators.classification.scikitlearn import ScikitlearnLogisticRegression
+from art.exceptions import QueryBudgetExceededError
+
+from tests.utils import ARTTestException
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture()
+def logistic_regression(get_iris_dataset):
+    from sklearn.linear_model import LogisticRegression
+
+    (x_train, y_train), _ = get_iris_dataset
+    model = LogisticRegression(solver="lbfgs", multi_class="auto").fit(x_train, np.argmax(y_train, axis=1))
+    return ScikitlearnLogisticRegression(model=model, clip_values=(0, 1))
+
+
+@pytest.mark.framework_agnostic
+def test_records(art_warning, logistic_regression, get_iris_dataset):
+    try:
+        _, (x_test, y_test) = get_iris_dataset
+        classifier = logistic_regression
+
+        with QueryMonitor(classifier) as monitor:
+            classifier.predict(x_test[:10])
+            with monitor.phase("gradients"):
+                classifier.loss_gradient(x_test[:5], y_test[:5])
+                classifier.class_gradient(x_test[:3], label=0)
+
+        # Methods are restored after leaving the context
+        assert "predict" not in vars(classifier)
+        classifier.predict(x_test)
+
+        summary = monitor.summary()
+        assert monitor.nb_queries == 10
+        assert summary["default"]["predict"]["calls"] == 1
+        assert summary["gradients"]["loss_gradient"]["rows"] == 5
+        assert summary["gradients"]["class_gradient"]["rows"] == 3
+        assert all(record["time"] >= 0 for record in monitor.records)
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.framework_agnostic
+def test_budget(art_warning, logistic_regression, get_iris_dataset):
+    try:
+        _, (x_test, _) = get_iris_dataset
+        classifier = logistic_regression
+        attack = HopSkipJump(classifier, max_iter=10, max_eval=100, init_eval=10, verbose=False)
+
+        with QueryMonitor(classifier, max_queries=500) as monitor:
+            with pytest.raises(QueryBudgetExceededError):
+                with monitor.phase("HopSkipJump"):
+                    attack.generate(x_test[:5])
+
+        assert monitor.nb_queries <= 500
+        assert monitor.summary()["HopSkipJump"]["predict"]["calls"] > 0
+    except ARTTestException as e:
+        art_warning(e)
@@ -29,7 +29,8 @@ import torch.optim as optim
 from art.estimators.classification.keras import KerasClassifier
 from art.estimators.classification.pytorch import PyTorchClassifier
 from art.estimators.classification.tensorflow import TensorFlowClassifier
-from art.metrics.metrics import empirical_robustness, clever_t, clever_u, clever, loss_sensitivity, wasserstein_distance
+from art.metrics.metrics import empirical_robustness, clever_t, clever_u, clever, clever_batch, loss_sensitivity
+from art.metrics.metrics import wasserstein_distance
 from art.utils import load_mnist
 
 from tests.utils import master_seed
@@ -383,6 +384,25 @@ class TestMetrics(unittest.TestCase):
         )
         self.assertIsNone(scores[0], msg="Clever scores for the predicted class should be `None`.")
 
+    def test_clever_batch(self):
+        batch_size = 100
+        (x_train, y_train), (x_test, _), _, _ = load_mnist()
+
+        # Get the classifier
+        krc = self._create_krclassifier()
+        krc.fit(x_train, y_train, batch_size=batch_size, nb_epochs=2, verbose=0)
+
+        scores = clever_batch(krc, x_test[:3], 5, 5, 3, 2, c_init=1, pool_factor=10, grad_batch_size=64, verbose=False)
+        self.assertEqual(scores.shape, (3, krc.nb_classes))
+
+        y_pred = np.argmax(krc.predict(x_test[:3]), axis=1)
+        self.assertTrue(np.isnan(scores[np.arange(3), y_pred]).all())
+        self.assertEqual(np.sum(np.isnan(scores)), 3)
+        self.assertTrue((np.nanmin(scores, axis=1) <= 3).all())
+
+        scores = clever_batch(krc, x_test[:3], 5, 5, 3, 2, target=[1, 2], c_init=1, pool_factor=10, verbose=False)
+        self.assertTrue(np.isnan(np.delete(scores, [1, 2], axis=1)).all())
+
     def test_1_wasserstein_distance(self):
         nb_train = 1000
         nb_test = 100
@@ -18,6 +18,8 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
+import os
+import tempfile
 import unittest
 
 from xgboost import XGBClassifier
@@ -146,6 +148,41 @@ class TestMetricsTrees(unittest.TestCase):
         self.assertEqual(average_bound, 0.05406445312499999)
         self.assertEqual(verified_error, 0.96)
 
+    def test_parallel_resumable(self):
+        model = RandomForestClassifier(n_estimators=4, max_depth=6)
+        model.fit(self.x_train, np.argmax(self.y_train, axis=1))
+
+        classifier = SklearnClassifier(model=model)
+
+        rt = RobustnessVerificationTreeModelsCliqueMethod(classifier=classifier, verbose=False)
+        bounds, initial_robust = rt.verify_samples(
+            x=self.x_test[:10], y=self.y_test[:10], eps_init=0.3, nb_search_steps=10, max_clique=2, max_level=2
+        )
+        self.assertEqual(bounds.shape, (10,))
+        self.assertEqual(initial_robust.shape, (10,))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint = os.path.join(tmp_dir, "bounds.csv")
+            bounds_parallel, _ = rt.verify_samples(
+                x=self.x_test[:10], y=self.y_test[:10], eps_init=0.3, nb_jobs=2, checkpoint=checkpoint
+            )
+            np.testing.assert_array_equal(bounds, bounds_parallel)
+
+            # Drop the last results to emulate an interrupted run and resume it
+            with open(checkpoint, "r") as f:
+                lines = f.readlines()
+            with open(checkpoint, "w") as f:
+                f.writelines(lines[:4])
+
+            average_bound, verified_error = rt.verify(
+                x=self.x_test[:10], y=self.y_test[:10], eps_init=0.3, nb_jobs=2, checkpoint=checkpoint
+            )
+            with open(checkpoint, "r") as f:
+                self.assertEqual(len(f.readlines()), 10)
+
+        self.assertAlmostEqual(average_bound, np.mean(bounds))
+        self.assertAlmostEqual(verified_error, 1.0 - np.mean(initial_robust))
+
 
 if __name__ == "__main__":
     unittest.main()
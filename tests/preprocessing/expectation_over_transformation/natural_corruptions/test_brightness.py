@@ -145,3 +145,31 @@ def test_eot_brightness_tensorflow_v2(art_warning, fix_get_mnist_subset):
 
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_brightness_pytorch_per_sample(art_warning, fix_get_mnist_subset):
+    try:
+        import torch
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.brightness.pytorch import (
+            EoTBrightnessPyTorch,
+        )
+
+        x_train_mnist, y_train_mnist, _, _ = fix_get_mnist_subset
+        x_train_mnist = np.transpose(x_train_mnist, (0, 2, 3, 1))  # transpose to NHWC
+
+        nb_samples = 4
+
+        eot = EoTBrightnessPyTorch(nb_samples=nb_samples, delta=(-2.0, -1.0), clip_values=(-5.0, 5.0))
+        x_eot, y_eot = eot.forward(x=torch.from_numpy(x_train_mnist), y=torch.from_numpy(y_train_mnist))
+
+        # every copy of an input is shifted by its own delta and the labels follow their inputs
+        deltas = x_eot.numpy() - np.repeat(x_train_mnist, nb_samples, axis=0)
+        deltas = deltas.reshape(deltas.shape[0], -1)
+        np.testing.assert_array_almost_equal(deltas, np.repeat(deltas[:, :1], deltas.shape[1], axis=1), decimal=5)
+        assert np.all((deltas >= -2.0) & (deltas <= -1.0))
+        assert len(np.unique(np.round(deltas[:, 0], 5))) > 1
+        np.testing.assert_array_equal(y_eot.numpy(), np.repeat(y_train_mnist, nb_samples, axis=0))
+
+    except ARTTestException as e:
+        art_warning(e)
@@ -154,3 +154,64 @@ def test_eot_zoom_blur_tensorflow_v2(art_warning, fix_get_mnist_subset):
 
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_eot_zoom_blur_pytorch_non_square(art_warning):
+    try:
+        import torch
+        import torchvision
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.zoom_blur.pytorch import (
+            EoTZoomBlurPyTorch,
+        )
+
+        x = np.random.RandomState(0).uniform(size=(2, 20, 28, 3)).astype(np.float32)
+        y = np.zeros((2, 10), dtype=np.float32)
+
+        eot = EoTZoomBlurPyTorch(nb_samples=1, zoom=(1.5, 1.5), clip_values=(0.0, 1.0))
+        x_eot, _ = eot.forward(x=torch.from_numpy(x), y=torch.from_numpy(y))
+
+        x_blur = np.zeros_like(x)
+        for zoom in np.arange(start=1.0, stop=1.5, step=0.05):
+            height, width = int(x.shape[1] * zoom), int(x.shape[2] * zoom)
+            x_resized = torchvision.transforms.functional.resize(
+                img=torch.from_numpy(x).permute(0, 3, 1, 2),
+                size=[height, width],
+                interpolation=torchvision.transforms.InterpolationMode.BILINEAR,
+            ).permute(0, 2, 3, 1)
+            trim_top = (height - x.shape[1]) // 2
+            trim_left = (width - x.shape[2]) // 2
+            x_blur += x_resized.numpy()[:, trim_top : trim_top + x.shape[1], trim_left : trim_left + x.shape[2]]
+
+        np.testing.assert_array_almost_equal(x_eot.numpy(), np.clip((x + x_blur) / 11, 0.0, 1.0), decimal=5)
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("tensorflow2")
+def test_eot_zoom_blur_tensorflow_v2_non_square(art_warning):
+    try:
+        import tensorflow as tf
+        from art.preprocessing.expectation_over_transformation.natural_corruptions.zoom_blur.tensorflow import (
+            EoTZoomBlurTensorFlow,
+        )
+
+        x = np.random.RandomState(0).uniform(size=(2, 20, 28, 3)).astype(np.float32)
+        y = np.zeros((2, 10), dtype=np.float32)
+
+        eot = EoTZoomBlurTensorFlow(nb_samples=1, zoom=(1.5, 1.5), clip_values=(0.0, 1.0))
+        x_eot, _ = eot.forward(x=x, y=y)
+
+        x_blur = np.zeros_like(x)
+        for zoom in np.arange(start=1.0, stop=1.5, step=0.05):
+            height, width = int(x.shape[1] * zoom), int(x.shape[2] * zoom)
+            x_resized = tf.image.resize(images=x, size=[height, width], method=tf.image.ResizeMethod.BILINEAR)
+            trim_top = (height - x.shape[1]) // 2
+            trim_left = (width - x.shape[2]) // 2
+            x_blur += x_resized.numpy()[:, trim_top : trim_top + x.shape[1], trim_left : trim_left + x.shape[2]]
+
+        np.testing.assert_array_almost_equal(x_eot.numpy(), np.clip((x + x_blur) / 11, 0.0, 1.0), decimal=5)
+
+    except ARTTestException as e:
+        art_warning(e)
@@ -140,6 +140,36 @@ class TestExpectationVectors(unittest.TestCase):
         acc = np.sum(preds_adv == np.argmax(y_test, axis=1)) / y_test.shape[0]
         logger.info("Accuracy on Iris with limited query info: %.2f%%", (acc * 100))
 
+    def test_iris_max_batch_size(self):
+        (_, _), (x_test, y_test) = self.iris
+
+        def t(x):
+            return x
+
+        def transformation():
+            while True:
+                yield t
+
+        classifier = ExpectationOverTransformations(
+            get_tabular_classifier_kr(), sample_size=5, transformation=transformation
+        )
+        preds = classifier.predict(x_test)
+        loss_gradients = classifier.loss_gradient(x_test, y_test)
+        class_gradients = classifier.class_gradient(x_test, label=np.argmax(y_test, axis=1))
+
+        # Evaluate two transformed copies of the inputs per call
+        classifier.max_batch_size = 2 * len(x_test)
+        np.testing.assert_array_almost_equal(classifier.predict(x_test), preds, decimal=5)
+        np.testing.assert_array_almost_equal(classifier.loss_gradient(x_test, y_test), loss_gradients, decimal=5)
+        np.testing.assert_array_almost_equal(
+            classifier.class_gradient(x_test, label=np.argmax(y_test, axis=1)), class_gradients, decimal=5
+        )
+
+        with self.assertRaises(ValueError):
+            _ = ExpectationOverTransformations(
+                get_tabular_classifier_kr(), sample_size=5, transformation=transformation, max_batch_size=0
+            )
+
 
 if __name__ == "__main__":
     unittest.main()